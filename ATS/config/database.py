@@ -1,15 +1,63 @@
 import sqlite3
+import ast
+import json
+import re
+import zlib
 from datetime import datetime
 
-def get_database_connection():
+# Version of the compressed JSON format used for resume_payloads blobs
+RESUME_PAYLOAD_VERSION = 1
+
+# Number of connections opened by this process, reported per rerun by utils.resources
+connections_opened = 0
+
+def get_database_connection(check_same_thread=True):
     """Create and return a database connection"""
-    conn = sqlite3.connect('resume_data.db')
+    global connections_opened
+    connections_opened += 1
+    conn = sqlite3.connect('resume_data.db', check_same_thread=check_same_thread)
     return conn
 
+def parse_stored_list(value):
+    """Parse a list column stored as JSON, a Python list literal or comma-separated text"""
+    if value is None or value == '':
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value]
+    for parser in (json.loads, ast.literal_eval):
+        try:
+            parsed = parser(value)
+        except (ValueError, SyntaxError, TypeError):
+            continue
+        if isinstance(parsed, (list, tuple, set)):
+            return [str(item) for item in parsed]
+    return [item.strip() for item in str(value).split(',') if item.strip()]
+
+def encode_list_column(value):
+    """Encode a list for a JSON list column; legacy comma-joined strings are stored as given"""
+    if isinstance(value, str):
+        return value
+    return json.dumps(list(value or []))
+
+def encode_payload(value):
+    """Serialize a value to zlib-compressed JSON for resume_payloads"""
+    return zlib.compress(json.dumps(value, separators=(',', ':'), default=str).encode('utf-8'))
+
+def decode_payload(blob, format_version=RESUME_PAYLOAD_VERSION):
+    """Deserialize a resume_payloads blob written with encode_payload"""
+    if blob is None:
+        return None
+    if format_version != 1:
+        raise ValueError(f"Unsupported resume payload format version: {format_version}")
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
 def init_database():
     """Initialize database tables"""
     conn = get_database_connection()
     cursor = conn.cursor()
+
+    # WAL lets the pages read while the queue workers write
+    cursor.execute('PRAGMA journal_mode=WAL')
     
     # Create resume_data table
     cursor.execute('''
@@ -29,9 +77,14 @@ def init_database():
         projects TEXT,
         skills TEXT,
         template TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        experience_months INTEGER
     )
     ''')
+    cursor.execute('PRAGMA table_info(resume_data)')
+    if 'experience_months' not in {row[1] for row in cursor.fetchall()}:
+        # Databases created before experience was stored; their resumes keep NULL
+        cursor.execute('ALTER TABLE resume_data ADD COLUMN experience_months INTEGER')
     
     # Create resume_skills table
     cursor.execute('''
@@ -62,6 +115,137 @@ def init_database():
     )
     ''')
     
+    # Create resume_payloads table (zlib-compressed JSON of the raw text and full analysis result)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS resume_payloads (
+        resume_id INTEGER PRIMARY KEY,
+        format_version INTEGER NOT NULL,
+        raw_text BLOB,
+        analysis BLOB,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (resume_id) REFERENCES resume_data (id)
+    )
+    ''')
+    
+    # Create resume_minhash and resume_lsh tables (near-duplicate index, see utils.near_duplicates)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS resume_minhash (
+        resume_id INTEGER PRIMARY KEY,
+        signature BLOB NOT NULL,
+        FOREIGN KEY (resume_id) REFERENCES resume_data (id)
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS resume_lsh (
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        resume_id INTEGER NOT NULL,
+        PRIMARY KEY (band, bucket, resume_id)
+    ) WITHOUT ROWID
+    ''')
+    
+    # Create resume_vectors table (term vectors not yet compacted into the candidate index, see utils.candidate_index)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS resume_vectors (
+        resume_id INTEGER PRIMARY KEY,
+        indices BLOB NOT NULL,
+        data BLOB NOT NULL,
+        FOREIGN KEY (resume_id) REFERENCES resume_data (id)
+    )
+    ''')
+    
+    # Create skill_dictionary and resume_skill_bits tables (skill bitsets, see utils.skill_bits)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS skill_dictionary (
+        bit INTEGER PRIMARY KEY,
+        skill TEXT NOT NULL UNIQUE
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS resume_skill_bits (
+        resume_id INTEGER PRIMARY KEY,
+        num_skills INTEGER NOT NULL,
+        bits BLOB NOT NULL,
+        FOREIGN KEY (resume_id) REFERENCES resume_data (id)
+    )
+    ''')
+    
+    # Create batch_runs and batch_items tables (checkpoints of headless bulk imports)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS batch_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        source TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS batch_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id INTEGER NOT NULL,
+        path TEXT NOT NULL,
+        target_category TEXT NOT NULL,
+        target_role TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        resume_id INTEGER,
+        error TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (run_id, path),
+        FOREIGN KEY (run_id) REFERENCES batch_runs (id),
+        FOREIGN KEY (resume_id) REFERENCES resume_data (id)
+    )
+    ''')
+    
+    # Create analysis_jobs table (durable work queue drained by utils.job_queue workers)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS analysis_jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        status TEXT NOT NULL DEFAULT 'queued',
+        file_name TEXT,
+        file_type TEXT,
+        file_data BLOB,
+        raw_text BLOB,
+        target_category TEXT,
+        target_role TEXT,
+        role_info TEXT NOT NULL,
+        persist INTEGER NOT NULL DEFAULT 1,
+        reuse_duplicates INTEGER NOT NULL DEFAULT 1,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL DEFAULT 3,
+        available_at REAL NOT NULL,
+        lease_owner TEXT,
+        resume_id INTEGER,
+        result BLOB,
+        error TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        dedupe_key TEXT,
+        FOREIGN KEY (resume_id) REFERENCES resume_data (id)
+    )
+    ''')
+    cursor.execute('PRAGMA table_info(analysis_jobs)')
+    job_columns = {row[1] for row in cursor.fetchall()}
+    if 'dedupe_key' not in job_columns:
+        # Queues created before identical jobs were coalesced
+        cursor.execute('ALTER TABLE analysis_jobs ADD COLUMN dedupe_key TEXT')
+    if 'reuse_duplicates' not in job_columns:
+        cursor.execute('ALTER TABLE analysis_jobs ADD COLUMN reuse_duplicates INTEGER NOT NULL DEFAULT 1')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_analysis_jobs_status ON analysis_jobs (status, available_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_analysis_jobs_dedupe_key ON analysis_jobs (dedupe_key, status)')
+    
+    # Create llm_usage table (tokens used by each LLM call, with the local estimate of the prompt tokens)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS llm_usage (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        purpose TEXT NOT NULL,
+        model TEXT NOT NULL,
+        prompt_tokens INTEGER,
+        completion_tokens INTEGER,
+        estimated_tokens INTEGER,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    
     # Create admin_logs table
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS admin_logs (
@@ -81,76 +265,284 @@ def init_database():
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )
     ''')
-    
+
+    # Create resume_search full-text index (rowid is the resume_data id)
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'resume_search'")
+    search_index_exists = cursor.fetchone() is not None
+    try:
+        cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS resume_search USING fts5(
+            raw_text, summary, experience, projects,
+            tokenize = 'porter unicode61'
+        )
+        ''')
+        if not search_index_exists:
+            # Index resumes saved before the search table existed (no raw text available)
+            cursor.execute('''
+            INSERT INTO resume_search (rowid, raw_text, summary, experience, projects)
+            SELECT id, '', COALESCE(summary, ''), COALESCE(experience, ''), COALESCE(projects, '')
+            FROM resume_data
+            ''')
+    except sqlite3.OperationalError as e:
+        print(f"Full-text search unavailable: {str(e)}")
+
+    # Indexes backing the paginated submissions grid and its filters
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_resume_data_created_at ON resume_data (created_at, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_resume_data_target_role ON resume_data (target_role)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_resume_data_target_category ON resume_data (target_category)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_resume_data_experience_months ON resume_data (experience_months)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_resume_data_name ON resume_data (name, id)')
+    # Covers the latest-analysis lookup, SELECT MAX(id) FROM resume_analysis WHERE resume_id = ?,
+    # and replaces the narrower index on resume_id alone
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_resume_analysis_resume_id_id ON resume_analysis (resume_id, id)')
+    cursor.execute('DROP INDEX IF EXISTS idx_resume_analysis_resume_id')
+
     conn.commit()
     conn.close()
 
-def save_resume_data(data):
-    """Save resume data to database"""
+def resume_data_row(data):
+    """Column values of a resume_data row"""
+    personal_info = data.get('personal_info', {})
+    return (
+        personal_info.get('full_name', ''),
+        personal_info.get('email', ''),
+        personal_info.get('phone', ''),
+        personal_info.get('linkedin', ''),
+        personal_info.get('github', ''),
+        personal_info.get('portfolio', ''),
+        data.get('summary', ''),
+        data.get('target_role', ''),
+        data.get('target_category', ''),
+        json.dumps(list(data.get('education', []))),
+        json.dumps(list(data.get('experience', []))),
+        json.dumps(list(data.get('projects', []))),
+        json.dumps(list(data.get('skills', []))),
+        data.get('template', ''),
+        data.get('experience_months')
+    )
+
+def search_row(resume_id, data):
+    """Column values of a resume's full-text index row"""
+    return (
+        resume_id,
+        data.get('raw_text', ''),
+        data.get('summary', ''),
+        '\n'.join(data.get('experience', [])),
+        '\n'.join(data.get('projects', []))
+    )
+
+def skill_rows(resume_id, data):
+    """resume_skills rows of the skills extracted from a resume"""
+    return [(resume_id, skill, 'extracted') for skill in dict.fromkeys(data.get('skills', [])) if skill]
+
+def analysis_row(resume_id, analysis):
+    """Column values of a resume_analysis row"""
+    return (
+        resume_id,
+        float(analysis.get('ats_score', 0)),
+        float(analysis.get('keyword_match_score', 0)),
+        float(analysis.get('format_score', 0)),
+        float(analysis.get('section_score', 0)),
+        encode_list_column(analysis.get('missing_skills', [])),
+        encode_list_column(analysis.get('recommendations', []))
+    )
+
+INSERT_RESUME_DATA = '''
+INSERT INTO resume_data (
+    name, email, phone, linkedin, github, portfolio,
+    summary, target_role, target_category, education, 
+    experience, projects, skills, template, experience_months
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_RESUME_SKILL = '''
+INSERT INTO resume_skills (resume_id, skill_name, skill_category) VALUES (?, ?, ?)
+'''
+
+INSERT_RESUME_SEARCH = '''
+INSERT INTO resume_search (rowid, raw_text, summary, experience, projects)
+VALUES (?, ?, ?, ?, ?)
+'''
+
+INSERT_RESUME_ANALYSIS = '''
+INSERT INTO resume_analysis (
+    resume_id, ats_score, keyword_match_score,
+    format_score, section_score, missing_skills,
+    recommendations
+) VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+def run_indexers(cursor, indexers, items):
+    """Add saved (resume_id, raw_text) pairs to indexes in cursor's transaction.
+
+    indexers are functions taking the cursor and the pairs, passed by the caller
+    (utils.resume_indexes.RESUME_INDEXERS). Each runs in a savepoint: an index
+    that fails is left to its backfill instead of rolling back the save.
+    """
+    for indexer in indexers:
+        cursor.execute('SAVEPOINT resume_index')
+        try:
+            indexer(cursor, items)
+        except Exception as e:
+            print(f"Error indexing resumes with {indexer.__name__}: {str(e)}")
+            cursor.execute('ROLLBACK TO resume_index')
+        cursor.execute('RELEASE resume_index')
+
+def save_resume_batch(records, indexers=(), before_commit=None):
+    """Save many (resume_data, analysis_data) pairs in one transaction, adding them to indexers.
+
+    before_commit(cursor, resume_ids), if given, writes the caller's own rows in the same transaction.
+    Returns the new resume ids in the order of records, or None if nothing was saved.
+    """
+    if not records and before_commit is None:
+        return []
     conn = get_database_connection()
     cursor = conn.cursor()
-    
+
     try:
-        personal_info = data.get('personal_info', {})
-        
-        cursor.execute('''
-        INSERT INTO resume_data (
-            name, email, phone, linkedin, github, portfolio,
-            summary, target_role, target_category, education, 
-            experience, projects, skills, template
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            personal_info.get('full_name', ''),
-            personal_info.get('email', ''),
-            personal_info.get('phone', ''),
-            personal_info.get('linkedin', ''),
-            personal_info.get('github', ''),
-            personal_info.get('portfolio', ''),
-            data.get('summary', ''),
-            data.get('target_role', ''),
-            data.get('target_category', ''),
-            str(data.get('education', [])),
-            str(data.get('experience', [])),
-            str(data.get('projects', [])),
-            str(data.get('skills', [])),
-            data.get('template', '')
-        ))
-        
+        # Holding the write lock from the start keeps the AUTOINCREMENT ids of the batch contiguous
+        cursor.execute('BEGIN IMMEDIATE')
+        resume_ids = insert_resume_batch(cursor, records, indexers)
+        if before_commit is not None:
+            before_commit(cursor, resume_ids)
         conn.commit()
-        return cursor.lastrowid
+        return resume_ids
     except Exception as e:
-        print(f"Error saving resume data: {str(e)}")
+        print(f"Error saving resume batch: {str(e)}")
         conn.rollback()
         return None
     finally:
         conn.close()
 
-def save_analysis_data(resume_id, analysis):
-    """Save resume analysis data"""
+def insert_resume_batch(cursor, records, indexers=()):
+    """Insert (resume_data, analysis_data) pairs with cursor, in the caller's transaction, and add them
+    to indexers (see run_indexers); returns their ids.
+
+    The caller must hold the write lock (BEGIN IMMEDIATE), which keeps the new ids contiguous.
+    """
+    if not records:
+        return []
+    cursor.executemany(INSERT_RESUME_DATA, [resume_data_row(data) for data, _ in records])
+    last_id = cursor.execute('SELECT MAX(id) FROM resume_data').fetchone()[0]
+    resume_ids = list(range(last_id - len(records) + 1, last_id + 1))
+
+    cursor.executemany(INSERT_RESUME_SKILL, [
+        row for resume_id, (data, _) in zip(resume_ids, records) for row in skill_rows(resume_id, data)
+    ])
+    cursor.executemany(INSERT_RESUME_ANALYSIS, [
+        analysis_row(resume_id, analysis) for resume_id, (_, analysis) in zip(resume_ids, records)
+    ])
+    cursor.executemany('''
+    INSERT INTO resume_payloads (resume_id, format_version, raw_text, analysis)
+    VALUES (?, ?, ?, ?)
+    ''', [
+        (
+            resume_id,
+            RESUME_PAYLOAD_VERSION,
+            encode_payload(data.get('raw_text', '')),
+            encode_payload(analysis['result']) if analysis.get('result') is not None else None
+        )
+        for resume_id, (data, analysis) in zip(resume_ids, records)
+    ])
+    try:
+        cursor.executemany(INSERT_RESUME_SEARCH, [
+            search_row(resume_id, data) for resume_id, (data, _) in zip(resume_ids, records)
+        ])
+    except sqlite3.OperationalError as e:
+        print(f"Error indexing resume text: {str(e)}")
+    run_indexers(cursor, indexers, [
+        (resume_id, data.get('raw_text', '')) for resume_id, (data, _) in zip(resume_ids, records)
+    ])
+    return resume_ids
+
+def build_resume_records(analysis, target_role, target_category, raw_text=''):
+    """Build the (resume_data, analysis_data) record of save_resume_batch from an analyze_resume result"""
+    resume_data = {
+        'personal_info': {
+            'full_name': analysis.get('name', 'N/A'),
+            'email': analysis.get('email', ''),
+            'phone': analysis.get('phone', ''),
+            'linkedin': analysis.get('linkedin', ''),
+            'github': analysis.get('github', ''),
+            'portfolio': analysis.get('portfolio', '')
+        },
+        'summary': analysis.get('summary', ''),
+        'target_role': target_role,
+        'target_category': target_category,
+        'education': analysis.get('education', []),
+        'experience': analysis.get('experience', []),
+        'total_experience': analysis.get('total_experience', ''),
+        'experience_months': analysis.get('experience_months'),
+        'projects': analysis.get('projects', []),
+        'skills': analysis.get('skills', []),
+        'raw_text': raw_text,
+        'template': ''
+    }
+    analysis_data = {
+        'ats_score': analysis.get('ats_score', 0),
+        'keyword_match_score': analysis.get('keyword_match', {}).get('score', 0),
+        'format_score': analysis.get('format_score', 0),
+        'section_score': analysis.get('section_score', 0),
+        'missing_skills': analysis.get('keyword_match', {}).get('missing_skills', []),
+        'recommendations': analysis.get('suggestions', []),
+        'result': analysis
+    }
+    return resume_data, analysis_data
+
+def reused_resume_id(analysis):
+    """The id of the saved resume an analysis was reused from, if any"""
+    duplicate = analysis.get('near_duplicate')
+    return duplicate['resume_id'] if duplicate and duplicate.get('reused') else None
+
+def save_analysis_results(results, indexers=(), before_commit=None):
+    """Save many (analysis, target_role, target_category, raw_text) results in one transaction; returns their ids.
+
+    before_commit(cursor, resume_ids) gets the ids of all results, reused ones included.
+    """
+    new_results = [result for result in results if reused_resume_id(result[0]) is None]
+
+    def result_ids(new_ids):
+        new_ids = iter(new_ids)
+        return [reused_resume_id(result[0]) or next(new_ids) for result in results]
+
+    def step(cursor, new_ids):
+        before_commit(cursor, result_ids(new_ids))
+
+    new_ids = save_resume_batch([build_resume_records(*result) for result in new_results], indexers,
+                                step if before_commit is not None else None)
+    if new_ids is None:
+        return None
+    return result_ids(new_ids)
+
+def insert_analysis_results(cursor, results, indexers=()):
+    """Insert many (analysis, target_role, target_category, raw_text) results with cursor, in the
+    caller's write transaction (see insert_resume_batch); returns their ids"""
+    new_results = [result for result in results if reused_resume_id(result[0]) is None]
+    new_ids = iter(insert_resume_batch(cursor, [build_resume_records(*result) for result in new_results], indexers))
+    return [reused_resume_id(result[0]) or next(new_ids) for result in results]
+
+def get_resume_payload(resume_id):
+    """Get the stored raw text and full analysis result of a resume"""
     conn = get_database_connection()
     cursor = conn.cursor()
     
     try:
         cursor.execute('''
-        INSERT INTO resume_analysis (
-            resume_id, ats_score, keyword_match_score,
-            format_score, section_score, missing_skills,
-            recommendations
-        ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            resume_id,
-            float(analysis.get('ats_score', 0)),
-            float(analysis.get('keyword_match_score', 0)),
-            float(analysis.get('format_score', 0)),
-            float(analysis.get('section_score', 0)),
-            analysis.get('missing_skills', ''),
-            analysis.get('recommendations', '')
-        ))
-        
-        conn.commit()
+        SELECT format_version, raw_text, analysis
+        FROM resume_payloads
+        WHERE resume_id = ?
+        ''', (resume_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return {
+            'format_version': row[0],
+            'raw_text': decode_payload(row[1], row[0]),
+            'analysis': decode_payload(row[2], row[0])
+        }
     except Exception as e:
-        print(f"Error saving analysis data: {str(e)}")
-        conn.rollback()
+        print(f"Error getting resume payload: {str(e)}")
+        return None
     finally:
         conn.close()
 
@@ -204,6 +596,47 @@ def log_admin_action(admin_email, action):
     finally:
         conn.close()
 
+def log_llm_usage(purpose, model, prompt_tokens, completion_tokens, estimated_tokens):
+    """Record the tokens used by one LLM call"""
+    conn = get_database_connection()
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute('''
+        INSERT INTO llm_usage (purpose, model, prompt_tokens, completion_tokens, estimated_tokens)
+        VALUES (?, ?, ?, ?, ?)
+        ''', (purpose, model, prompt_tokens, completion_tokens, estimated_tokens))
+        conn.commit()
+    except Exception as e:
+        print(f"Error logging LLM usage: {str(e)}")
+    finally:
+        conn.close()
+
+def get_llm_usage_summary():
+    """Calls and average tokens per call of each LLM call purpose and model"""
+    conn = get_database_connection()
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute('''
+        SELECT purpose, model, COUNT(*), AVG(prompt_tokens), AVG(completion_tokens), AVG(estimated_tokens)
+        FROM llm_usage
+        GROUP BY purpose, model
+        ORDER BY purpose, model
+        ''')
+        return [
+            {
+                'purpose': row[0], 'model': row[1], 'calls': row[2], 'prompt_tokens': row[3] or 0,
+                'completion_tokens': row[4] or 0, 'estimated_tokens': row[5] or 0
+            }
+            for row in cursor.fetchall()
+        ]
+    except Exception as e:
+        print(f"Error getting LLM usage: {str(e)}")
+        return []
+    finally:
+        conn.close()
+
 def get_admin_logs():
     """Get all admin login/logout logs"""
     conn = get_database_connection()
@@ -285,3 +718,69 @@ def add_admin(email, password):
         return False
     finally:
         conn.close()
+
+def build_search_query(text):
+    """Build an FTS5 query from search box text.
+
+    Text using FTS5 syntax (quotes, AND/OR/NOT, NEAR, prefix *) is passed
+    through; otherwise every word must match.
+    """
+    text = text.strip()
+    if re.search(r'"|\*|\b(AND|OR|NOT|NEAR)\b', text):
+        return text
+    terms = re.findall(r'\w+', text)
+    return ' AND '.join(f'"{term}"' for term in terms)
+
+def search_resumes(text, limit=20, min_experience_years=None):
+    """Full-text search over resume content, best bm25 matches first.
+
+    With min_experience_years only resumes whose experience dates add up to at
+    least that many years match; resumes saved before experience was stored
+    never do.
+    """
+    query = build_search_query(text)
+    if not query:
+        return []
+
+    conn = get_database_connection()
+    cursor = conn.cursor()
+    
+    try:
+        # The experience filter is applied before the limit, on the matches' resume_data rows
+        experience_filter, params = '', [query]
+        if min_experience_years:
+            experience_filter = '''
+            AND rowid IN (SELECT id FROM resume_data WHERE experience_months >= ?)'''
+            params.append(round(min_experience_years * 12))
+        params.append(limit)
+        # Weights: raw_text, summary, experience, projects
+        cursor.execute(f'''
+        WITH hits AS (
+            SELECT rowid, rank, snippet(resume_search, -1, '[', ']', '…', 12) AS snippet
+            FROM resume_search
+            WHERE resume_search MATCH ? AND rank MATCH 'bm25(1.0, 2.0, 1.5, 1.0)'{experience_filter}
+            ORDER BY rank
+            LIMIT ?
+        )
+        SELECT 
+            r.id,
+            r.name,
+            r.email,
+            r.target_role,
+            r.target_category,
+            a.ats_score,
+            hits.snippet,
+            hits.rank
+        FROM hits
+        JOIN resume_data r ON r.id = hits.rowid
+        LEFT JOIN resume_analysis a ON a.id = (
+            SELECT MAX(id) FROM resume_analysis WHERE resume_id = r.id
+        )
+        ORDER BY hits.rank
+        ''', params)
+        return cursor.fetchall()
+    except Exception as e:
+        print(f"Error searching resumes: {str(e)}")
+        return []
+    finally:
+        conn.close()
@@ -0,0 +1,141 @@
+"""
+Job role catalog
+
+Loads config/job_roles.json into an index by category and role;
+get_skill_matcher builds one skill matcher per list of required skills.
+Matchers are keyed by the skills rather than by role: analyzers only get a
+role's info dict, and an edited role simply maps to a new key, so there is
+nothing to invalidate on reload. The file is reloaded when its mtime
+changes, so edits made by another process or by hand are picked up without a
+restart, and every reload bumps the catalog version. Saving writes a
+temporary file and renames it over job_roles.json, so readers never see a
+partial file.
+"""
+import copy
+import json
+import os
+import stat
+import tempfile
+import threading
+from functools import lru_cache
+
+JOB_ROLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'job_roles.json')
+
+
+class StaleJobRolesError(Exception):
+    """Raised when the job roles changed since the caller read them"""
+
+
+class SkillMatcher:
+    """Matches a fixed list of skills against resume text"""
+
+    def __init__(self, skills):
+        self.skills = tuple(skills)
+        self.lowered = tuple(skill.lower() for skill in self.skills)
+
+    def match(self, resume_text):
+        """Same result as ResumeAnalyzer.calculate_keyword_match"""
+        resume_text = resume_text.lower()
+        found_skills = []
+        missing_skills = []
+        for skill, skill_lower in zip(self.skills, self.lowered):
+            if skill_lower in resume_text:
+                found_skills.append(skill)
+            else:
+                missing_skills.append(skill)
+
+        match_score = (len(found_skills) / len(self.skills)) * 100 if self.skills else 0
+        return {
+            'score': match_score,
+            'found_skills': found_skills,
+            'missing_skills': missing_skills
+        }
+
+
+@lru_cache(maxsize=256)
+def get_skill_matcher(skills):
+    """Shared matcher for a tuple of skills"""
+    return SkillMatcher(skills)
+
+
+class JobRoleCatalog:
+    """In-memory, hot-reloaded view of job_roles.json"""
+
+    def __init__(self, path=JOB_ROLES_PATH):
+        self.path = path
+        self.version = 0
+        self._lock = threading.RLock()
+        self._stamp = None
+        self._roles = {}
+        self._index = {}
+        self.refresh()
+
+    def refresh(self):
+        """Reload the file if it changed on disk; returns True if it was reloaded"""
+        file_stat = os.stat(self.path)
+        stamp = (file_stat.st_mtime_ns, file_stat.st_size)
+        if stamp == self._stamp:
+            return False
+        with self._lock:
+            if stamp == self._stamp:
+                return False
+            with open(self.path, 'r') as file:
+                roles = json.load(file)
+            self._roles = roles
+            self._index = {
+                (category, role): info
+                for category, category_roles in roles.items()
+                for role, info in category_roles.items()
+            }
+            self._stamp = stamp
+            self.version += 1
+            return True
+
+    def categories(self):
+        self.refresh()
+        return list(self._roles)
+
+    def roles(self, category):
+        self.refresh()
+        return list(self._roles.get(category, {}))
+
+    def get(self, category, role):
+        """The role's info dict, or None; treat it as read-only and save changes with update_role"""
+        self.refresh()
+        return self._index.get((category, role))
+
+    def as_dict(self):
+        """A copy of the whole {category: {role: info}} mapping"""
+        self.refresh()
+        return copy.deepcopy(self._roles)
+
+    def update_role(self, category, role, info, expected_version=None):
+        """Replace a role's info and save the file atomically.
+
+        If expected_version is given and the catalog changed since then (e.g. another
+        editor saved first), StaleJobRolesError is raised and nothing is written.
+        """
+        with self._lock:
+            self.refresh()
+            if expected_version is not None and expected_version != self.version:
+                raise StaleJobRolesError("The job roles were changed by someone else; reload and try again")
+            roles = copy.deepcopy(self._roles)
+            roles.setdefault(category, {})[role] = info
+            self._write(roles)
+            self.refresh()
+            return self.version
+
+    def _write(self, roles):
+        directory = os.path.dirname(self.path)
+        fd, tmp_path = tempfile.mkstemp(prefix='.job_roles-', suffix='.json', dir=directory)
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(self.path).st_mode))
+            with os.fdopen(fd, 'w') as file:
+                json.dump(roles, file, indent=4)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -10,46 +10,15 @@ st.set_page_config(
     layout="wide"
 )
 
-import json
-import pandas as pd
-import plotly.express as px
-# import traceback
-# from utils.resume_analyzer import ResumeAnalyzer
-# from utils.resume_builder import ResumeBuilder
-# from config.database import (
-#     get_database_connection, save_resume_data, save_analysis_data, 
-#     init_database, verify_admin, log_admin_action
-# )
-# from config.job_roles import JOB_ROLES # not using from .py but from .json
-import requests
 from streamlit_lottie import st_lottie
-import plotly.graph_objects as go
-from streamlit_option_menu import option_menu
-import base64
-import io
-from docx import Document
-from docx.shared import Inches, Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from datetime import datetime
-# from jobs.job_search import render_job_search
-# from PIL import Image
-# import utils.resume_analyzer as resume_analyzer
-# # from resume_analyser import extract_links_from_pdf, extract_links_from_docx, check_url_status
-# from utils.resume_analyzer import extract_links_from_pdf, extract_links_from_docx, check_url_status
-# from utils.multipleResumeAnalyzer import MultipleResumeAnalyzer
-
-
 
 # webpages
-from webpages.ui_components import (
-    apply_modern_styles, hero_section, feature_card, about_section, 
-    page_header, render_analytics_section, render_activity_section, 
-    render_suggestions_section, load_lottie_url
-)
-import webpages.homeView as hv
-import webpages.resumeAnalyzerView as rav
-import webpages.dashboardView as dbv
-import webpages.multiple_resume_analyzer_view as mrav
+# Page modules pull in pandas, plotly, PyPDF2 and docx, so each one is imported
+# on first navigation to its page rather than on every script run
+from webpages.ui_components import apply_css, load_lottie
+from utils.resources import registry
+
+SIDEBAR_ANIMATION_URL = "https://assets5.lottiefiles.com/packages/lf20_xyadoh9h.json"
 
 class ResumeAppMain:
     def __init__(self):
@@ -94,8 +63,6 @@ class ResumeAppMain:
         
         # Initialize dashboard manager
         # self.dashboard_manager = DashboardManager()
-        
-        self.analyzer = rav.ResumeAnalyzerView()
 
         # Initialize session state
         if 'user_id' not in st.session_state:
@@ -107,8 +74,7 @@ class ResumeAppMain:
         # init_database()
         
         # Load external CSS
-        with open('style/style.css') as f:
-            st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+        apply_css('style.css')
         
         # Load Google Fonts
         st.markdown("""
@@ -117,18 +83,23 @@ class ResumeAppMain:
         """, unsafe_allow_html=True)
 
     def render_home(self):
+        import webpages.homeView as hv
         home = hv.HomeView()
         home.homePage()
 
     def render_analyzer(self):
-        self.analyzer.resumeAnalyzerPage()
+        import webpages.resumeAnalyzerView as rav
+        analyzer = rav.ResumeAnalyzerView()
+        analyzer.resumeAnalyzerPage()
 
     def render_multipleResumeAnalyzer(self):
+        import webpages.multiple_resume_analyzer_view as mrav
         mulResumeAnalyzerView = mrav.MultipleResumeAnalyzerView()
         mulResumeAnalyzerView.main()
 
     def render_dashboard(self):
-        dashboardView = dbv.DashboardManager()
+        import webpages.dashboardView as dbv
+        dashboardView = registry.get('dashboard_manager', dbv.DashboardManager, close=dbv.DashboardManager.close)
         dashboardView.render_dashboard()
 
     def render_about(self):
@@ -137,7 +108,9 @@ class ResumeAppMain:
     def main(self):
         # Admin login/logout in sidebar
         with st.sidebar:
-            st_lottie(load_lottie_url("https://assets5.lottiefiles.com/packages/lf20_xyadoh9h.json"), height=200, key="sidebar_animation")
+            animation = load_lottie("sidebar_animation", SIDEBAR_ANIMATION_URL)
+            if animation:
+                st_lottie(animation, height=200, key="sidebar_animation")
             st.title("Smart Resume AI")
             st.markdown("---")
             
@@ -152,6 +125,10 @@ class ResumeAppMain:
             st.markdown("<br><br>", unsafe_allow_html=True)
             st.markdown("---")
 
+            if st.session_state.is_admin and 'rerun_resources' in st.session_state:
+                created = st.session_state.rerun_resources
+                st.caption(f"Last rerun created {created['objects']} objects and opened {created['connections']} connections")
+
         # Force home page on first load
         if 'initial_load' not in st.session_state:
             st.session_state.initial_load = True
@@ -177,5 +154,10 @@ class ResumeAppMain:
 
 
 if __name__ == "__main__":
-    app = ResumeAppMain()
-    app.main()
\ No newline at end of file
+    resources_before = registry.stats()
+    try:
+        app = ResumeAppMain()
+        app.main()
+    finally:
+        # st.rerun() ends a run with an exception, so record the counts either way
+        st.session_state.rerun_resources = registry.stats_since(resources_before)
\ No newline at end of file
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# The app imports its modules relative to the ATS folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """A fresh resume_data.db: the app opens it relative to the working directory"""
+    from config.database import init_database
+
+    monkeypatch.chdir(tmp_path)
+    init_database()
+    return tmp_path / 'resume_data.db'
@@ -0,0 +1,14 @@
+import webpages.ui_components as ui_components
+
+
+def test_sidebar_animation_is_loaded_from_the_committed_file(monkeypatch):
+    def no_download(*args, **kwargs):
+        raise AssertionError("the committed animation should not be downloaded")
+
+    monkeypatch.setattr(ui_components.requests, 'get', no_download)
+    monkeypatch.delenv('ATS_REFRESH_ASSETS', raising=False)
+    ui_components._load_lottie.clear()
+
+    animation = ui_components.load_lottie('sidebar_animation', 'https://example.com/sidebar_animation.json')
+    assert animation['w'] == animation['h'] == 200
+    assert [layer['nm'] for layer in animation['layers']] == ['Resume', 'Pulse']
@@ -0,0 +1,56 @@
+from config.database import get_database_connection
+from utils.batch_runner import BatchCheckpoint, BatchRunner
+
+
+def analysis(name):
+    return {'name': name, 'ats_score': 70, 'keyword_match': {'score': 50, 'missing_skills': []}}
+
+
+def items():
+    conn = get_database_connection()
+    try:
+        return conn.execute('SELECT path, status, resume_id FROM batch_items ORDER BY id').fetchall()
+    finally:
+        conn.close()
+
+
+def saved_ids():
+    conn = get_database_connection()
+    try:
+        return [row[0] for row in conn.execute('SELECT id FROM resume_data ORDER BY id')]
+    finally:
+        conn.close()
+
+
+def checkpoint(paths):
+    checkpoint = BatchCheckpoint('run', 'resumes/')
+    checkpoint.register([(path, 'Tech', 'Data Scientist') for path in paths])
+    return checkpoint
+
+
+def test_saved_items_are_marked_done_with_their_resumes(database):
+    run = checkpoint(['a.pdf', 'b.pdf'])
+    BatchRunner(llm_workers=1, job_roles={}).save(run, [
+        ('a.pdf', analysis('Ann'), 'Data Scientist', 'Tech', 'ann resume'),
+        ('b.pdf', analysis('Bob'), 'Data Scientist', 'Tech', 'bob resume')
+    ])
+    first, second = saved_ids()
+    assert items() == [('a.pdf', 'done', first), ('b.pdf', 'done', second)]
+    assert run.pending() == []
+
+
+def test_checkpoint_failure_rolls_back_the_resumes(database, monkeypatch):
+    run = checkpoint(['a.pdf'])
+
+    write_marks = run.write_marks
+
+    def crash_marking_done(cursor, updates):
+        if any(status == 'done' for _, status, _, _ in updates):
+            raise RuntimeError('crashed before the checkpoint')
+        write_marks(cursor, updates)
+
+    monkeypatch.setattr(run, 'write_marks', crash_marking_done)
+    BatchRunner(llm_workers=1, job_roles={}).save(run, [('a.pdf', analysis('Ann'), 'Data Scientist', 'Tech', 'ann')])
+    assert saved_ids() == []
+    assert items() == [('a.pdf', 'failed', None)]
+    assert run.pending(retry_failed=True) == [('a.pdf', 'Tech', 'Data Scientist')]
@@ -0,0 +1,76 @@
+import os
+
+import utils.candidate_index as candidate_index
+from config.database import get_database_connection
+from utils.candidate_index import CandidateIndex, index_vectors
+
+TEXTS = {
+    1: "python django postgres backend developer",
+    2: "kubernetes terraform aws devops engineer",
+    3: "react typescript css frontend developer",
+}
+
+
+def add_vectors(items):
+    conn = get_database_connection()
+    try:
+        with conn:
+            index_vectors(conn.cursor(), items)
+    finally:
+        conn.close()
+
+
+def tail_size():
+    conn = get_database_connection()
+    try:
+        return conn.execute('SELECT COUNT(*) FROM resume_vectors').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_compaction_moves_the_tail_into_a_segment(database, tmp_path):
+    add_vectors(TEXTS.items())
+    index = CandidateIndex(str(tmp_path / 'index'))
+    before = index.search("kubernetes aws", k=2)
+    assert before[0][0] == 2
+
+    assert index.compact(min_rows=1) == 3
+    assert tail_size() == 0
+    assert len(index.segments) == 1 and index.last_id == 3
+    assert index.search("kubernetes aws", k=2) == before
+
+
+def test_compaction_merges_segments_and_removes_the_old_ones(database, tmp_path, monkeypatch):
+    monkeypatch.setattr(candidate_index, 'MAX_SEGMENTS', 2)
+    index = CandidateIndex(str(tmp_path / 'index'))
+    for resume_id, text in TEXTS.items():
+        add_vectors([(resume_id, text)])
+        index.compact(min_rows=1)
+
+    assert len(index.segments) == 1
+    assert list(index.segments[0].ids) == [1, 2, 3]
+    assert sorted(os.listdir(tmp_path / 'index')) == sorted(
+        [os.path.basename(index.segments[0].path), 'manifest.json'])
+    assert index.search("react frontend", k=1)[0][0] == 3
+
+
+def test_search_starts_one_compaction_at_a_time(database, tmp_path, monkeypatch):
+    monkeypatch.setattr(candidate_index, 'TAIL_LIMIT', 1)
+    started = []
+    monkeypatch.setattr(candidate_index.threading, 'Thread', lambda **kwargs: started.append(kwargs) or Started())
+    add_vectors(TEXTS.items())
+    index = CandidateIndex(str(tmp_path / 'index'))
+
+    index.search("python backend")
+    index.search("python backend")
+    assert len(started) == 1
+
+    # Once the running compaction finishes, a large tail can start another one
+    started[0]['target']()
+    index.search("python backend")
+    assert len(started) == 2
+
+
+class Started:
+    def start(self):
+        pass
@@ -0,0 +1,42 @@
+import os
+
+import pandas as pd
+import pytest
+
+from config.database import save_analysis_results
+from webpages.dashboardView import DashboardManager
+
+
+@pytest.fixture
+def dashboard(database):
+    dashboard = DashboardManager()
+    yield dashboard
+    dashboard.close()
+
+
+def test_download_all_exports_every_resume(dashboard):
+    save_analysis_results([
+        ({'name': name, 'ats_score': 70, 'keyword_match': {'score': 50, 'missing_skills': []}}, 'Data Scientist',
+         'Tech', f'{name} resume')
+        for name in ('Ann', 'Bob')
+    ])
+    sheet = pd.read_excel(dashboard.download_all_excel())
+    assert len(sheet) == 2
+
+
+def test_failed_download_returns_a_workbook_stating_the_error(dashboard, monkeypatch):
+    def broken(chunk_size=None):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(dashboard, 'write_excel_export', broken)
+    sheet = pd.read_excel(dashboard.download_all_excel())
+    assert sheet.to_dict('records') == [{'Message': "The export failed: disk full"}]
+
+
+def test_download_over_the_limit_is_kept_on_the_server(dashboard, monkeypatch, tmp_path):
+    monkeypatch.setattr(DashboardManager, 'MAX_DOWNLOAD_MB', 0)
+    message = pd.read_excel(dashboard.download_all_excel())['Message'][0]
+
+    [name] = os.listdir(tmp_path / 'exports')
+    assert message.endswith(f"saved on the server as {os.path.join('exports', name)}")
+    assert pd.read_excel(tmp_path / 'exports' / name).empty
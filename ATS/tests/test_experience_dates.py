@@ -0,0 +1,36 @@
+from datetime import date
+
+from utils.experience_dates import experience_months, find_intervals, format_experience, month_index
+
+TODAY = date(2024, 6, 15)
+
+
+def test_month_index_formats():
+    assert month_index('Jan 2020') == 2020 * 12
+    assert month_index("Mar '21") == 2021 * 12 + 2
+    assert month_index('03/2021') == month_index('2021-03') == 2021 * 12 + 2
+    assert month_index('2019') == 2019 * 12
+    assert month_index('2019', end=True) == 2019 * 12 + 11
+    assert month_index('Present', today=TODAY) == 2024 * 12 + 5
+    assert month_index('Acme Corp') is None
+
+
+def test_overlapping_jobs_are_counted_once():
+    text = "Engineer, Acme  Jan 2020 - Dec 2021\nConsultant  Jun 2021 - Jun 2022"
+    assert experience_months(text, today=TODAY) == 30
+
+
+def test_ongoing_job_is_clipped_to_today():
+    assert experience_months("Developer  Jan 2024 - Present", today=TODAY) == 6
+    assert find_intervals("Developer  Jan 2024 - Dec 2030", today=TODAY) == [(2024 * 12, 2024 * 12 + 5)]
+
+
+def test_text_without_dates():
+    assert experience_months("Python, SQL, Kubernetes", today=TODAY) == 0
+    assert format_experience(30) == "2 years and 6 months"
+
+
+def test_range_separators():
+    for separator in (' - ', '-', ' -- ', '--', ' --- ', ' – ', ' – ', ' — ', ' ‒ ', ' − ', ' to ', ' until '):
+        assert experience_months(f"Developer  Jan 2020{separator}Present", today=TODAY) == 54, separator
+    assert experience_months("Analyst  2019 -- 2020", today=TODAY) == 24
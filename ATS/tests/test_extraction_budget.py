@@ -0,0 +1,41 @@
+from utils.extraction_budget import ExtractionBudget, truncation_message
+
+
+def test_page_limit():
+    budget = ExtractionBudget(max_pages=2, max_chars=1000, max_seconds=60)
+    text, truncation = budget.read(['one', 'two', 'three'], lambda page: page)
+    assert text == 'one\ntwo\n'
+    assert truncation == {'limit': 'pages', 'unit': 'pages', 'read': 2, 'total': 3, 'characters': len(text)}
+    assert truncation_message(truncation) == "Only the first 2 of 3 pages were analyzed (the page limit)."
+
+
+def test_character_limit():
+    budget = ExtractionBudget(max_pages=10, max_chars=8, max_seconds=60)
+    text, truncation = budget.read(['abcdef', 'ghijkl', 'mnopqr'], lambda page: page)
+    assert text == 'abcdef\ng'
+    assert truncation['limit'] == 'characters' and truncation['read'] == 2
+
+
+def test_within_budget_and_early_stop():
+    budget = ExtractionBudget(max_pages=10, max_chars=1000, max_seconds=60)
+    assert budget.read(['a', 'b'], lambda page: page) == ('a\nb\n', None)
+    text, truncation = budget.read(['a', 'b', 'c'], lambda page: page, stop=lambda index, text: index == 0)
+    assert (text, truncation) == ('a\n', None)
+    assert truncation_message(None) == ''
+
+
+def test_clip():
+    budget = ExtractionBudget(max_chars=5)
+    assert budget.clip('abc') == ('abc', None)
+    text, truncation = budget.clip('abcdefgh')
+    assert text == 'abcde'
+    assert truncation['total'] == 8
+    assert truncation_message(truncation) == "Only the first 5 of 8 characters were analyzed (the text length limit)."
+
+
+def test_environment_limits(monkeypatch):
+    monkeypatch.setenv('ATS_EXTRACT_MAX_PAGES', '3')
+    monkeypatch.setenv('ATS_EXTRACT_MAX_CHARS', 'lots')
+    budget = ExtractionBudget()
+    assert budget.max_pages == 3
+    assert budget.max_chars == 50000
@@ -0,0 +1,60 @@
+"""
+Startup import budget
+
+Imports main.py in a fresh interpreter with `-X importtime` and fails if the
+import takes longer than the budget (ATS_IMPORT_BUDGET_MS, default 1000) or
+loads a module that should only be imported once its page is opened.
+"""
+import os
+import subprocess
+import sys
+
+ATS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_MS = int(os.environ.get('ATS_IMPORT_BUDGET_MS', 1000))
+
+# Loaded lazily by the page that needs them; none of them may be imported at startup
+LAZY_MODULES = (
+    'pandas',
+    'PyPDF2',
+    'docx',
+    'webpages.resumeAnalyzerView',
+    'webpages.multiple_resume_analyzer_view',
+    'webpages.dashboardView',
+    'utils.resume_analyzer_controller',
+)
+
+
+def profile_imports(module='main'):
+    """Import module in a fresh interpreter; returns {name: (self us, cumulative us)}"""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ATS_DIR, capture_output=True, text=True
+    )
+    assert completed.returncode == 0, f"Importing {module} failed:\n{completed.stderr}"
+
+    timings = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def slowest(timings, top=10):
+    return '\n'.join(
+        f"  {self_us / 1000:8.1f}ms  {name}"
+        for name, (self_us, _) in sorted(timings.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    )
+
+
+def test_main_imports_within_budget():
+    timings = profile_imports()
+    total_ms = timings['main'][1] / 1000
+    assert total_ms <= BUDGET_MS, f"import main took {total_ms:.0f}ms (budget {BUDGET_MS}ms):\n{slowest(timings)}"
+
+
+def test_pages_are_imported_lazily():
+    timings = profile_imports()
+    eager = [name for name in LAZY_MODULES if name in timings]
+    assert not eager, f"imported at startup: {', '.join(eager)}"
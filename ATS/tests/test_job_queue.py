@@ -0,0 +1,87 @@
+import utils.job_queue as job_queue
+from config.database import get_database_connection
+from utils.job_queue import cancel_jobs, enqueue_analysis, fail_job, finish_job, get_jobs, lease_job
+
+ROLE = {'description': "Builds models", 'required_skills': ['Python']}
+RESULT = {'document_type': 'resume', 'name': 'Ann', 'ats_score': 70,
+          'keyword_match': {'score': 100, 'missing_skills': []}}
+
+
+def enqueue(text='ann resume', **options):
+    return enqueue_analysis(ROLE, 'Tech', 'Data Scientist', raw_text=text, **options)
+
+
+def saved_resumes():
+    conn = get_database_connection()
+    try:
+        return conn.execute('SELECT COUNT(*) FROM resume_data').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_leased_job_is_finished_and_saved(database):
+    job_id = enqueue(reuse_duplicates=False)
+    job = lease_job('worker-1')
+    assert (job['id'], job['raw_text'], job['role_info'], job['attempts']) == (job_id, 'ann resume', ROLE, 1)
+    assert job['reuse_duplicates'] is False
+    assert lease_job('worker-2') is None
+
+    assert finish_job(job, 'worker-1', RESULT, job['raw_text'])
+    done = get_jobs([job_id])[job_id]
+    assert done['status'] == 'done' and done['result'] == RESULT and done['resume_id'] is not None
+    assert saved_resumes() == 1
+
+
+def test_failed_job_is_retried_until_max_attempts(database, monkeypatch):
+    monkeypatch.setattr(job_queue, 'RETRY_BASE_DELAY', 0)
+    job_id = enqueue(max_attempts=2)
+
+    fail_job(lease_job('worker-1')['id'], 'worker-1', "LLM timed out")
+    assert get_jobs([job_id])[job_id]['status'] == 'queued'
+
+    job = lease_job('worker-2')
+    assert job['attempts'] == 2
+    fail_job(job['id'], 'worker-2', "LLM timed out again")
+    failed = get_jobs([job_id])[job_id]
+    assert (failed['status'], failed['error']) == ('failed', "LLM timed out again")
+    assert lease_job('worker-1') is None
+
+
+def test_retry_waits_for_the_backoff(database, monkeypatch):
+    monkeypatch.setattr(job_queue, 'RETRY_BASE_DELAY', 3600)
+    job_id = enqueue()
+    fail_job(lease_job('worker-1')['id'], 'worker-1', "LLM timed out")
+    assert get_jobs([job_id])[job_id]['status'] == 'queued'
+    assert lease_job('worker-1') is None
+
+
+def test_identical_jobs_share_one_analysis_and_resume(database):
+    first, second = enqueue(), enqueue()
+    other = enqueue('bob resume')
+
+    job = lease_job('worker-1')
+    assert job['id'] == first
+    # The identical job waits for the running one; other work is still handed out
+    assert lease_job('worker-2')['id'] == other
+
+    assert finish_job(job, 'worker-1', RESULT, job['raw_text'])
+    jobs = get_jobs([first, second])
+    assert jobs[first]['status'] == jobs[second]['status'] == 'done'
+    assert jobs[first]['resume_id'] == jobs[second]['resume_id']
+    assert jobs[second]['result'] == RESULT
+    assert saved_resumes() == 1
+
+
+def test_results_of_cancelled_or_lost_jobs_are_dropped(database):
+    cancelled = enqueue('ann resume')
+    job = lease_job('worker-1')
+    assert cancel_jobs([cancelled]) == 1
+    assert not finish_job(job, 'worker-1', RESULT, job['raw_text'])
+
+    enqueue('bob resume')
+    expired = lease_job('worker-1', visibility_timeout=-1)
+    taken_over = lease_job('worker-2')
+    assert taken_over['id'] == expired['id'] and taken_over['attempts'] == 2
+    assert not finish_job(expired, 'worker-1', RESULT, expired['raw_text'])
+    assert saved_resumes() == 0
+    assert get_jobs([cancelled])[cancelled]['status'] == 'cancelled'
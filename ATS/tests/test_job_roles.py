@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from config.job_roles import JobRoleCatalog, StaleJobRolesError, get_skill_matcher
+
+ROLES = {'Tech': {'Data Scientist': {'description': "Builds models", 'required_skills': ['Python', 'SQL']}}}
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = tmp_path / 'job_roles.json'
+    path.write_text(json.dumps(ROLES))
+    return JobRoleCatalog(str(path))
+
+
+def test_update_role_saves_and_bumps_the_version(catalog):
+    version = catalog.version
+    info = {'description': "Builds models", 'required_skills': ['Python', 'Spark']}
+    new_version = catalog.update_role('Tech', 'Data Scientist', info, expected_version=version)
+
+    assert new_version == catalog.version > version
+    assert catalog.get('Tech', 'Data Scientist') == info
+    assert JobRoleCatalog(catalog.path).get('Tech', 'Data Scientist') == info
+
+
+def test_update_role_with_a_stale_version_writes_nothing(catalog):
+    version = catalog.version
+    catalog.update_role('Tech', 'Analyst', {'required_skills': ['Excel']}, expected_version=version)
+
+    with pytest.raises(StaleJobRolesError):
+        catalog.update_role('Tech', 'Data Scientist', {'required_skills': []}, expected_version=version)
+    with open(catalog.path) as file:
+        saved = json.load(file)
+    assert saved['Tech']['Data Scientist'] == ROLES['Tech']['Data Scientist']
+    assert saved['Tech']['Analyst'] == {'required_skills': ['Excel']}
+
+
+def test_edits_by_another_writer_are_picked_up(catalog):
+    other = JobRoleCatalog(catalog.path)
+    version = catalog.version
+    other.update_role('Tech', 'Data Scientist', {'required_skills': ['R']})
+
+    assert catalog.get('Tech', 'Data Scientist') == {'required_skills': ['R']}
+    assert catalog.version > version
+    with pytest.raises(StaleJobRolesError):
+        catalog.update_role('Tech', 'Analyst', {}, expected_version=version)
+
+
+def test_skill_matchers_are_shared_per_skill_list():
+    matcher = get_skill_matcher(('Python', 'SQL'))
+    assert get_skill_matcher(('Python', 'SQL')) is matcher
+    assert matcher.match("python and pandas") == {
+        'score': 50.0, 'found_skills': ['Python'], 'missing_skills': ['SQL']
+    }
@@ -0,0 +1,77 @@
+from config.database import save_analysis_results
+from utils.near_duplicates import BANDS, NUM_PERM, band_buckets, minhash_signature, shingles, similarity
+from utils.resume_analyzer_controller import ResumeAnalyzer, reuse_analysis
+from utils.resume_indexes import RESUME_INDEXERS
+
+RESUME = ("Backend engineer with six years of experience building data pipelines in Python and SQL, "
+          "deploying services on Kubernetes with Terraform and leading a team of four developers. ") * 3
+
+
+def test_shingles():
+    assert shingles('') == set()
+    assert shingles('One two') == {'one two'}
+    assert shingles('a b c d e f', size=5) == {'a b c d e', 'b c d e f'}
+
+
+def test_signature_is_deterministic():
+    signature = minhash_signature(RESUME)
+    assert signature.shape == (NUM_PERM,)
+    assert (signature == minhash_signature(RESUME)).all()
+    assert minhash_signature('   ') is None
+
+
+def test_similarity_of_near_and_unrelated_texts():
+    signature = minhash_signature(RESUME)
+    edited = minhash_signature(RESUME.replace('four', 'five', 1))
+    unrelated = minhash_signature("Registered nurse caring for patients in a busy emergency department " * 3)
+    assert similarity(signature, signature) == 1.0
+    assert similarity(signature, edited) > 0.7
+    assert similarity(signature, unrelated) < 0.2
+
+
+def test_identical_texts_share_every_band():
+    buckets = band_buckets(minhash_signature(RESUME))
+    assert len(buckets) == BANDS
+    assert buckets == band_buckets(minhash_signature(RESUME))
+
+
+def test_reused_analysis_keeps_this_resumes_personal_info():
+    prior = {
+        'name': 'Ann Smith', 'email': 'ann@example.com', 'phone': '555 123 4567', 'linkedin': 'linkedin.com/in/ann',
+        'github': '', 'portfolio': '', 'ats_score': 80,
+        'contact_suggestions': [], 'skills_suggestions': ["Add a dedicated skills section"],
+        'suggestions': ["Add a dedicated skills section"],
+        'section_scores': {'contact': 100, 'skills': 50}
+    }
+    personal_info = {'name': 'Bob Jones', 'email': 'bob@example.com', 'phone': '', 'linkedin': '', 'github': '',
+                     'portfolio': ''}
+    analysis = reuse_analysis(prior, personal_info, {'resume_id': 7, 'similarity': 0.93})
+
+    assert {key: analysis[key] for key in personal_info} == personal_info
+    assert analysis['ats_score'] == 80
+    assert analysis['contact_suggestions'] == ["Add your phone number", "Add your LinkedIn profile URL"]
+    assert analysis['suggestions'] == analysis['contact_suggestions'] + ["Add a dedicated skills section"]
+    assert analysis['section_scores'] == {'contact': 50, 'skills': 50}
+    assert analysis['near_duplicate'] == {'resume_id': 7, 'similarity': 0.93, 'reused': True}
+    assert prior['name'] == 'Ann Smith'
+
+
+SECTIONS = ("Summary\n" + RESUME + "\nExperience\nSenior Developer, Acme 2019 - 2024\n- Developed and managed APIs\n"
+            "Education\nBachelor of Science in Computer Science, 2018\nSkills\nPython, SQL, Kubernetes, Terraform\n")
+
+
+def test_reuse_can_be_turned_off(database):
+    analyzer = ResumeAnalyzer()
+    role = {'description': "Backend engineer", 'required_skills': ['Python', 'SQL']}
+    first_text = "Ann Smith\nann@example.com\n" + SECTIONS
+    first = analyzer.analyze_resume({'raw_text': first_text}, role, scoring_mode='local')
+    save_analysis_results([(first, 'Backend Developer', 'Tech', first_text)], RESUME_INDEXERS)
+
+    text = "Bob Jones\nbob@example.com\n" + SECTIONS
+    reused = analyzer.analyze_resume({'raw_text': text}, role, scoring_mode='local')
+    assert reused['near_duplicate']['reused']
+    assert (reused['name'], reused['email']) == ('Bob Jones', 'bob@example.com')
+
+    fresh = analyzer.analyze_resume({'raw_text': text}, role, reuse_duplicates=False, scoring_mode='local')
+    assert not fresh['near_duplicate']['reused']
+    assert (fresh['name'], fresh['email']) == ('Bob Jones', 'bob@example.com')
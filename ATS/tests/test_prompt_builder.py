@@ -0,0 +1,64 @@
+from utils.prompt_builder import compact_instructions, compact_text, estimate_tokens, measure, resume_excerpt
+
+RESUME = """JANE DOE
+jane@example.com
+
+SUMMARY
+Backend engineer building data pipelines.
+
+SKILLS
+Python, SQL, Kubernetes, Terraform
+
+EXPERIENCE
+Engineer, Acme  Jan 2020 - Present
+- Built the ingestion service
+- Cut cloud costs by a third
+
+EDUCATION
+B.Tech Computer Science, XYZ University, 2015 - 2019
+"""
+
+
+def test_compact_text_removes_extraction_artifacts():
+    text = "P R O F I L E\nData engi-\nneer\n\n\n\nPage 1 of 2\nACME CV\nx\nACME CV\ny\nACME CV\n"
+    assert compact_text(text) == "PROFILE\nData engineer\n\nACME CV\nx\ny"
+
+
+def test_compact_instructions():
+    assert compact_instructions("\n    Rate it:\n\n\n\n      - skills   first  \n") == "Rate it:\n\n- skills first"
+
+
+def test_estimate_tokens_counts_words_and_breaks():
+    assert estimate_tokens('') == 0
+    assert estimate_tokens('a b') == 2
+    assert estimate_tokens('a\nb') == 3
+    assert estimate_tokens('internationalization') == 1 + (len('internationalization') - 1) // 6
+
+
+def test_resume_that_fits_is_not_trimmed():
+    excerpt, trimmed = resume_excerpt(RESUME, 10000)
+    assert excerpt == compact_text(RESUME)
+    assert trimmed is None
+
+
+def test_trimmed_resume_keeps_priority_sections():
+    excerpt, trimmed = resume_excerpt(RESUME, 40, priority=('skills', 'experience'))
+    assert trimmed['kept_tokens'] <= 40 < trimmed['tokens']
+    assert 'Kubernetes' in excerpt
+    assert 'XYZ University' not in excerpt
+
+
+def test_single_long_line_is_cut_at_a_word():
+    excerpt, trimmed = resume_excerpt('word ' * 5000, 300)
+    assert excerpt.startswith('word word')
+    assert 0 < trimmed['kept_tokens'] <= 300
+
+
+def test_measure_compares_with_the_untruncated_text():
+    from utils.resume_analyzer_controller import ResumeAnalyzer
+
+    long_resume = RESUME + "\nPROJECTS\n" + "- Migrated a reporting service to Kubernetes\n" * 2000
+    old_short, _ = measure(ResumeAnalyzer(), [RESUME], {'required_skills': ['Python']})
+    old_long, new_long = measure(ResumeAnalyzer(), [long_resume], {'required_skills': ['Python']})
+    assert old_long - old_short == estimate_tokens(long_resume) - estimate_tokens(RESUME)
+    assert new_long < old_long
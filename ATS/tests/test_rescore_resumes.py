@@ -0,0 +1,70 @@
+import json
+
+import utils.rescore_resumes as rescore_resumes
+from config.database import RESUME_PAYLOAD_VERSION, encode_payload, get_database_connection, get_resume_payload, save_analysis_results
+from utils.rescore_resumes import rescore_resume, write_scores
+
+TEXT = "Experience\nBuilt data pipelines in Python and SQL\nEducation\nBSc Computer Science\nSkills\nPython, SQL"
+
+
+def analysis_rows(conn, resume_id):
+    return conn.execute('''
+    SELECT ats_score, keyword_match_score, missing_skills, section_score, format_score
+    FROM resume_analysis WHERE resume_id = ? ORDER BY id
+    ''', (resume_id,)).fetchall()
+
+
+def test_write_scores_updates_only_the_latest_analysis(database):
+    [resume_id] = save_analysis_results([
+        ({'name': 'Ann', 'ats_score': 60, 'keyword_match': {'score': 40, 'missing_skills': []}}, 'Data Scientist',
+         'Tech', TEXT)
+    ])
+    conn = get_database_connection()
+    try:
+        with conn:
+            conn.execute('''
+            INSERT INTO resume_analysis (resume_id, ats_score, keyword_match_score, format_score, section_score)
+            VALUES (?, 65, 45, 80, 70)
+            ''', (resume_id,))
+        write_scores(conn, [
+            {'resume_id': resume_id, 'keyword_match_score': 100.0, 'missing_skills': '[]', 'section_score': 90,
+             'format_score': 95, 'ats_score': 88, 'analysis': encode_payload({'ats_score': 88})}
+        ])
+        rows = analysis_rows(conn, resume_id)
+    finally:
+        conn.close()
+
+    assert rows[0][:2] == (60, 40)
+    assert rows[1] == (88, 100.0, '[]', 90, 95)
+    assert get_resume_payload(resume_id)['analysis'] == {'ats_score': 88}
+
+
+def test_write_scores_keeps_the_ats_score_when_none_is_given(database):
+    [resume_id] = save_analysis_results([
+        ({'name': 'Ann', 'ats_score': 60, 'keyword_match': {'score': 40, 'missing_skills': []}}, 'Data Scientist',
+         'Tech', TEXT)
+    ])
+    conn = get_database_connection()
+    try:
+        write_scores(conn, [{'resume_id': resume_id, 'keyword_match_score': 50.0, 'missing_skills': '["SQL"]',
+                             'section_score': 90, 'format_score': 95, 'ats_score': None, 'analysis': None}])
+        [row] = analysis_rows(conn, resume_id)
+    finally:
+        conn.close()
+    assert row == (60, 50.0, '["SQL"]', 90, 95)
+    assert get_resume_payload(resume_id)['analysis']['ats_score'] == 60
+
+
+def test_rescore_skips_resumes_whose_role_is_gone(monkeypatch):
+    roles = {'Tech': {'Data Scientist': {'required_skills': ['Python', 'SQL']}}}
+    monkeypatch.setattr(rescore_resumes, '_job_roles', roles)
+    monkeypatch.setattr(rescore_resumes, '_analyzer', rescore_resumes.ResumeAnalyzer())
+    monkeypatch.setattr(rescore_resumes, '_with_llm', False)
+    analysis = encode_payload({'ats_score': 70, 'score_source': 'llm'})
+
+    result = rescore_resume((1, 'Tech', 'Data Scientist', RESUME_PAYLOAD_VERSION, encode_payload(TEXT), analysis))
+    assert result['keyword_match_score'] == 100
+    assert json.loads(result['missing_skills']) == []
+
+    skipped = rescore_resume((2, 'Tech', 'Retired Role', RESUME_PAYLOAD_VERSION, encode_payload(TEXT), analysis))
+    assert skipped == {'resume_id': 2, 'skipped': "role 'Retired Role' (Tech) is not in job_roles.json"}
@@ -0,0 +1,42 @@
+from config.database import get_database_connection, get_resume_payload, save_analysis_results
+
+
+def analysis(name, score=70):
+    return {'name': name, 'email': f'{name.lower()}@example.com', 'ats_score': score, 'skills': ['Python'],
+            'keyword_match': {'score': 50, 'missing_skills': ['SQL']}}
+
+
+def count(table):
+    conn = get_database_connection()
+    try:
+        return conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_results_are_saved_together_in_order(database):
+    ids = save_analysis_results([
+        (analysis('Ann'), 'Data Scientist', 'Tech', 'ann resume'),
+        (analysis('Bob', 55), 'Data Scientist', 'Tech', 'bob resume')
+    ])
+    assert ids == [ids[0], ids[0] + 1]
+    assert count('resume_data') == count('resume_analysis') == count('resume_payloads') == 2
+    payload = get_resume_payload(ids[1])
+    assert payload['raw_text'] == 'bob resume'
+    assert payload['analysis']['ats_score'] == 55
+
+
+def test_reused_near_duplicate_is_not_saved_again(database):
+    [first] = save_analysis_results([(analysis('Ann'), 'Data Scientist', 'Tech', 'ann resume')])
+    reused = {**analysis('Ann'), 'near_duplicate': {'resume_id': first, 'similarity': 0.95, 'reused': True}}
+    ids = save_analysis_results([(reused, 'Data Scientist', 'Tech', 'ann resume'),
+                                 (analysis('Bob'), 'Data Scientist', 'Tech', 'bob resume')])
+    assert ids == [first, first + 1]
+    assert count('resume_data') == 2
+
+
+def test_failed_batch_saves_nothing(database):
+    broken = {**analysis('Bob'), 'keyword_match': {'score': 50, 'missing_skills': object()}}
+    assert save_analysis_results([(analysis('Ann'), 'Data Scientist', 'Tech', 'ann resume'),
+                                  (broken, 'Data Scientist', 'Tech', 'bob resume')]) is None
+    assert count('resume_data') == 0
@@ -0,0 +1,46 @@
+from utils.section_segmenter import detect_header, section_entries, segment_resume
+
+RESUME = """Jane Doe
+jane@example.com
+PROFESSIONAL SUMMARY
+Backend engineer.
+Skills: Python, SQL
+Work Experience
+Engineer, Acme
+Jan 2020 - Present
+- Built the ingestion service
+- Cut cloud costs
+EDUCATION
+B.Tech Computer Science, 2015 - 2019
+Hobbies
+Chess
+"""
+
+
+def test_detect_header():
+    assert detect_header('Work Experience') == ('experience', '')
+    assert detect_header('• EDUCATION:') == ('education', '')
+    assert detect_header('Skills: Python, SQL') == ('skills', 'Python, SQL')
+    assert detect_header('Engineer, Acme') is None
+    assert detect_header('Experience in 2020 with many large distributed systems projects') is None
+
+
+def test_segment_resume():
+    segmentation = segment_resume(RESUME)
+    assert segmentation.found == {'summary', 'skills', 'experience', 'education'}
+    assert segmentation.confident
+    assert segmentation.section_text('skills') == 'Python, SQL'
+    # The hobbies header ends the education section
+    assert segmentation.section_text('education') == 'B.Tech Computer Science, 2015 - 2019'
+    assert segmentation.entries('experience') == [
+        'Engineer, Acme Jan 2020 - Present • Built the ingestion service • Cut cloud costs'
+    ]
+
+
+def test_too_few_sections_are_not_confident():
+    segmentation = segment_resume("Jane Doe\nSkills\nPython\n")
+    assert not segmentation.confident
+
+
+def test_blank_line_ends_an_entry():
+    assert section_entries(['Project A', '', 'Project B']) == ['Project A', 'Project B']
@@ -0,0 +1,48 @@
+import json
+import os
+
+from config.job_roles import JobRoleCatalog
+from utils.semantic_match import SemanticMatcher
+
+ROLES = {
+    'Tech': {
+        'Data Scientist': {'description': "Builds machine learning models and statistical analyses",
+                           'required_skills': ['Python', 'Pandas', 'Machine Learning']},
+        'Frontend Developer': {'description': "Builds responsive web interfaces",
+                               'required_skills': ['JavaScript', 'React', 'CSS']}
+    }
+}
+RESUME = "Data analyst training machine learning models in Python with pandas and scikit-learn"
+
+
+def matcher(tmp_path):
+    path = tmp_path / 'job_roles.json'
+    path.write_text(json.dumps(ROLES))
+    return SemanticMatcher(JobRoleCatalog(str(path)), cache_dir=str(tmp_path / 'cache'))
+
+
+def test_resume_ranks_the_matching_role_first(tmp_path):
+    semantic = matcher(tmp_path)
+    [data] = semantic.score_batch([RESUME], ROLES['Tech']['Data Scientist'])
+    frontend = semantic.score(RESUME, ROLES['Tech']['Frontend Developer'])
+    assert 0 <= frontend < data <= 100
+    assert semantic.rank_roles(RESUME, top_k=1)[0][:2] == ('Tech', 'Data Scientist')
+
+
+def test_model_is_cached_and_refitted_when_roles_change(tmp_path):
+    semantic = matcher(tmp_path)
+    model = semantic.model()
+    assert semantic.model() is model
+    assert len(os.listdir(tmp_path / 'cache')) == 1
+    # A new matcher (a restarted process) loads the pickled model instead of refitting
+    assert matcher(tmp_path).model()[2] == model[2]
+    assert len(os.listdir(tmp_path / 'cache')) == 1
+
+    semantic.catalog.update_role('Tech', 'Designer', {'description': "Designs user interfaces in Figma"})
+    assert ('Tech', 'Designer') in semantic.model()[2]
+    assert len(os.listdir(tmp_path / 'cache')) == 2
+
+
+def test_unsaved_role_is_vectorized_on_the_fly(tmp_path):
+    edited = dict(ROLES['Tech']['Data Scientist'], required_skills=['Python', 'Scikit-learn'])
+    assert matcher(tmp_path).score(RESUME, edited) > 0
@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+
+from utils.single_flight import SingleFlight, request_key
+
+
+def wait_until(condition, timeout=5):
+    """Whether condition() became true within timeout seconds"""
+    pause = threading.Event()
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return True
+        pause.wait(0.01)
+    return condition()
+
+
+def test_request_key():
+    role = {'required_skills': ['Python']}
+    assert request_key('resume', role) == request_key(b'resume', role)
+    assert request_key('resume', role) != request_key('resume', {'required_skills': ['SQL']})
+    assert request_key('resume', role, 'llm') != request_key('resume', role, 'local')
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {'score': 80}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do('key', compute)))
+    leader.start()
+    assert started.wait(5)
+    waiter = threading.Thread(target=lambda: results.append(flight.do('key', compute)))
+    waiter.start()
+    assert wait_until(lambda: flight.coalesced == 1)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+    assert not leader.is_alive() and not waiter.is_alive()
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True]
+    assert [result for result, _ in results] == [{'score': 80}, {'score': 80}]
+    # The waiter gets a copy, not the leader's object
+    assert results[0][0] is not results[1][0]
+    assert flight.in_flight() == 0
+
+
+def test_exception_is_raised_and_later_calls_run_again():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError('no answer')
+
+    with pytest.raises(ValueError):
+        flight.do('key', fail)
+    assert flight.do('key', lambda: 1) == (1, False)
+
+
+def test_waiter_times_out():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    leader = threading.Thread(target=flight.do, args=('key', lambda: started.set() or release.wait(5)))
+    leader.start()
+    assert started.wait(5)
+    with pytest.raises(TimeoutError):
+        flight.do('key', lambda: None, timeout=0.05)
+    release.set()
+    leader.join(5)
+    assert not leader.is_alive()
@@ -0,0 +1,71 @@
+import sqlite3
+
+import numpy as np
+
+from utils.skill_bits import encode, num_words, popcount, skill_key, skill_mask, sync_dictionary
+
+KEYS = ['python', 'sql', 'machine learning']
+
+
+def test_skill_key():
+    assert skill_key('  Machine   Learning ') == 'machine learning'
+
+
+def test_num_words():
+    assert num_words(0) == 1
+    assert num_words(64) == 1
+    assert num_words(65) == 2
+
+
+def test_encode_and_popcount():
+    bits = encode("Python and Machine Learning", KEYS)
+    assert bits.dtype == np.uint64
+    assert int(bits[0]) == 0b101
+    assert popcount(bits[None, :])[0] == 2
+    assert int(encode(None, KEYS)[0]) == 0
+
+
+def test_bits_beyond_the_first_word():
+    keys = [f'skill{i:03d}' for i in range(70)]
+    bits = encode('skill069', keys)
+    assert len(bits) == 2
+    assert int(bits[1]) == 1 << 5
+
+
+def test_skill_mask_reports_unknown_skills():
+    positions = {key: bit for bit, key in enumerate(KEYS)}
+    mask, unknown = skill_mask(['SQL', 'Rust'], positions, 1)
+    assert int(mask[0]) == 0b10
+    assert unknown == ['Rust']
+
+
+def test_sync_dictionary_appends_new_skills():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE skill_dictionary (bit INTEGER PRIMARY KEY, skill TEXT NOT NULL)')
+    assert sync_dictionary(conn.cursor(), ['Python', 'SQL']) == [(0, 'Python'), (1, 'SQL')]
+    # Existing bits keep their skill; case variants share it
+    assert sync_dictionary(conn.cursor(), ['sql', 'Go']) == [(0, 'Python'), (1, 'SQL'), (2, 'Go')]
+
+
+def test_refresh_reloads_rows_rewritten_by_a_backfill(database):
+    from config.database import build_resume_records, get_database_connection, save_resume_batch
+    from utils.skill_bits import SkillBitsets, index_skill_bits
+
+    records = [build_resume_records({'name': name}, 'Data Scientist', 'Tech', raw_text=text)
+               for name, text in (('A', 'python and sql'), ('B', 'python and rust'))]
+    ids = save_resume_batch(records)
+    conn = get_database_connection()
+    with conn:
+        sync_dictionary(conn.cursor(), ['Python', 'SQL'])
+        index_skill_bits(conn.cursor(), list(zip(ids, ['python and sql', 'python and rust'])))
+    bitsets = SkillBitsets()
+    assert bitsets.role_fit(['Python', 'Rust'])['with_all'] == 0
+
+    # A backfill after the dictionary grew rewrites the same rows in place
+    with conn:
+        sync_dictionary(conn.cursor(), ['Python', 'SQL', 'Rust'])
+        index_skill_bits(conn.cursor(), list(zip(ids, ['python and sql', 'python and rust'])))
+    conn.close()
+    fit = bitsets.role_fit(['Python', 'Rust'])
+    assert fit['with_all'] == 1
+    assert fit['unknown_skills'] == []
@@ -0,0 +1,253 @@
+"""
+Headless bulk resume analysis
+
+Analyzes every resume in a directory or manifest without the Streamlit UI,
+using a process pool for text extraction and a thread pool for the LLM-bound
+analysis. Progress is checkpointed in the batch_runs/batch_items tables, so
+re-running the same command after a crash resumes where it stopped. Results
+are saved in batches, one transaction per --save-batch-size files. Run from the
+ATS folder:
+
+    python -m utils.batch_runner resumes/ --category "Software Development and Engineering" \
+        --role "Backend Developer" --extract-workers 8 --llm-workers 4
+
+Add --fast to score every resume locally, without LLM calls, for a quick triage.
+
+A manifest is a .txt file with one path per line, a .csv file with a path
+column, or a .jsonl file with a "path" key; CSV/JSONL entries may override
+the role with "category" and "role" values.
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from config.job_roles import JobRoleCatalog
+from config.database import get_database_connection, init_database, save_analysis_results
+from utils.resume_analyzer_controller import ResumeAnalyzer
+from utils.resume_indexes import RESUME_INDEXERS
+
+RESUME_EXTENSIONS = ('.pdf', '.docx')
+
+
+def extract_text(path):
+    """Extract the text of one resume file within the extraction budget; runs in an extraction
+    worker process and returns (text, truncation)"""
+    return ResumeAnalyzer().extract_path(path)
+
+
+def read_source(source, category, role):
+    """List (path, category, role) entries from a directory or manifest file"""
+    if os.path.isdir(source):
+        entries = []
+        for root, _, files in os.walk(source):
+            for name in sorted(files):
+                if name.lower().endswith(RESUME_EXTENSIONS):
+                    entries.append((os.path.abspath(os.path.join(root, name)), category, role))
+        return entries
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    if source.endswith('.csv'):
+        with open(source, newline='') as file:
+            records = list(csv.DictReader(file))
+    elif source.endswith('.jsonl'):
+        with open(source) as file:
+            records = [json.loads(line) for line in file if line.strip()]
+    else:
+        with open(source) as file:
+            records = [{'path': line.strip()} for line in file if line.strip()]
+
+    return [
+        (os.path.abspath(os.path.join(base_dir, record['path'])),
+         record.get('category') or category,
+         record.get('role') or role)
+        for record in records
+    ]
+
+
+class BatchCheckpoint:
+    """Tracks the status of every file of a named run in SQLite"""
+
+    def __init__(self, run_name, source):
+        self.conn = get_database_connection()
+        with self.conn:
+            self.conn.execute('INSERT OR IGNORE INTO batch_runs (name, source) VALUES (?, ?)', (run_name, source))
+        self.run_id = self.conn.execute('SELECT id FROM batch_runs WHERE name = ?', (run_name,)).fetchone()[0]
+
+    def register(self, entries):
+        """Add files not seen before in this run as pending"""
+        with self.conn:
+            self.conn.executemany('''
+            INSERT OR IGNORE INTO batch_items (run_id, path, target_category, target_role)
+            VALUES (?, ?, ?, ?)
+            ''', [(self.run_id, path, category, role) for path, category, role in entries])
+
+    def pending(self, retry_failed=False):
+        """Get (path, category, role) of the files still to process"""
+        statuses = ('pending', 'failed') if retry_failed else ('pending',)
+        return self.conn.execute(f'''
+        SELECT path, target_category, target_role
+        FROM batch_items
+        WHERE run_id = ? AND status IN ({', '.join('?' * len(statuses))})
+        ORDER BY id
+        ''', (self.run_id, *statuses)).fetchall()
+
+    def mark(self, path, status, resume_id=None, error=None):
+        self.mark_many([(path, status, resume_id, error)])
+
+    def mark_many(self, updates):
+        """Record many (path, status, resume_id, error) updates in one transaction"""
+        with self.conn:
+            self.write_marks(self.conn.cursor(), updates)
+
+    def write_marks(self, cursor, updates):
+        """Record (path, status, resume_id, error) updates with cursor, in the caller's transaction"""
+        cursor.executemany('''
+        UPDATE batch_items
+        SET status = ?, resume_id = ?, error = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE run_id = ? AND path = ?
+        ''', [(status, resume_id, error, self.run_id, path) for path, status, resume_id, error in updates])
+
+    def summary(self):
+        return dict(self.conn.execute('''
+        SELECT status, COUNT(*) FROM batch_items WHERE run_id = ? GROUP BY status
+        ''', (self.run_id,)).fetchall())
+
+    def close(self):
+        self.conn.close()
+
+
+class BatchRunner:
+    """Runs extraction and analysis for a batch of resume files concurrently"""
+
+    def __init__(self, job_roles, extract_workers=None, llm_workers=2, save_batch_size=50, scoring_mode=None,
+                 reuse_duplicates=True):
+        self.job_roles = job_roles
+        self.extract_workers = extract_workers or os.cpu_count()
+        self.llm_workers = llm_workers
+        self.save_batch_size = save_batch_size
+        self.scoring_mode = scoring_mode
+        self.reuse_duplicates = reuse_duplicates
+        self.analyzer = ResumeAnalyzer()
+
+    def analyze(self, text, role_info, truncation=None):
+        return self.analyzer.analyze_resume({'raw_text': text, 'extraction_truncated': truncation}, role_info,
+                                            reuse_duplicates=self.reuse_duplicates, scoring_mode=self.scoring_mode)
+
+    def save(self, checkpoint, results):
+        """Save (path, analysis, role, category, text) results and mark them done in one transaction,
+        so a crash can't leave saved resumes pending (and saved again by the next run)"""
+        if not results:
+            return
+
+        def mark_done(cursor, resume_ids):
+            checkpoint.write_marks(cursor, [
+                (result[0], 'done', resume_id, None) for result, resume_id in zip(results, resume_ids)
+            ])
+
+        resume_ids = save_analysis_results([
+            (analysis, role, category, text) for _, analysis, role, category, text in results
+        ], RESUME_INDEXERS, mark_done)
+        if resume_ids is None:
+            checkpoint.mark_many([(path, 'failed', None, "Saving to the database failed") for path, *_ in results])
+
+    def run(self, checkpoint, entries):
+        """Process entries, saving results in batches of save_batch_size and checkpointing them"""
+        # Keep a bounded number of files in flight so extracted texts don't pile up in memory
+        window = self.extract_workers + self.llm_workers * 2
+        todo = iter(entries)
+        in_flight = {}
+        to_save = []
+        processed = 0
+        started = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=self.extract_workers) as extract_pool, \
+                ThreadPoolExecutor(max_workers=self.llm_workers) as llm_pool:
+
+            def fill():
+                for path, category, role in todo:
+                    role_info = self.job_roles.get(category, {}).get(role)
+                    if role_info is None:
+                        checkpoint.mark(path, 'failed', error=f"Unknown role: {category} / {role}")
+                        continue
+                    in_flight[extract_pool.submit(extract_text, path)] = ('extract', path, category, role, None)
+                    if len(in_flight) >= window:
+                        break
+
+            fill()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, path, category, role, text = in_flight.pop(future)
+                    try:
+                        if stage == 'extract':
+                            text, truncation = future.result()
+                            if not text.strip():
+                                raise ValueError("No text could be extracted")
+                            role_info = self.job_roles[category][role]
+                            in_flight[llm_pool.submit(self.analyze, text, role_info, truncation)] = ('analyze', path, category, role, text)
+                            continue
+
+                        analysis = future.result()
+                        if analysis.get('document_type') != 'resume':
+                            checkpoint.mark(path, 'skipped', error=f"Not a resume ({analysis.get('document_type')})")
+                        else:
+                            to_save.append((path, analysis, role, category, text))
+                    except Exception as e:
+                        print(f"{path}: {str(e)}")
+                        checkpoint.mark(path, 'failed', error=str(e))
+
+                    processed += 1
+                    if processed % 25 == 0:
+                        elapsed = time.perf_counter() - started
+                        print(f"Processed {processed} files ({processed / elapsed:.2f} files/sec)")
+                if len(to_save) >= self.save_batch_size:
+                    self.save(checkpoint, to_save)
+                    to_save = []
+                fill()
+
+        self.save(checkpoint, to_save)
+        return processed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a directory or manifest of resumes without the UI")
+    parser.add_argument('source', help="directory of PDF/DOCX resumes, or a .txt/.csv/.jsonl manifest")
+    parser.add_argument('--category', help="job category for entries that don't set one")
+    parser.add_argument('--role', help="job role for entries that don't set one")
+    parser.add_argument('--run-name', help="checkpoint name; re-use it to resume a run (default: the source path)")
+    parser.add_argument('--extract-workers', type=int, default=None, help="text extraction processes (default: CPU count)")
+    parser.add_argument('--llm-workers', type=int, default=2, help="concurrent analyses (LLM requests)")
+    parser.add_argument('--retry-failed', action='store_true', help="also retry files that failed in a previous run")
+    parser.add_argument('--save-batch-size', type=int, default=50, help="results saved per database transaction")
+    parser.add_argument('--fast', action='store_true',
+                        help="score locally from the section scores without any LLM calls (triage mode)")
+    parser.add_argument('--no-reuse', action='store_true',
+                        help="analyze near-duplicates of saved resumes again instead of reusing their analysis")
+    args = parser.parse_args()
+
+    init_database()
+    job_roles = JobRoleCatalog().as_dict()
+
+    source = os.path.abspath(args.source)
+    checkpoint = BatchCheckpoint(args.run_name or source, source)
+    try:
+        checkpoint.register(read_source(source, args.category, args.role))
+        entries = checkpoint.pending(args.retry_failed)
+        print(f"{len(entries)} files to process")
+
+        started = time.perf_counter()
+        runner = BatchRunner(job_roles, args.extract_workers, args.llm_workers, args.save_batch_size,
+                             scoring_mode='local' if args.fast else None, reuse_duplicates=not args.no_reuse)
+        processed = runner.run(checkpoint, entries)
+        elapsed = time.perf_counter() - started
+
+        print(f"Processed {processed} files in {elapsed:.1f}s: {checkpoint.summary()}")
+    finally:
+        checkpoint.close()
+
+
+if __name__ == "__main__":
+    main()
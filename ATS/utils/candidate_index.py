@@ -0,0 +1,349 @@
+"""
+Top-k candidate retrieval
+
+Every saved resume is turned into a hashed, L2-normalized term vector
+(HashingVectorizer, so there is nothing to fit). New vectors are written to
+the resume_vectors table in the same transaction as the resume. Compaction
+moves them into immutable on-disk segments under cache/candidate_index/. Each
+segment is a column-major (CSC) matrix stored as .npy files and memory-mapped
+at query time, so a column is the posting list of one hashed term.
+
+A query (a role description or free text) is vectorized the same way and
+weighted by IDF. Only the posting lists of its terms are read, so a query
+touches a small fraction of the matrix even with hundreds of thousands of
+resumes. Run from the ATS folder:
+
+    python -m utils.candidate_index --rebuild          # index every saved resume
+    python -m utils.candidate_index --compact          # move new vectors into a segment
+    python -m utils.candidate_index --query "python kubernetes microservices" -k 20
+"""
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from config.database import get_database_connection, init_database, decode_payload
+
+INDEX_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'candidate_index')
+N_FEATURES = 2 ** 20
+TAIL_LIMIT = 2000
+MAX_SEGMENTS = 8
+
+
+@lru_cache(maxsize=1)
+def get_vectorizer():
+    from sklearn.feature_extraction.text import HashingVectorizer
+    return HashingVectorizer(
+        n_features=N_FEATURES, alternate_sign=False, norm='l2',
+        stop_words='english', dtype=np.float32
+    )
+
+
+def vectorize(texts):
+    """CSR matrix of hashed, L2-normalized term vectors, one row per text"""
+    return get_vectorizer().transform(texts)
+
+
+def index_vectors(cursor, items):
+    """Store the term vectors of saved (resume_id, raw_text) pairs using cursor's transaction"""
+    items = [(resume_id, text) for resume_id, text in items if text]
+    if not items:
+        return
+    matrix = vectorize([text for _, text in items])
+    cursor.executemany('INSERT OR REPLACE INTO resume_vectors (resume_id, indices, data) VALUES (?, ?, ?)', [
+        (
+            resume_id,
+            matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]].astype(np.int32).tobytes(),
+            matrix.data[matrix.indptr[row]:matrix.indptr[row + 1]].astype(np.float32).tobytes()
+        )
+        for row, (resume_id, _) in enumerate(items)
+    ])
+
+
+class Segment:
+    """A memory-mapped CSC matrix of resume vectors"""
+
+    def __init__(self, path):
+        self.path = path
+        self.ids = np.load(os.path.join(path, 'ids.npy'), mmap_mode='r')
+        self.indptr = np.load(os.path.join(path, 'indptr.npy'), mmap_mode='r')
+        self.indices = np.load(os.path.join(path, 'indices.npy'), mmap_mode='r')
+        self.data = np.load(os.path.join(path, 'data.npy'), mmap_mode='r')
+
+    def document_frequency(self, columns):
+        return np.asarray(self.indptr[columns + 1] - self.indptr[columns])
+
+    def scores(self, columns, weights):
+        """Dot product of every row with a sparse query, reading only the query's columns"""
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for column, weight in zip(columns, weights):
+            start, end = self.indptr[column], self.indptr[column + 1]
+            if start != end:
+                # Row indices within one column are unique, so plain fancy-index addition is safe
+                scores[self.indices[start:end]] += weight * self.data[start:end]
+        return scores
+
+    @staticmethod
+    def write(path, ids, matrix):
+        """Write ids and a CSR matrix (one row per id) as a segment directory"""
+        csc = matrix.tocsc()
+        csc.sort_indices()
+        tmp_path = path + '.tmp'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        np.save(os.path.join(tmp_path, 'ids.npy'), np.asarray(ids, dtype=np.int64))
+        np.save(os.path.join(tmp_path, 'indptr.npy'), csc.indptr.astype(np.int64))
+        np.save(os.path.join(tmp_path, 'indices.npy'), csc.indices.astype(np.int32))
+        np.save(os.path.join(tmp_path, 'data.npy'), csc.data.astype(np.float32))
+        os.replace(tmp_path, path)
+
+    def to_csr(self):
+        from scipy.sparse import csc_matrix
+        return csc_matrix(
+            (np.asarray(self.data), np.asarray(self.indices), np.asarray(self.indptr)),
+            shape=(len(self.ids), N_FEATURES)
+        ).tocsr()
+
+
+class CandidateIndex:
+    """Segments on disk plus the not yet compacted vectors in resume_vectors"""
+
+    def __init__(self, directory=INDEX_DIR):
+        self.directory = directory
+        # _lock guards the segment list, last_id and the compaction flag; _compact_lock serializes writers
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._manifest_stamp = None
+        self._compaction_pending = False
+        self.segments = []
+        self.last_id = 0
+
+    def _manifest_path(self):
+        return os.path.join(self.directory, 'manifest.json')
+
+    def load(self):
+        """(Re)open the segments if the manifest changed"""
+        with self._lock:
+            self._load()
+
+    def _load(self):
+        # Callers hold self._lock; the new state is swapped in with one assignment
+        path = self._manifest_path()
+        stamp = os.stat(path).st_mtime_ns if os.path.exists(path) else None
+        if stamp == self._manifest_stamp:
+            return
+        manifest = {'segments': [], 'last_id': 0}
+        if stamp is not None:
+            with open(path) as file:
+                manifest = json.load(file)
+        segments = [Segment(os.path.join(self.directory, name)) for name in manifest['segments']]
+        self.segments, self.last_id, self._manifest_stamp = segments, manifest['last_id'], stamp
+
+    def _write_manifest(self, segment_names, last_id):
+        path = self._manifest_path()
+        with open(path + '.tmp', 'w') as file:
+            json.dump({'segments': segment_names, 'last_id': last_id}, file)
+        os.replace(path + '.tmp', path)
+
+    def _read_tail(self, conn, after_id):
+        """(ids, CSR matrix) of stored vectors with resume_id > after_id"""
+        from scipy.sparse import csr_matrix
+
+        rows = conn.execute(
+            'SELECT resume_id, indices, data FROM resume_vectors WHERE resume_id > ? ORDER BY resume_id',
+            (after_id,)
+        ).fetchall()
+        ids = [row[0] for row in rows]
+        indices = [np.frombuffer(row[1], dtype=np.int32) for row in rows]
+        data = [np.frombuffer(row[2], dtype=np.float32) for row in rows]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(part) for part in indices])
+        matrix = csr_matrix(
+            (np.concatenate(data) if data else np.zeros(0, np.float32),
+             np.concatenate(indices) if indices else np.zeros(0, np.int32),
+             indptr),
+            shape=(len(rows), N_FEATURES)
+        )
+        return ids, matrix
+
+    def compact(self, min_rows=TAIL_LIMIT):
+        """Move stored vectors into a new segment once there are at least min_rows; returns rows moved"""
+        with self._compact_lock:
+            with self._lock:
+                self._load()
+                segments, after_id = self.segments, self.last_id
+            conn = get_database_connection()
+            try:
+                ids, matrix = self._read_tail(conn, after_id)
+                if not ids or len(ids) < min_rows:
+                    return 0
+                os.makedirs(self.directory, exist_ok=True)
+                names = [os.path.basename(segment.path) for segment in segments]
+
+                if len(names) >= MAX_SEGMENTS:
+                    # Merge everything into one segment so queries stay a handful of mmaps
+                    from scipy.sparse import vstack
+                    ids = np.concatenate([np.asarray(segment.ids) for segment in segments] + [np.asarray(ids)])
+                    matrix = vstack([segment.to_csr() for segment in segments] + [matrix], format='csr')
+                    old_paths = [segment.path for segment in segments]
+                    names = []
+                else:
+                    old_paths = []
+
+                name = f'segment-{int(ids[0])}-{int(ids[-1])}-{int(time.time())}'
+                Segment.write(os.path.join(self.directory, name), ids, matrix)
+                last_id = int(max(ids[-1], after_id))
+                self._write_manifest(names + [name], last_id)
+                with self._lock:
+                    self._load()
+
+                # Searches now read the segment and only the tail after last_id, so the moved vectors and
+                # merged segments can go (open memory maps of a removed segment stay readable)
+                with conn:
+                    conn.execute('DELETE FROM resume_vectors WHERE resume_id <= ?', (last_id,))
+                for path in old_paths:
+                    shutil.rmtree(path, ignore_errors=True)
+                return len(ids)
+            finally:
+                conn.close()
+
+    def _compact_in_background(self):
+        try:
+            self.compact()
+        except Exception as e:
+            print(f"Error compacting the candidate index: {str(e)}")
+        finally:
+            with self._lock:
+                self._compaction_pending = False
+
+    def search(self, text, k=20):
+        """The k best matching resumes for a role description or free text: [(resume_id, score)]"""
+        query = vectorize([text])
+        columns = query.indices.astype(np.int64)
+        if not len(columns):
+            return []
+
+        conn = get_database_connection()
+        try:
+            # Read the segments and the tail after them as one consistent snapshot
+            with self._lock:
+                self._load()
+                segments = self.segments
+                tail_ids, tail = self._read_tail(conn, self.last_id)
+                start_compaction = len(tail_ids) >= TAIL_LIMIT and not self._compaction_pending
+                if start_compaction:
+                    self._compaction_pending = True
+        finally:
+            conn.close()
+        if start_compaction:
+            threading.Thread(target=self._compact_in_background, daemon=True).start()
+        tail = tail.tocsc()
+
+        # Weight query terms by IDF over the whole index so rare skills count more than common words
+        total = len(tail_ids) + sum(len(segment.ids) for segment in segments)
+        if total == 0:
+            return []
+        frequency = np.diff(tail.indptr)[columns].astype(np.float64)
+        for segment in segments:
+            frequency += segment.document_frequency(columns)
+        weights = query.data * np.log((1 + total) / (1 + frequency)) + 1e-9
+        weights = (weights / np.linalg.norm(weights)).astype(np.float32)
+
+        candidates = []
+        for ids, scores in [(segment.ids, segment.scores(columns, weights)) for segment in segments] + [
+            (np.asarray(tail_ids, dtype=np.int64), np.asarray(tail[:, columns] @ weights).ravel())
+        ]:
+            if len(scores) == 0:
+                continue
+            top = np.argpartition(-scores, min(k, len(scores)) - 1)[:k]
+            candidates.extend((int(ids[row]), float(scores[row])) for row in top if scores[row] > 0)
+
+        candidates.sort(key=lambda candidate: candidate[1], reverse=True)
+        return [(resume_id, round(score * 100, 1)) for resume_id, score in candidates[:k]]
+
+    def rebuild(self, segment_rows=100000):
+        """Re-index every saved resume from its stored text; returns how many were indexed"""
+        init_database()
+        with self._compact_lock:
+            with self._lock:
+                shutil.rmtree(self.directory, ignore_errors=True)
+                os.makedirs(self.directory)
+                self.segments, self.last_id, self._manifest_stamp = [], 0, None
+
+            conn = get_database_connection()
+            try:
+                last_id = conn.execute('SELECT COALESCE(MAX(resume_id), 0) FROM resume_payloads').fetchone()[0]
+                names, total, after_id = [], 0, 0
+                while True:
+                    rows = conn.execute('''
+                    SELECT resume_id, format_version, raw_text FROM resume_payloads
+                    WHERE resume_id > ? AND resume_id <= ? AND raw_text IS NOT NULL
+                    ORDER BY resume_id LIMIT ?
+                    ''', (after_id, last_id, segment_rows)).fetchall()
+                    if not rows:
+                        break
+                    after_id = rows[-1][0]
+                    texts = [decode_payload(blob, version) or '' for _, version, blob in rows]
+                    name = f'segment-{rows[0][0]}-{rows[-1][0]}-{int(time.time())}'
+                    Segment.write(os.path.join(self.directory, name), [row[0] for row in rows], vectorize(texts))
+                    names.append(name)
+                    total += len(rows)
+                self._write_manifest(names, last_id)
+                with conn:
+                    conn.execute('DELETE FROM resume_vectors WHERE resume_id <= ?', (last_id,))
+            finally:
+                conn.close()
+        self.load()
+        return total
+
+
+def top_candidates(index, text, k=20):
+    """The k best matching resumes with their details and latest ATS score"""
+    matches = index.search(text, k)
+    if not matches:
+        return []
+    conn = get_database_connection()
+    try:
+        rows = conn.execute(f'''
+        SELECT r.id, r.name, r.email, r.target_role, r.target_category, a.ats_score
+        FROM resume_data r
+        LEFT JOIN resume_analysis a ON a.id = (SELECT MAX(id) FROM resume_analysis WHERE resume_id = r.id)
+        WHERE r.id IN ({', '.join('?' * len(matches))})
+        ''', [resume_id for resume_id, _ in matches]).fetchall()
+    finally:
+        conn.close()
+    details = {row[0]: row for row in rows}
+    return [details[resume_id] + (score,) for resume_id, score in matches if resume_id in details]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain and query the candidate retrieval index")
+    parser.add_argument('--rebuild', action='store_true', help="re-index every saved resume")
+    parser.add_argument('--compact', action='store_true', help="move new vectors into a segment now")
+    parser.add_argument('--query', help="role description or free text to match")
+    parser.add_argument('-k', type=int, default=20, help="number of candidates to return")
+    args = parser.parse_args()
+
+    init_database()
+    index = CandidateIndex()
+    if args.rebuild:
+        started = time.perf_counter()
+        print(f"Indexed {index.rebuild()} resumes in {time.perf_counter() - started:.1f}s")
+    if args.compact:
+        print(f"Compacted {index.compact(min_rows=1)} vectors")
+    if args.query:
+        started = time.perf_counter()
+        results = top_candidates(index, args.query, args.k)
+        elapsed = (time.perf_counter() - started) * 1000
+        for resume_id, name, email, role, _, ats_score, score in results:
+            print(f"{score:6.1f}  #{resume_id} {name} <{email}> {role} (ATS {ats_score})")
+        print(f"{len(results)} candidates in {elapsed:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
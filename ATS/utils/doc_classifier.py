@@ -0,0 +1,183 @@
+"""
+Document type classifier
+
+A linear model (hashed word and word-pair features, logistic regression) that
+tells resumes from marksheets, certificates, ID cards and other uploads using
+only the text of the first page. ResumeAnalyzer uses it when a trained model
+is present in models/, to reject other documents before the remaining pages
+are extracted and before any LLM call; otherwise it keeps its keyword method.
+
+Train it from a folder with one sub-folder of PDF/DOCX/TXT samples per
+document type (resume/, marksheet/, certificate/, id_card/, ...), and compare
+it with the keyword method, from the ATS folder:
+
+    python -m utils.doc_classifier train samples/
+    python -m utils.doc_classifier benchmark samples/
+"""
+import argparse
+import os
+import pickle
+import tempfile
+import time
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'doc_type_classifier.pkl')
+MODEL_FORMAT = 1
+# Roughly one page of resume text; longer texts are cut here before classifying
+FIRST_PAGE_CHARS = 3000
+N_FEATURES = 2 ** 18
+# Non-resume predictions below this probability are left to the keyword method
+REJECT_CONFIDENCE = 0.8
+SAMPLE_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+
+def first_page(text):
+    return text[:FIRST_PAGE_CHARS]
+
+
+def make_vectorizer():
+    from sklearn.feature_extraction.text import HashingVectorizer
+    return HashingVectorizer(n_features=N_FEATURES, ngram_range=(1, 2), alternate_sign=False, norm='l2')
+
+
+class DocumentClassifier:
+    """A trained document type model"""
+
+    def __init__(self, model):
+        self.model = model
+        # The vectorizer is stateless, so only the model is saved
+        self.vectorizer = make_vectorizer()
+
+    @property
+    def labels(self):
+        return list(self.model.classes_)
+
+    def predict_batch(self, texts):
+        """(document type, probability) of each text"""
+        probabilities = self.model.predict_proba(self.vectorizer.transform([first_page(text) for text in texts]))
+        best = probabilities.argmax(axis=1)
+        return [(self.model.classes_[row], float(probabilities[i, row])) for i, row in enumerate(best)]
+
+    def predict(self, text):
+        return self.predict_batch([text])[0]
+
+    def rejects(self, text):
+        """The document type if text is confidently not a resume, else None"""
+        label, confidence = self.predict(text)
+        return label if label != 'resume' and confidence >= REJECT_CONFIDENCE else None
+
+    def save(self, path=MODEL_PATH):
+        import sklearn
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(suffix='.pkl', dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as file:
+            pickle.dump({'format': MODEL_FORMAT, 'sklearn': sklearn.__version__, 'model': self.model}, file)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        """The saved classifier, or None if there is none or it can't be used"""
+        if not os.path.exists(path):
+            return None
+        try:
+            import sklearn
+
+            with open(path, 'rb') as file:
+                saved = pickle.load(file)
+            if saved.get('format') != MODEL_FORMAT or saved.get('sklearn') != sklearn.__version__:
+                print(f"Error loading document classifier: {path} was saved by another version, retrain it")
+                return None
+            return cls(saved['model'])
+        except Exception as e:
+            print(f"Error loading document classifier: {str(e)}")
+            return None
+
+
+def train(texts, labels, C=10.0):
+    """Fit a classifier on (text, document type) samples"""
+    from sklearn.linear_model import LogisticRegression
+
+    model = LogisticRegression(C=C, max_iter=1000)
+    model.fit(make_vectorizer().transform([first_page(text) for text in texts]), labels)
+    return DocumentClassifier(model)
+
+
+def load_samples(directory):
+    """Texts and labels of the files in each sub-folder of directory (first page of PDFs only)"""
+    from utils.resume_analyzer_controller import ResumeAnalyzer
+
+    analyzer = ResumeAnalyzer()
+    texts, labels = [], []
+    for label in sorted(os.listdir(directory)):
+        folder = os.path.join(directory, label)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if not name.lower().endswith(SAMPLE_EXTENSIONS):
+                continue
+            try:
+                texts.append(analyzer.extract_text_from_path(os.path.join(folder, name), max_pages=1))
+                labels.append(label)
+            except Exception as e:
+                print(f"Error reading sample {name}: {str(e)}")
+    return texts, labels
+
+
+def benchmark(texts, labels, classifier=None):
+    """Accuracy and time per document of the classifier and of the keyword method"""
+    from utils.resume_analyzer_controller import ResumeAnalyzer
+
+    analyzer = ResumeAnalyzer()
+    methods = {'keywords': lambda batch: [analyzer.detect_document_type_by_keywords(text) for text in batch]}
+    if classifier is not None:
+        methods['classifier'] = lambda batch: [label for label, _ in classifier.predict_batch(batch)]
+        methods['classifier (single)'] = lambda batch: [classifier.predict(text)[0] for text in batch]
+
+    report = {}
+    for name, method in methods.items():
+        started = time.perf_counter()
+        predicted = method(texts)
+        elapsed = time.perf_counter() - started
+        correct = sum(p == label for p, label in zip(predicted, labels))
+        report[name] = {
+            'accuracy': round(correct / len(labels), 3) if labels else 0.0,
+            'us_per_document': round(elapsed / max(1, len(texts)) * 1e6, 1)
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train or benchmark the document type classifier")
+    parser.add_argument('command', choices=['train', 'benchmark'])
+    parser.add_argument('samples', help="folder with one sub-folder of sample files per document type")
+    parser.add_argument('--model', default=MODEL_PATH, help="model file to write (train) or read (benchmark)")
+    parser.add_argument('--test-size', type=float, default=0.2, help="share of samples held out to report accuracy")
+    args = parser.parse_args()
+
+    texts, labels = load_samples(args.samples)
+    print(f"{len(texts)} samples: " + ", ".join(f"{label} {labels.count(label)}" for label in sorted(set(labels))))
+    if not texts:
+        return
+
+    if args.command == 'train':
+        from sklearn.model_selection import train_test_split
+
+        if args.test_size > 0:
+            train_texts, test_texts, train_labels, test_labels = train_test_split(
+                texts, labels, test_size=args.test_size, stratify=labels, random_state=0
+            )
+            for name, result in benchmark(test_texts, test_labels, train(train_texts, train_labels)).items():
+                print(f"{name}: held-out accuracy {result['accuracy']:.1%}, {result['us_per_document']}us per document")
+        # The saved model is fitted on every sample
+        train(texts, labels).save(args.model)
+        print(f"Saved {args.model}")
+    else:
+        classifier = DocumentClassifier.load(args.model)
+        if classifier is None:
+            print(f"No usable model at {args.model}; only the keyword method is benchmarked")
+        for name, result in benchmark(texts, labels, classifier).items():
+            print(f"{name}: accuracy {result['accuracy']:.1%}, {result['us_per_document']}us per document")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Work experience duration from resume text
+
+Finds employment date ranges such as "Jan 2020 - Present", "03/2019 – 11/2021",
+"Jan 2020 -- Present", "September 2018 to May 2019", "2016 - 2018" or
+"Mar '21 - Jun '22" with precompiled patterns, turns each into an interval
+of months and merges overlapping intervals, so concurrent jobs are not
+counted twice. Both ends are inclusive: "Jan 2020 - Mar 2020" is 3 months.
+A year without a month starts in January or ends in December.
+"""
+import re
+from datetime import date
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+ONGOING = ('present', 'current', 'currently', 'now', 'today', 'date', 'ongoing', 'till date', 'to date')
+
+_MONTH_NAME = (r'(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?'
+               r'|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?')
+_YEAR = r"(?:(?:19|20)\d{2}|'\d{2})"
+_DATE = (
+    rf"(?:{_MONTH_NAME}[\s,/\-]*{_YEAR}"          # Jan 2020, January, 2020, Jan/2020, Mar '21
+    rf"|(?:0?[1-9]|1[0-2])\s*[/\-.]\s*(?:19|20)\d{{2}}"  # 03/2020, 3-2020, 03.2020
+    rf"|(?:19|20)\d{{2}}\s*[/\-.]\s*(?:0[1-9]|1[0-2])(?!\d)"  # 2020-03, 2020/03
+    rf"|(?:19|20)\d{{2}})"                        # 2020
+)
+_ONGOING = r'(?:present|current(?:ly)?|now|today|ongoing|(?:till|to)\s+date|date)'
+# Hyphens ("--" and "---" are LaTeX's en and em dash), en/em/figure dashes and the minus sign
+_SEPARATOR = r'(?:-{1,3}|[–—‒−~]|to|till|until)'
+DATE_RANGE = re.compile(
+    rf"(?<![\w/.\-])(?P<start>{_DATE})\s*{_SEPARATOR}\s*(?P<end>{_DATE}|{_ONGOING})(?![\w/])",
+    re.IGNORECASE
+)
+_MONTH_YEAR = re.compile(rf"({_MONTH_NAME})[\s,/\-]*((?:19|20)\d{{2}}|'\d{{2}})", re.IGNORECASE)
+_NUMERIC_MONTH_YEAR = re.compile(r'(\d{1,2})\s*[/\-.]\s*(\d{4})')
+_YEAR_NUMERIC_MONTH = re.compile(r'(\d{4})\s*[/\-.]\s*(\d{2})')
+
+
+def month_index(token, end=False, today=None):
+    """Months since year 0 for a date token, or None if it isn't a date"""
+    token = token.strip().lower()
+    if ' '.join(token.split()) in ONGOING:
+        today = today or date.today()
+        return today.year * 12 + today.month - 1
+    match = _MONTH_YEAR.fullmatch(token)
+    if match:
+        year = match.group(2)
+        year = 2000 + int(year[1:]) if year.startswith("'") else int(year)
+        return year * 12 + MONTHS[match.group(1)[:3]] - 1
+    match = _NUMERIC_MONTH_YEAR.fullmatch(token)
+    if match:
+        return int(match.group(2)) * 12 + int(match.group(1)) - 1
+    match = _YEAR_NUMERIC_MONTH.fullmatch(token)
+    if match:
+        return int(match.group(1)) * 12 + int(match.group(2)) - 1
+    if token.isdigit() and len(token) == 4:
+        return int(token) * 12 + (11 if end else 0)
+    return None
+
+
+def find_intervals(text, today=None):
+    """(first month, last month) of every date range in text, clipped to today"""
+    today = today or date.today()
+    now = today.year * 12 + today.month - 1
+    intervals = []
+    for match in DATE_RANGE.finditer(text):
+        start = month_index(match.group('start'), today=today)
+        end = month_index(match.group('end'), end=True, today=today)
+        if start is None or end is None:
+            continue
+        end = min(end, now)
+        if start <= end:
+            intervals.append((start, end))
+    return intervals
+
+
+def merge_intervals(intervals):
+    """Merge overlapping or adjacent month intervals"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(interval) for interval in merged]
+
+
+def experience_months(text, today=None):
+    """Total months of experience in text, counting overlapping periods once"""
+    return sum(end - start + 1 for start, end in merge_intervals(find_intervals(text, today)))
+
+
+def format_experience(total_months):
+    return f"{total_months // 12} years and {total_months % 12} months"
@@ -0,0 +1,99 @@
+"""
+Extraction budget per upload
+
+Caps how much of an uploaded document is extracted: at most MAX_PAGES pages,
+MAX_CHARS characters and MAX_SECONDS of wall-clock time (checked between
+pages, so one slow page can overrun it). A 200-page thesis then costs about
+as much as a long resume. What was cut is returned as a truncation dict and
+recorded in the analysis. LLM prompts are further trimmed to a token budget
+by utils.prompt_builder.
+
+The limits can be changed with ATS_EXTRACT_MAX_PAGES, ATS_EXTRACT_MAX_CHARS and
+ATS_EXTRACT_MAX_SECONDS.
+"""
+import os
+import time
+
+MAX_PAGES = 10
+MAX_CHARS = 50000
+MAX_SECONDS = 20.0
+
+
+def _env_limit(name, default, cast):
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        print(f"Error reading {name}: {value!r} is not a number")
+        return default
+
+
+class ExtractionBudget:
+    """Page, character and time limits for extracting one document"""
+
+    def __init__(self, max_pages=None, max_chars=None, max_seconds=None):
+        self.max_pages = max_pages if max_pages is not None else _env_limit('ATS_EXTRACT_MAX_PAGES', MAX_PAGES, int)
+        self.max_chars = max_chars if max_chars is not None else _env_limit('ATS_EXTRACT_MAX_CHARS', MAX_CHARS, int)
+        self.max_seconds = max_seconds if max_seconds is not None else _env_limit('ATS_EXTRACT_MAX_SECONDS', MAX_SECONDS, float)
+
+    def read(self, parts, extract, unit='pages', stop=None):
+        """Extract parts (pages, paragraphs) in order until a limit is hit.
+
+        extract(part) returns a part's text; stop(index, text) may end extraction
+        early without it counting as truncation. Returns (text, truncation).
+        """
+        started = time.monotonic()
+        # Pages end with a line break, like PDF extraction always did
+        ending = '\n' if unit == 'pages' else ''
+        texts, length = [], 0
+        limit = None
+        number = 0
+        for number, part in enumerate(parts):
+            if unit == 'pages' and number >= self.max_pages:
+                limit = 'pages'
+                break
+            if time.monotonic() - started > self.max_seconds:
+                limit = 'time'
+                break
+            part_text = extract(part) or ''
+            texts.append(part_text)
+            length += len(part_text) + 1
+            if length > self.max_chars:
+                limit = 'characters'
+                number += 1
+                break
+            if stop and stop(number, '\n'.join(texts)):
+                return '\n'.join(texts) + ending, None
+        else:
+            number = len(parts)
+
+        text = '\n'.join(texts) + (ending if texts else '')
+        if limit is None:
+            return text, None
+        text = text[:self.max_chars]
+        return text, {'limit': limit, 'unit': unit, 'read': number, 'total': len(parts), 'characters': len(text)}
+
+    def clip(self, text):
+        """Apply the character limit to already extracted text; returns (text, truncation)"""
+        if len(text) <= self.max_chars:
+            return text, None
+        return text[:self.max_chars], {
+            'limit': 'characters', 'unit': 'characters', 'read': self.max_chars, 'total': len(text),
+            'characters': self.max_chars
+        }
+
+
+def truncation_message(truncation):
+    """A one-line description of what was cut, for the UI"""
+    if not truncation:
+        return ''
+    reason = {
+        'pages': "the page limit",
+        'characters': "the text length limit",
+        'time': "the time limit"
+    }.get(truncation['limit'], "a limit")
+    if truncation['unit'] == 'characters':
+        return f"Only the first {truncation['read']:,} of {truncation['total']:,} characters were analyzed ({reason})."
+    return f"Only the first {truncation['read']} of {truncation['total']} {truncation['unit']} were analyzed ({reason})."
@@ -0,0 +1,437 @@
+"""
+Durable resume analysis queue
+
+Jobs live in the analysis_jobs table, so they survive a closed browser tab or
+a restarted server. Workers lease a job for a visibility timeout, run
+ResumeAnalyzer.analyze_resume on it and acknowledge the result; a job whose
+worker dies becomes visible again once its lease expires, and failed jobs are
+retried with backoff up to max_attempts.
+
+Identical jobs (same file or text, role and prompt version) are coalesced: a
+job is not leased while an identical one is running, and the worker running
+that one finishes the waiting jobs with its result, even if its own job was
+cancelled meanwhile. If it fails, the waiting jobs are leased and run as usual.
+
+Finished, failed and cancelled jobs, with their uploaded file, text and
+result, are deleted RETENTION_DAYS after they ended (ATS_QUEUE_RETENTION_DAYS);
+idle workers prune them at most once per PRUNE_INTERVAL seconds.
+
+The Streamlit pages start a small worker pool on first use. Dedicated workers
+can be run instead (set ATS_EXTERNAL_WORKERS=1 for the app) from the ATS folder:
+
+    python -m utils.job_queue --workers 4
+    python -m utils.job_queue --prune          # delete old finished jobs and exit
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+
+from config.database import (get_database_connection, init_database, encode_payload, decode_payload,
+                             insert_analysis_results)
+from utils.extraction_budget import ExtractionBudget
+from utils.resume_indexes import RESUME_INDEXERS
+from utils.single_flight import request_key
+
+DEFAULT_VISIBILITY_TIMEOUT = 300
+RETRY_BASE_DELAY = 5
+TERMINAL_STATUSES = ('done', 'failed', 'cancelled')
+RETENTION_DAYS = 7
+PRUNE_INTERVAL = 3600
+
+PDF_TYPE = "application/pdf"
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def connect():
+    """Open a queue connection that waits on concurrent writers instead of failing"""
+    conn = get_database_connection()
+    conn.execute('PRAGMA busy_timeout = 30000')
+    return conn
+
+
+def enqueue_analysis(role_info, target_category, target_role, raw_text=None, file_name=None,
+                     file_type=None, file_data=None, persist=True, max_attempts=3, reuse_duplicates=True):
+    """Queue a resume for analysis from its extracted text or its uploaded file; returns the job id.
+
+    reuse_duplicates is passed to analyze_resume.
+    """
+    if raw_text is not None:
+        dedupe_key = request_key(raw_text, role_info, target_category, target_role, reuse_duplicates)
+    else:
+        dedupe_key = request_key(file_data, role_info, target_category, target_role, file_type, reuse_duplicates)
+    conn = connect()
+    try:
+        with conn:
+            cursor = conn.execute('''
+            INSERT INTO analysis_jobs (
+                file_name, file_type, file_data, raw_text, target_category, target_role,
+                role_info, persist, max_attempts, available_at, dedupe_key, reuse_duplicates
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                file_name,
+                file_type,
+                file_data,
+                encode_payload(raw_text) if raw_text is not None else None,
+                target_category,
+                target_role,
+                json.dumps(role_info),
+                int(persist),
+                max_attempts,
+                time.time(),
+                dedupe_key,
+                int(reuse_duplicates)
+            ))
+        return cursor.lastrowid
+    finally:
+        conn.close()
+
+
+def lease_job(owner, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT):
+    """Lease the oldest visible job to owner; returns the job as a dict or None.
+
+    Jobs identical to a job another worker is running wait for that one.
+    """
+    now = time.time()
+    conn = connect()
+    try:
+        with conn:
+            # Jobs whose last attempt's lease ran out are given up on
+            conn.execute('''
+            UPDATE analysis_jobs
+            SET status = 'failed', error = COALESCE(error, 'Worker lease expired'), updated_at = CURRENT_TIMESTAMP
+            WHERE status = 'running' AND available_at <= ? AND attempts >= max_attempts
+            ''', (now,))
+            cursor = conn.execute('''
+            UPDATE analysis_jobs
+            SET status = 'running', lease_owner = ?, attempts = attempts + 1,
+                available_at = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = (
+                SELECT id FROM analysis_jobs AS job
+                WHERE status IN ('queued', 'running') AND available_at <= ? AND attempts < max_attempts
+                AND NOT EXISTS (
+                    SELECT 1 FROM analysis_jobs AS other
+                    WHERE other.dedupe_key = job.dedupe_key AND other.id != job.id
+                    AND other.status = 'running' AND other.available_at > ?
+                )
+                ORDER BY id
+                LIMIT 1
+            )
+            RETURNING id, file_name, file_type, file_data, raw_text, target_category,
+                      target_role, role_info, persist, attempts, dedupe_key, reuse_duplicates
+            ''', (owner, now + visibility_timeout, now, now))
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        return {
+            'id': row[0],
+            'file_name': row[1],
+            'file_type': row[2],
+            'file_data': row[3],
+            'raw_text': decode_payload(row[4]),
+            'target_category': row[5],
+            'target_role': row[6],
+            'role_info': json.loads(row[7]),
+            'persist': bool(row[8]),
+            'attempts': row[9],
+            'dedupe_key': row[10],
+            'reuse_duplicates': bool(row[11])
+        }
+    finally:
+        conn.close()
+
+
+def extend_lease(job_id, owner, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT):
+    """Push back the lease expiry of a running job; False if owner no longer holds it"""
+    conn = connect()
+    try:
+        with conn:
+            cursor = conn.execute('''
+            UPDATE analysis_jobs SET available_at = ?
+            WHERE id = ? AND lease_owner = ? AND status = 'running'
+            ''', (time.time() + visibility_timeout, job_id, owner))
+        return cursor.rowcount == 1
+    finally:
+        conn.close()
+
+
+def finish_job(job, owner, result, raw_text=None):
+    """Acknowledge a leased job with its result and finish the queued jobs identical to it.
+
+    Everything happens in one transaction: the resume is saved (once) only if the
+    job is still leased to owner and persists, or an identical job that persists
+    was waiting. Returns False if the job was cancelled or its lease was lost;
+    its own result is then dropped.
+    """
+    conn = connect()
+    try:
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        acked = cursor.execute('''
+        UPDATE analysis_jobs
+        SET status = 'done', result = ?, error = NULL,
+            raw_text = COALESCE(raw_text, ?), file_data = NULL, updated_at = CURRENT_TIMESTAMP
+        WHERE id = ? AND lease_owner = ? AND status = 'running'
+        ''', (
+            encode_payload(result),
+            encode_payload(raw_text) if raw_text is not None else None,
+            job['id'],
+            owner
+        )).rowcount == 1
+        waiting = []
+        if job.get('dedupe_key'):
+            waiting = cursor.execute('''
+            SELECT id, persist, target_category, target_role
+            FROM analysis_jobs
+            WHERE dedupe_key = ? AND status = 'queued' AND id != ?
+            ORDER BY id
+            ''', (job['dedupe_key'], job['id'])).fetchall()
+
+        owners = ([(job['id'], job['persist'], job['target_category'], job['target_role'])] if acked else []) + waiting
+        persisting = [row for row in owners if row[1]]
+        resume_id = None
+        if persisting and result.get('document_type') == 'resume':
+            resume_id = insert_analysis_results(cursor, [(result, persisting[0][3], persisting[0][2], raw_text or '')],
+                                                RESUME_INDEXERS)[0]
+        if acked:
+            cursor.execute('UPDATE analysis_jobs SET resume_id = ? WHERE id = ?', (resume_id, job['id']))
+        if waiting:
+            cursor.execute(f'''
+            UPDATE analysis_jobs
+            SET status = 'done', result = ?, resume_id = ?, error = NULL,
+                raw_text = COALESCE(raw_text, ?), file_data = NULL, updated_at = CURRENT_TIMESTAMP
+            WHERE id IN ({', '.join('?' * len(waiting))})
+            ''', [
+                encode_payload(result),
+                resume_id,
+                encode_payload(raw_text) if raw_text is not None else None
+            ] + [row[0] for row in waiting])
+            print(f"Job {job['id']} result shared with {len(waiting)} identical job(s)")
+        conn.commit()
+        return acked
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def fail_job(job_id, owner, error):
+    """Record a failed attempt; the job is retried with backoff until max_attempts"""
+    conn = connect()
+    try:
+        with conn:
+            conn.execute('''
+            UPDATE analysis_jobs
+            SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                available_at = ? + ? * (1 << (attempts - 1)),
+                error = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND lease_owner = ? AND status = 'running'
+            ''', (time.time(), RETRY_BASE_DELAY, error, job_id, owner))
+    finally:
+        conn.close()
+
+
+def cancel_jobs(job_ids):
+    """Cancel jobs that have not finished; returns how many were cancelled.
+
+    A running job's worker finishes its current analysis, but can no longer
+    acknowledge it, so the result is dropped.
+    """
+    if not job_ids:
+        return 0
+    conn = connect()
+    try:
+        with conn:
+            cursor = conn.execute(f'''
+            UPDATE analysis_jobs
+            SET status = 'cancelled', file_data = NULL, updated_at = CURRENT_TIMESTAMP
+            WHERE status IN ('queued', 'running') AND id IN ({', '.join('?' * len(job_ids))})
+            ''', list(job_ids))
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+
+def get_jobs(job_ids):
+    """Get the status, result and error of jobs by id"""
+    if not job_ids:
+        return {}
+    conn = connect()
+    try:
+        cursor = conn.execute(f'''
+        SELECT id, status, file_name, attempts, resume_id, result, error
+        FROM analysis_jobs
+        WHERE id IN ({', '.join('?' * len(job_ids))})
+        ''', list(job_ids))
+        return {
+            row[0]: {
+                'status': row[1],
+                'file_name': row[2],
+                'attempts': row[3],
+                'resume_id': row[4],
+                'result': decode_payload(row[5]),
+                'error': row[6]
+            }
+            for row in cursor.fetchall()
+        }
+    finally:
+        conn.close()
+
+
+def extract_job_text(analyzer, job):
+    """Get the text of a job, extracting it from the uploaded file if needed, within the
+    extraction budget; returns (text, truncation)"""
+    budget = ExtractionBudget()
+    if job['raw_text'] is not None:
+        return budget.clip(job['raw_text'])
+    data = io.BytesIO(job['file_data'] or b'')
+    if job['file_type'] == PDF_TYPE:
+        return analyzer.extract_pdf(data, budget)
+    if job['file_type'] == DOCX_TYPE:
+        return analyzer.extract_docx(data, budget)
+    return budget.clip(data.getvalue().decode('utf-8', errors='ignore'))
+
+
+def process_job(analyzer, job, owner, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT):
+    """Analyze one leased job and acknowledge or fail it.
+
+    The lease is extended every third of visibility_timeout while the analysis
+    runs, so a long analysis isn't taken over by another worker.
+    """
+    stop_heartbeat = threading.Event()
+
+    def heartbeat():
+        while not stop_heartbeat.wait(visibility_timeout / 3):
+            if not extend_lease(job['id'], owner, visibility_timeout):
+                return
+
+    threading.Thread(target=heartbeat, daemon=True).start()
+    try:
+        text, truncation = extract_job_text(analyzer, job)
+        if not text.strip():
+            raise ValueError("No text could be extracted from the file")
+        analysis = analyzer.analyze_resume({'raw_text': text, 'extraction_truncated': truncation}, job['role_info'],
+                                           reuse_duplicates=job['reuse_duplicates'])
+        stop_heartbeat.set()
+        if not finish_job(job, owner, analysis, text):
+            print(f"Job {job['id']} was cancelled or its lease was lost; its result was dropped")
+    except Exception as e:
+        print(f"Job {job['id']} failed: {str(e)}")
+        fail_job(job['id'], owner, str(e))
+    finally:
+        stop_heartbeat.set()
+
+
+def retention_days():
+    value = os.environ.get('ATS_QUEUE_RETENTION_DAYS')
+    if not value:
+        return RETENTION_DAYS
+    try:
+        return float(value)
+    except ValueError:
+        print(f"Error reading ATS_QUEUE_RETENTION_DAYS: {value!r} is not a number")
+        return RETENTION_DAYS
+
+
+def prune_jobs(days=None):
+    """Delete terminal jobs that ended more than days ago (default retention_days()); returns how many"""
+    days = retention_days() if days is None else days
+    conn = connect()
+    try:
+        with conn:
+            cursor = conn.execute(f'''
+            DELETE FROM analysis_jobs
+            WHERE status IN ({', '.join('?' * len(TERMINAL_STATUSES))}) AND updated_at < datetime('now', ?)
+            ''', list(TERMINAL_STATUSES) + [f'-{days} days'])
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+
+def run_worker(owner=None, poll_interval=1.0, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT, stop_event=None):
+    """Lease and process jobs until stop_event is set"""
+    from utils.resume_analyzer_controller import ResumeAnalyzer
+
+    owner = owner or f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    analyzer = ResumeAnalyzer()
+    last_prune = 0
+    while stop_event is None or not stop_event.is_set():
+        job = lease_job(owner, visibility_timeout)
+        if job is None:
+            if time.monotonic() - last_prune > PRUNE_INTERVAL:
+                last_prune = time.monotonic()
+                try:
+                    pruned = prune_jobs()
+                    if pruned:
+                        print(f"Pruned {pruned} old queue job(s)")
+                except Exception as e:
+                    print(f"Error pruning queue jobs: {str(e)}")
+            time.sleep(poll_interval)
+            continue
+        process_job(analyzer, job, owner, visibility_timeout)
+
+
+def start_workers(count):
+    """Start count daemon worker processes"""
+    init_database()
+    context = multiprocessing.get_context('spawn')
+    processes = []
+    for _ in range(count):
+        process = context.Process(target=run_worker, daemon=True)
+        process.start()
+        processes.append(process)
+    return processes
+
+
+_worker_pool = []
+_worker_pool_lock = threading.Lock()
+
+
+def ensure_worker_pool(count=None):
+    """Start the in-app worker pool once per server process (unless external workers are used)"""
+    if os.environ.get('ATS_EXTERNAL_WORKERS') == '1':
+        return
+    count = count or int(os.environ.get('ATS_QUEUE_WORKERS', '2'))
+    with _worker_pool_lock:
+        _worker_pool[:] = [process for process in _worker_pool if process.is_alive()]
+        if len(_worker_pool) < count:
+            _worker_pool.extend(start_workers(count - len(_worker_pool)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run resume analysis queue workers")
+    parser.add_argument('--workers', type=int, default=2, help="worker processes")
+    parser.add_argument('--visibility-timeout', type=int, default=DEFAULT_VISIBILITY_TIMEOUT,
+                        help="seconds before a job leased by a dead worker is retried")
+    parser.add_argument('--prune', action='store_true',
+                        help="delete finished jobs older than the retention period and exit")
+    parser.add_argument('--retention-days', type=float, help="days finished jobs are kept (with --prune)")
+    args = parser.parse_args()
+
+    init_database()
+    if args.prune:
+        print(f"Pruned {prune_jobs(args.retention_days)} queue job(s)")
+        return
+    if args.workers == 1:
+        run_worker(visibility_timeout=args.visibility_timeout)
+        return
+
+    context = multiprocessing.get_context('spawn')
+    processes = [
+        context.Process(target=run_worker, kwargs={'visibility_timeout': args.visibility_timeout})
+        for _ in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    print(f"Started {len(processes)} queue workers")
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
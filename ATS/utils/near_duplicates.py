@@ -0,0 +1,169 @@
+"""
+Near-duplicate resume detection
+
+Every saved resume gets a MinHash signature over 5-word shingles of its text,
+stored in resume_minhash, plus one LSH bucket per band of the signature in
+resume_lsh. A new text is only compared with resumes sharing at least one
+bucket, so lookups don't scan the whole table. With 16 bands of 8 rows, pairs
+with a Jaccard similarity around 0.7 or more are very likely to be candidates.
+
+Resumes saved before this index existed can be added from the ATS folder:
+
+    python -m utils.near_duplicates --backfill
+"""
+import argparse
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+from config.database import get_database_connection, init_database, decode_payload, get_resume_payload
+
+NUM_PERM = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+DUPLICATE_THRESHOLD = 0.9
+
+# Fixed seed so signatures stay comparable across processes and restarts
+_rng = np.random.default_rng(20240501)
+_PERM_A = _rng.integers(1, 2 ** 63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """The set of lower-cased word n-grams of text"""
+    words = re.findall(r'\w+', text.lower())
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(text):
+    """MinHash signature (NUM_PERM uint32 values) of the text's shingles, or None for empty text"""
+    values = shingles(text)
+    if not values:
+        return None
+    hashes = np.fromiter((zlib.crc32(value.encode()) for value in values), dtype=np.uint64, count=len(values))
+    # Multiply-shift hashing: the top 32 bits of a * x + b (mod 2^64) for each permutation
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) >> np.uint64(32)
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def band_buckets(signature):
+    """One 64-bit bucket key per LSH band of a signature"""
+    return [
+        int.from_bytes(hashlib.blake2b(band.tobytes(), digest_size=8).digest(), 'little', signed=True)
+        for band in signature.reshape(BANDS, ROWS_PER_BAND)
+    ]
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of the texts behind two signatures"""
+    return float(np.mean(signature == other))
+
+
+def index_signatures(cursor, items):
+    """Store the signatures and LSH buckets of (resume_id, text) pairs using cursor's transaction"""
+    signature_rows, bucket_rows = [], []
+    for resume_id, text in items:
+        signature = minhash_signature(text or '')
+        if signature is None:
+            continue
+        signature_rows.append((resume_id, signature.tobytes()))
+        bucket_rows.extend((band, bucket, resume_id) for band, bucket in enumerate(band_buckets(signature)))
+
+    cursor.executemany('INSERT OR REPLACE INTO resume_minhash (resume_id, signature) VALUES (?, ?)', signature_rows)
+    cursor.executemany('INSERT OR IGNORE INTO resume_lsh (band, bucket, resume_id) VALUES (?, ?, ?)', bucket_rows)
+    return len(signature_rows)
+
+
+def find_near_duplicate(text, threshold=DUPLICATE_THRESHOLD):
+    """Find the most similar saved resume; returns {'resume_id', 'similarity'} or None"""
+    signature = minhash_signature(text)
+    if signature is None:
+        return None
+
+    conn = get_database_connection()
+    try:
+        buckets = band_buckets(signature)
+        cursor = conn.execute(f'''
+        SELECT m.resume_id, m.signature
+        FROM resume_minhash m
+        WHERE m.resume_id IN (
+            SELECT resume_id FROM resume_lsh
+            WHERE {' OR '.join(['(band = ? AND bucket = ?)'] * BANDS)}
+        )
+        ''', [value for band, bucket in enumerate(buckets) for value in (band, bucket)])
+
+        best = None
+        for resume_id, blob in cursor:
+            score = similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+            if score >= threshold and (best is None or score > best['similarity']):
+                best = {'resume_id': resume_id, 'similarity': round(score, 2)}
+        return best
+    except Exception as e:
+        print(f"Error finding near-duplicate resumes: {str(e)}")
+        return None
+    finally:
+        conn.close()
+
+
+def reusable_analysis(duplicate, required_skills):
+    """The saved analysis of a near-duplicate if it was made against the same required skills"""
+    payload = get_resume_payload(duplicate['resume_id'])
+    analysis = payload and payload.get('analysis')
+    if not analysis or analysis.get('document_type') != 'resume':
+        return None
+    keyword_match = analysis.get('keyword_match', {})
+    analyzed_skills = set(keyword_match.get('found_skills', [])) | set(keyword_match.get('missing_skills', []))
+    if analyzed_skills != set(required_skills):
+        return None
+    analysis = dict(analysis)
+    analysis.pop('near_duplicate', None)
+    return analysis
+
+
+def backfill(batch_size=500):
+    """Index saved resumes that have no signature yet; returns how many were indexed"""
+    init_database()
+    conn = get_database_connection()
+    total = 0
+    try:
+        while True:
+            rows = conn.execute('''
+            SELECT p.resume_id, p.format_version, p.raw_text
+            FROM resume_payloads p
+            LEFT JOIN resume_minhash m ON m.resume_id = p.resume_id
+            WHERE m.resume_id IS NULL AND p.raw_text IS NOT NULL
+            ORDER BY p.resume_id
+            LIMIT ?
+            ''', (batch_size,)).fetchall()
+            if not rows:
+                break
+            with conn:
+                indexed = index_signatures(conn.cursor(), [
+                    (resume_id, decode_payload(blob, format_version)) for resume_id, format_version, blob in rows
+                ])
+                # Resumes without text get an empty signature so they are not picked up again
+                conn.executemany('INSERT OR IGNORE INTO resume_minhash (resume_id, signature) VALUES (?, ?)',
+                                 [(row[0], b'') for row in rows])
+            total += indexed
+    finally:
+        conn.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the near-duplicate resume index")
+    parser.add_argument('--backfill', action='store_true', help="index saved resumes that have no signature yet")
+    args = parser.parse_args()
+    if args.backfill:
+        print(f"Indexed {backfill()} resumes")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
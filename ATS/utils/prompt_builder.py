@@ -0,0 +1,295 @@
+"""
+Token-budgeted LLM prompts
+
+Resume text extracted by PyPDF2 comes with letter-spaced headings
+("P R O F I L E"), words hyphenated across lines, page headers and footers
+repeated on every page, page numbers and long whitespace runs, all of which
+cost tokens without telling the LLM anything. compact_text removes them and
+compact_instructions strips the indentation of the static prompt text.
+
+estimate_tokens counts tokens locally (an estimate that errs high, no
+tokenizer needed), and resume_excerpt trims a resume to the budget of a
+model: when it doesn't fit, the sections that fit whole are kept in the
+caller's priority order, and the ones that don't are cut at a line break (or
+a word, for a single long line) to fill what is left, higher priority first.
+
+Compare the tokens of the old and the compacted prompts for a folder of
+resumes, or show the token usage recorded for each LLM call, from the ATS
+folder:
+
+    python -m utils.prompt_builder measure resumes/
+    python -m utils.prompt_builder usage
+"""
+import argparse
+import os
+import re
+import unicodedata
+
+from utils.section_segmenter import segment_resume
+
+# Version of the prompts and their budget; bump it when either changes, so
+# requests coalesced by utils.single_flight only share results of the same prompts
+PROMPT_VERSION = 1
+# Context window and tokens kept free for the answer, per model
+MODEL_LIMITS = {
+    'gemma2-9b-it': {'context': 8192, 'answer': 2048},
+    'llama-3.1-8b-instant': {'context': 131072, 'answer': 4096},
+    'llama-3.3-70b-versatile': {'context': 131072, 'answer': 4096}
+}
+DEFAULT_LIMITS = {'context': 8192, 'answer': 2048}
+# Most resume tokens sent per call whatever the context window (about 12,000
+# characters); set with ATS_PROMPT_RESUME_TOKENS
+RESUME_TOKENS = 3000
+# Sections of a resume kept first when it has to be trimmed; 'header' is the
+# text before the first section (name and contact details)
+SCORING_PRIORITY = ('header', 'skills', 'experience', 'summary', 'projects', 'education', 'other')
+EXTRACTION_PRIORITY = ('experience', 'education', 'projects', 'header', 'skills', 'summary', 'other')
+# A line seen this often is a page header or footer; only its first copy is kept
+REPEATED_LINE_MIN = 3
+# Below this many tokens left, a section is dropped rather than cut
+MIN_SECTION_TOKENS = 40
+
+_CONTROL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\x7f\u00ad\u200b-\u200f\u2060\ufeff]')
+_LETTER_SPACED = re.compile(r'\b(?:[A-Za-z] ){3,}[A-Za-z]\b')
+_LINE_HYPHEN = re.compile(r'([a-z])-\n([a-z])')
+_SPACES = re.compile(r'[ \t\f\v]+')
+_PAGE_NUMBER = re.compile(r'^(?:page\s*)?\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?$|^-\s*\d{1,3}\s*-$', re.IGNORECASE)
+_DIGITS = re.compile(r'\d+')
+_TOKENS = re.compile(r'[^\W\d_]+|\d|\n|[^\S\n]{2,}|[^\w\s]|_')
+
+
+def estimate_tokens(text):
+    """Approximate token count of text: a token per short word, digit, punctuation mark,
+    line break and run of spaces, and one more per 6 letters of longer words (real
+    tokenizers use fewer)"""
+    count = 0
+    for token in _TOKENS.findall(text):
+        count += 1 + (len(token) - 1) // 6
+    return count
+
+
+def compact_instructions(text):
+    """Static prompt text without indentation, trailing spaces or blank line runs"""
+    lines = [_SPACES.sub(' ', line).strip() for line in text.strip().split('\n')]
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines))
+
+
+def compact_text(text):
+    """Resume text without extraction artifacts, repeated headers/footers and extra whitespace"""
+    text = unicodedata.normalize('NFKC', text.replace('\r\n', '\n').replace('\r', '\n'))
+    text = _CONTROL.sub('', text)
+    text = _LINE_HYPHEN.sub(r'\1\2', text)
+    text = _LETTER_SPACED.sub(lambda match: match.group(0).replace(' ', ''), text)
+    lines = [_SPACES.sub(' ', line).strip() for line in text.split('\n')]
+
+    # Headers and footers repeat on every page, with the page number as the only difference
+    counts = {}
+    for line in lines:
+        if line:
+            key = _DIGITS.sub('#', line.lower())
+            counts[key] = counts.get(key, 0) + 1
+    kept, seen, blank = [], set(), False
+    for line in lines:
+        if not line:
+            # One blank line still separates entries
+            if kept and not blank:
+                kept.append('')
+            blank = True
+            continue
+        if _PAGE_NUMBER.match(line):
+            continue
+        key = _DIGITS.sub('#', line.lower())
+        if counts[key] >= REPEATED_LINE_MIN and not line.endswith(':'):
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(line)
+        blank = False
+    return '\n'.join(kept).strip()
+
+
+def model_limits(model):
+    return MODEL_LIMITS.get(model, DEFAULT_LIMITS)
+
+
+def resume_token_budget(model, fixed_text=''):
+    """Tokens left for the resume in a prompt to model whose other text is fixed_text"""
+    limits = model_limits(model)
+    budget = RESUME_TOKENS
+    value = os.environ.get('ATS_PROMPT_RESUME_TOKENS')
+    if value:
+        try:
+            budget = int(value)
+        except ValueError:
+            print(f"Error reading ATS_PROMPT_RESUME_TOKENS: {value!r} is not a number")
+    room = limits['context'] - limits['answer'] - estimate_tokens(fixed_text)
+    return max(0, min(budget, room))
+
+
+def _cut_words(text, max_tokens):
+    """The words at the start of text that fit in max_tokens, or its first characters
+    when not even the first word fits"""
+    kept, used = [], 0
+    for word in text.split(' '):
+        # Single spaces between words cost nothing to estimate_tokens
+        cost = estimate_tokens(word)
+        if used + cost > max_tokens:
+            break
+        kept.append(word)
+        used += cost
+    if kept:
+        return ' '.join(kept)
+    # A word longer than the budget: estimate_tokens counts a token per 6 letters
+    return text[:max(0, max_tokens) * 6]
+
+
+def _cut_lines(text, max_tokens):
+    """The lines at the start of text that fit in max_tokens; when not even the first
+    line fits, that line cut at a word boundary"""
+    kept, used = [], 0
+    for line in text.split('\n'):
+        # Every line costs one more token for its line break
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            if not kept:
+                return _cut_words(line, max_tokens)
+            break
+        kept.append(line)
+        used += cost
+    return '\n'.join(kept)
+
+
+def resume_excerpt(text, max_tokens, priority=SCORING_PRIORITY):
+    """The compacted resume, trimmed by section priority to max_tokens.
+
+    Returns (excerpt, trimmed); trimmed is None when everything fit, else
+    {'tokens', 'kept_tokens', 'cut', 'dropped'} with the estimated tokens
+    before and after and the sections that were cut short or left out.
+    """
+    text = compact_text(text)
+    tokens = estimate_tokens(text)
+    if tokens <= max_tokens:
+        return text, None
+
+    # Each section from the start of its header line; the text before the first one is 'header'
+    spans = sorted(
+        (text.rfind('\n', 0, start - 1) + 1 if start else 0, end, name)
+        for name, name_spans in segment_resume(text).spans.items() for start, end in name_spans
+    )
+    first = spans[0][0] if spans else len(text)
+    pieces = ([(0, first, 'header')] if first else []) + spans
+    rank = {name: index for index, name in enumerate(priority)}
+
+    # Whole sections that fit, in priority order; then the ones that didn't, cut at a line break
+    kept, cut, dropped = {}, set(), set()
+    left = max_tokens
+    skipped = []
+    for start, end, name in sorted(pieces, key=lambda piece: (rank.get(piece[2], len(priority)), piece[0])):
+        piece = text[start:end].strip()
+        if not piece:
+            continue
+        cost = estimate_tokens(piece) + 2
+        if cost <= left:
+            kept[start] = piece
+            left -= cost
+        else:
+            skipped.append((start, name, piece))
+    for start, name, piece in skipped:
+        if left >= MIN_SECTION_TOKENS:
+            kept[start] = _cut_lines(piece, left - 2)
+            left -= estimate_tokens(kept[start]) + 2
+            cut.add(name)
+        else:
+            dropped.add(name)
+
+    # Kept sections go back in resume order
+    excerpt = '\n\n'.join(kept[start] for start, _, _ in pieces if kept.get(start))
+    return excerpt, {
+        'tokens': tokens,
+        'kept_tokens': estimate_tokens(excerpt),
+        'cut': sorted(cut),
+        'dropped': sorted(dropped - cut)
+    }
+
+
+def format_job_requirements(job_requirements):
+    """The role description and skills as a few lines, instead of the dict's repr"""
+    if not isinstance(job_requirements, dict):
+        return compact_instructions(str(job_requirements))
+    lines = []
+    if job_requirements.get('description'):
+        lines.append(f"Description: {job_requirements['description']}")
+    if job_requirements.get('required_skills'):
+        lines.append("Required skills: " + ", ".join(job_requirements['required_skills']))
+    recommended = job_requirements.get('recommended_skills') or {}
+    if isinstance(recommended, dict):
+        for kind, skills in recommended.items():
+            if skills:
+                lines.append(f"Recommended {kind} skills: " + ", ".join(skills))
+    elif recommended:
+        lines.append("Recommended skills: " + ", ".join(recommended))
+    if job_requirements.get('sections'):
+        lines.append("Expected sections: " + ", ".join(job_requirements['sections']))
+    return '\n'.join(lines) if lines else compact_instructions(str(job_requirements))
+
+
+def measure(analyzer, texts, job_requirements):
+    """Estimated prompt tokens per resume of the uncompacted and of the built feedback prompt"""
+    from utils.resume_analyzer_controller import FEEDBACK_INSTRUCTIONS, FEEDBACK_SYSTEM_PROMPT
+
+    # As prompts were built before: full instructions, the dict's repr and the whole extracted text
+    old_fixed = estimate_tokens(FEEDBACK_SYSTEM_PROMPT + FEEDBACK_INSTRUCTIONS + str(job_requirements))
+    old_tokens = new_tokens = 0
+    for text in texts:
+        old_tokens += old_fixed + estimate_tokens(text)
+        messages, _ = analyzer.build_feedback_messages(text, job_requirements)
+        new_tokens += sum(estimate_tokens(message['content']) for message in messages)
+    return old_tokens / len(texts), new_tokens / len(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure prompt tokens or show recorded LLM token usage")
+    parser.add_argument('command', choices=['measure', 'usage'])
+    parser.add_argument('resumes', nargs='?', help="folder of PDF/DOCX/TXT resumes (measure)")
+    parser.add_argument('--category', help="job category of the role to measure with (default: the first)")
+    parser.add_argument('--role', help="job role to measure with (default: the first of the category)")
+    args = parser.parse_args()
+
+    if args.command == 'usage':
+        from config import database
+
+        rows = database.get_llm_usage_summary()
+        if not rows:
+            print("No LLM calls recorded yet")
+        for row in rows:
+            estimate = f" ({row['estimated_tokens']:.0f} estimated)" if row['estimated_tokens'] else ""
+            print(f"{row['purpose']} ({row['model']}): {row['calls']} calls; per call {row['prompt_tokens']:.0f} "
+                  f"prompt tokens{estimate} and {row['completion_tokens']:.0f} completion tokens")
+        return
+
+    if not args.resumes:
+        parser.error("measure needs a folder of resumes")
+    from config.job_roles import JobRoleCatalog
+    from utils.resume_analyzer_controller import ResumeAnalyzer
+
+    roles = JobRoleCatalog().as_dict()
+    category = args.category or next(iter(roles))
+    role = args.role or next(iter(roles[category]))
+    analyzer = ResumeAnalyzer()
+    texts = []
+    for name in sorted(os.listdir(args.resumes)):
+        if name.lower().endswith(('.pdf', '.docx', '.txt')):
+            try:
+                texts.append(analyzer.extract_text_from_path(os.path.join(args.resumes, name)))
+            except Exception as e:
+                print(f"Error reading {name}: {str(e)}")
+    if not texts:
+        print("No resumes found")
+        return
+    old_tokens, new_tokens = measure(analyzer, texts, roles[category][role])
+    print(f"{len(texts)} resumes, {role}: {old_tokens:.0f} -> {new_tokens:.0f} "
+          f"estimated prompt tokens per resume ({1 - new_tokens / max(1, old_tokens):.0%} fewer)")
+
+
+if __name__ == "__main__":
+    main()
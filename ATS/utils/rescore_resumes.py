@@ -0,0 +1,217 @@
+"""
+Offline re-scoring of stored resumes
+
+Recomputes the heuristic keyword match, section and format scores of every
+resume from the raw text kept in resume_payloads, e.g. after required skills
+in job_roles.json or the formatting checks change. Resumes whose ATS score was
+computed locally get it recomputed from the updated section scores; LLM
+scores are only re-requested with --with-llm. The stored analyze_resume
+result is updated to match. Resumes saved without text, or whose role is no
+longer in job_roles.json, are skipped and keep their scores. Run from the
+ATS folder:
+
+    python -m utils.rescore_resumes --workers 8
+    python -m utils.rescore_resumes --with-llm   # also re-request the ATS score
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from config.job_roles import JobRoleCatalog
+from config.database import get_database_connection, init_database, decode_payload, encode_payload
+from utils.resume_analyzer_controller import (ResumeAnalyzer, local_ats_score, NO_SUGGESTIONS, SKILLS_MATCH_SUGGESTION,
+                                              SKILLS_MATCH_THRESHOLD, SUGGESTION_GROUPS)
+
+
+# Per-process state set up by init_worker
+_analyzer = None
+_job_roles = None
+_with_llm = False
+
+
+def init_worker(job_roles, with_llm):
+    """Create the analyzer once per worker process"""
+    global _analyzer, _job_roles, _with_llm
+    _analyzer = ResumeAnalyzer()
+    _job_roles = job_roles
+    _with_llm = with_llm
+
+
+def update_analysis(analysis, keyword_match, section_score, format_score, format_deductions):
+    """The stored analyze_resume result with the recomputed scores and the suggestions that depend on them"""
+    analysis = dict(analysis)
+    analysis['keyword_match'] = keyword_match
+    analysis['section_score'] = section_score
+    analysis['format_score'] = format_score
+    analysis['format_suggestions'] = list(format_deductions) if format_score < 100 else []
+    skills_suggestions = [item for item in analysis.get('skills_suggestions', []) if item != SKILLS_MATCH_SUGGESTION]
+    if keyword_match['score'] < SKILLS_MATCH_THRESHOLD:
+        skills_suggestions.append(SKILLS_MATCH_SUGGESTION)
+    analysis['skills_suggestions'] = skills_suggestions
+    analysis['suggestions'] = [item for group in SUGGESTION_GROUPS for item in analysis.get(group, [])] or [NO_SUGGESTIONS]
+    analysis['section_scores'] = {
+        **analysis.get('section_scores', {}),
+        'skills': keyword_match['score'],
+        'format': format_score
+    }
+    return analysis
+
+
+def rescore_resume(item):
+    """Recompute the scores of one stored resume; runs in a worker process.
+
+    Returns None for a resume saved without text, and {'resume_id', 'skipped'} with the
+    reason for a resume whose role is not in job_roles.json.
+    """
+    resume_id, category, role, format_version, raw_text_blob, analysis_blob = item
+    text = decode_payload(raw_text_blob, format_version) or ''
+    if not text.strip():
+        return None
+    role_info = _job_roles.get(category, {}).get(role)
+    if role_info is None:
+        # Without the role's required skills the keyword match would drop to 0
+        return {'resume_id': resume_id, 'skipped': f"role '{role}' ({category}) is not in job_roles.json"}
+    analysis = decode_payload(analysis_blob, format_version)
+    required_skills = role_info.get('required_skills', [])
+
+    keyword_match = _analyzer.calculate_keyword_match(text, required_skills)
+    section_score = _analyzer.check_resume_sections(text)
+    format_score, format_deductions = _analyzer.check_formatting(text)
+    result = {
+        'resume_id': resume_id,
+        'keyword_match_score': keyword_match['score'],
+        'missing_skills': json.dumps(keyword_match['missing_skills']),
+        'section_score': section_score,
+        'format_score': format_score,
+        'ats_score': None,
+        'analysis': None,
+        'error': None
+    }
+    if analysis is not None:
+        analysis = update_analysis(analysis, keyword_match, section_score, format_score, format_deductions)
+
+    if _with_llm:
+        try:
+            feedback = _analyzer.get_feedback_from_groq(text, role_info)
+            result['ats_score'] = _analyzer.extract_ats_score(feedback)
+            if analysis is not None:
+                analysis['score_source'] = 'llm'
+        except Exception as e:
+            result['error'] = f"LLM re-scoring failed: {str(e)}"
+    if (result['ats_score'] is None and analysis is not None and analysis.get('section_scores')
+            and analysis.get('score_source') in ('local', 'local_fallback')):
+        # Scored locally: the ATS score follows the updated section scores
+        result['ats_score'] = local_ats_score(analysis['section_scores'])
+
+    if analysis is not None:
+        if result['ats_score'] is not None:
+            analysis['ats_score'] = result['ats_score']
+        result['analysis'] = encode_payload(analysis)
+    return result
+
+
+def iter_stored_resumes(conn, chunk_size):
+    """Yield chunks of (id, category, role, format version, raw text blob, analysis blob) in id order"""
+    cursor = conn.cursor()
+    last_id = 0
+    while True:
+        cursor.execute('''
+        SELECT r.id, r.target_category, r.target_role, p.format_version, p.raw_text, p.analysis
+        FROM resume_payloads p
+        JOIN resume_data r ON r.id = p.resume_id
+        WHERE p.raw_text IS NOT NULL AND r.id > ?
+        ORDER BY r.id
+        LIMIT ?
+        ''', (last_id, chunk_size))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        yield rows
+
+
+def write_scores(conn, results):
+    """Update the latest analysis and the stored result of each resume in one transaction"""
+    heuristic_rows = [
+        (r['keyword_match_score'], r['missing_skills'], r['section_score'], r['format_score'], r['resume_id'])
+        for r in results
+    ]
+    ats_rows = [(r['ats_score'], r['resume_id']) for r in results if r['ats_score'] is not None]
+    payload_rows = [(r['analysis'], r['resume_id']) for r in results if r['analysis'] is not None]
+    latest_analysis = '(SELECT MAX(id) FROM resume_analysis WHERE resume_id = ?)'
+
+    with conn:
+        conn.executemany(f'''
+        UPDATE resume_analysis
+        SET keyword_match_score = ?, missing_skills = ?, section_score = ?, format_score = ?
+        WHERE id = {latest_analysis}
+        ''', heuristic_rows)
+        if ats_rows:
+            conn.executemany(f'''
+            UPDATE resume_analysis SET ats_score = ? WHERE id = {latest_analysis}
+            ''', ats_rows)
+        if payload_rows:
+            conn.executemany('UPDATE resume_payloads SET analysis = ? WHERE resume_id = ?', payload_rows)
+
+
+def rescore_all(workers=None, chunk_size=2000, batch_size=20000, with_llm=False):
+    """Re-score every stored resume and return (rows re-scored, rows skipped for an unknown role, rows/sec)"""
+    init_database()
+    job_roles = JobRoleCatalog().as_dict()
+
+    read_conn = get_database_connection()
+    write_conn = get_database_connection()
+    started = time.perf_counter()
+    total, skipped, pending = 0, 0, []
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(job_roles, with_llm)) as executor:
+            for rows in iter_stored_resumes(read_conn, chunk_size):
+                for result in executor.map(rescore_resume, rows, chunksize=max(1, chunk_size // 64)):
+                    if result is None:
+                        continue
+                    if result.get('skipped'):
+                        skipped += 1
+                        print(f"Resume {result['resume_id']} skipped: {result['skipped']}")
+                        continue
+                    if result['error']:
+                        print(f"Resume {result['resume_id']}: {result['error']}")
+                    pending.append(result)
+
+                if len(pending) >= batch_size:
+                    write_scores(write_conn, pending)
+                    total += len(pending)
+                    pending = []
+                    elapsed = time.perf_counter() - started
+                    print(f"Re-scored {total} resumes ({total / elapsed:.0f} rows/sec)")
+
+            if pending:
+                write_scores(write_conn, pending)
+                total += len(pending)
+    finally:
+        read_conn.close()
+        write_conn.close()
+
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed > 0 else 0
+    return total, skipped, rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute stored resume scores from their saved text")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--chunk-size', type=int, default=2000, help="resumes read from the database per query")
+    parser.add_argument('--batch-size', type=int, default=20000, help="resumes written per transaction")
+    parser.add_argument('--with-llm', action='store_true', help="also re-request the ATS score from the LLM")
+    args = parser.parse_args()
+
+    total, skipped, rate = rescore_all(args.workers, args.chunk_size, args.batch_size, args.with_llm)
+    print(f"Done: re-scored {total} resumes ({rate:.0f} rows/sec)")
+    if skipped:
+        print(f"Skipped {skipped} resumes whose role is not in job_roles.json; their scores were left unchanged")
+
+
+if __name__ == "__main__":
+    main()
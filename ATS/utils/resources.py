@@ -0,0 +1,119 @@
+"""
+Process-wide resources
+
+Streamlit re-runs main.py on every interaction. Objects that are expensive to
+build and hold no per-user state (the resume analyzer, the job role catalog and
+its TF-IDF matcher, the dashboard and its database connection) are created once per server process
+through the registry here and shared by every session. A resource lives until
+it is invalidated or the process exits, and its close function is called then.
+"""
+import atexit
+import os
+import threading
+
+from config import database
+from config.job_roles import JobRoleCatalog
+from utils.semantic_match import SemanticMatcher
+
+
+class ResourceRegistry:
+    """Creates named resources on first use and keeps them for the life of the process"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._resources = {}
+        self.objects_created = 0
+
+    def get(self, name, factory, close=None):
+        """Return the resource called name, creating it with factory() on first use"""
+        with self._lock:
+            if name not in self._resources:
+                self._resources[name] = (factory(), close)
+                self.objects_created += 1
+            return self._resources[name][0]
+
+    def invalidate(self, name):
+        """Close and drop a resource so the next get() creates it again"""
+        with self._lock:
+            resource, close = self._resources.pop(name, (None, None))
+        if close is not None:
+            try:
+                close(resource)
+            except Exception as e:
+                print(f"Error closing {name}: {str(e)}")
+
+    def close_all(self):
+        with self._lock:
+            names = list(self._resources)
+        for name in names:
+            self.invalidate(name)
+
+    def stats(self):
+        """Objects created through the registry and database connections opened so far"""
+        return {
+            'objects': self.objects_created,
+            'connections': database.connections_opened
+        }
+
+    def stats_since(self, before):
+        """What was created since an earlier stats() call, e.g. during one rerun.
+
+        The counters are process-wide, so concurrent sessions are counted too.
+        """
+        after = self.stats()
+        return {key: after[key] - before[key] for key in after}
+
+
+registry = ResourceRegistry()
+atexit.register(registry.close_all)
+
+
+def get_job_role_catalog():
+    """The shared JobRoleCatalog; it reloads itself when job_roles.json changes"""
+    return registry.get('job_role_catalog', JobRoleCatalog)
+
+
+def get_semantic_matcher():
+    """The shared SemanticMatcher over the job role catalog; it refits when the catalog changes"""
+    return registry.get('semantic_matcher', lambda: SemanticMatcher(get_job_role_catalog()))
+
+
+def get_candidate_index():
+    """The shared top-k candidate retrieval index"""
+    from utils.candidate_index import CandidateIndex
+    return registry.get('candidate_index', CandidateIndex)
+
+
+def get_skill_bitsets():
+    """The shared in-memory skill bitsets of all saved resumes"""
+    from utils.skill_bits import SkillBitsets
+    return registry.get('skill_bitsets', SkillBitsets)
+
+
+def get_document_classifier():
+    """The shared trained document type classifier, or None when no usable model has been trained.
+
+    It is reloaded when the model file changes, so a model trained (or retrained)
+    while the app runs is picked up without a restart.
+    """
+    from utils.doc_classifier import DocumentClassifier, MODEL_PATH
+    try:
+        model_stat = os.stat(MODEL_PATH)
+        stamp = (model_stat.st_mtime_ns, model_stat.st_size)
+    except OSError:
+        stamp = None
+
+    def load():
+        return stamp, DocumentClassifier.load(MODEL_PATH)
+
+    loaded_stamp, classifier = registry.get('document_classifier', load)
+    if loaded_stamp != stamp:
+        registry.invalidate('document_classifier')
+        loaded_stamp, classifier = registry.get('document_classifier', load)
+    return classifier
+
+
+def get_resume_analyzer():
+    """The shared ResumeAnalyzer; it holds no per-resume state"""
+    from utils.resume_analyzer_controller import ResumeAnalyzer
+    return registry.get('resume_analyzer', ResumeAnalyzer)
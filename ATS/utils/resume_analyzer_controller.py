@@ -1,10 +1,275 @@
+import json
+import os
 import re
 import requests
 from PyPDF2 import PdfReader
 from docx import Document
-from datetime import datetime
 import pandas as pd
 from io import BytesIO
+from config import database
+from config.job_roles import get_skill_matcher
+from utils import near_duplicates, resources
+from utils.doc_classifier import REJECT_CONFIDENCE
+from utils.extraction_budget import ExtractionBudget
+from utils.experience_dates import experience_months, format_experience
+from utils import prompt_builder
+from utils.section_segmenter import REPORTED_SECTIONS, segment_resume
+from utils.single_flight import SingleFlight, request_key
+
+# Skills extract_skills looks for in resume text
+PREDEFINED_SKILLS = [
+    "Python", "Java", "C++", "JavaScript", "SQL", "Data Structures", 
+    "Algorithms", "Git", "REST APIs", "Cloud Computing", "Docker", 
+    "Kubernetes", "Machine Learning", "Deep Learning", 
+    "Data Visualization", "Pandas", "NumPy", "Scikit-learn", 
+    "TensorFlow", "PyTorch", "Big Data", "Hadoop", "Spark", "Linux", 
+    "CI/CD", "Jenkins", "Terraform", "AWS", "Azure", "Google Cloud", 
+    "Bash", "Monitoring", "Prometheus", "Grafana", "Network Security", 
+    "Penetration Testing", "Ethical Hacking", "Firewalls", "SIEM", 
+    "SOC Operations", "Encryption", "Threat Intelligence", 
+    "Incident Response", "Kali Linux", "Metasploit", "Wireshark", 
+    "CISSP", "Serverless Computing", "Networking", "React.js", 
+    "Node.js", "Django", "Flask", "MongoDB", "GraphQL", "HTML", "CSS", 
+    "TypeScript", "SASS", "Webpack", "UI/UX Design", "Responsive Design", 
+    "Cross-Browser Testing", "Express.js", "Spring Boot", "Ruby on Rails", 
+    "Redis", "Microservices", "Keras", "Computer Vision", "NLP", 
+    "Data Engineering", "MLOps", "MySQL", "PostgreSQL", "Oracle DB", 
+    "Database Optimization", "Indexing", "Backup & Recovery", 
+    "Data Security", "ETL Pipelines", "Windows", "Troubleshooting", 
+    "Technical Support", "Active Directory", "Help Desk", "VPN", 
+    "Remote Desktop", "Cloud Support", "Excel", "Tableau", "Power BI", 
+    "Business Intelligence", "Stakeholder Communication", 
+    "Process Improvement", "Project Management"
+]
+
+GROQ_API_KEY = "<YOUR_API_KEY>"  # Replace with your actual API key
+GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_TIMEOUT = 60
+GROQ_MODEL = "gemma2-9b-it"  # Change to the model you prefer
+
+# The prompts' static text; it is sent with indentation and blank line runs removed
+EXTRACTION_SYSTEM_PROMPT = """YOU ARE AN AI-POWERED ATS (APPLICANT TRACKING SYSTEM) RESUME EVALUATOR, DESIGNED TO DELIVER DETAILED, 
+                    PROFESSIONAL ANALYSIS OF A USER’S RESUME. YOU WILL EVALUATE THE RESUME AGAINST INDUSTRY STANDARDS FOR ATS COMPATIBILITY AND SCORING, 
+                    THEN PROVIDE A COMPREHENSIVE BREAKDOWN OF YOUR FINDINGS.
+                 You should provide details in given format only."""
+EXTRACTION_INSTRUCTIONS = """Extract the following details from the resume: 
+                    - Education
+                    - Experience
+                    - Projects
+                    Format =>
+                    Education: 
+                    <Education details in one line(for each education) >
+                    Experience:
+                    <Experience details => add from and to date and breif summary in one line>
+                    Experience Dates:
+                    <from date - to date, in format described in point 1 in Notes below, 
+                        if current or present is give in input change it to current month, year>
+                        Example: jan/2024 - jun/2024 or sep/2024 - 03/2025 or 01/2023 - 03/2023
+                        if Present or Current is given [i.e jan/2023 - Current] convert it to current month i.e jan/2023 - mar/2025
+                        here (mar/2025 or 03/2025) is current month.
+                    Projects:
+                    <project details like project name  and summary>
+                    Note <for you to understand (output must be in below format), dont print it for user>: 
+                    1) here every date must be in format of "<month first 3 character>/<4 digit of year>". Eg: mar/2024, jan/2020. 
+                    1.1) If user not given in above format, change to above format (point 1 in notes) and display it in output [must].
+                    2) no more or less details should be added other than whats asked.
+                    3) for each point use "-" before it. Don't use any symbol before section heading. [no - or # or *] 
+                        i.e (Education, Experience, Projects) (in a same line).
+                    4) for experince dates section alone use number points for each experince.
+"""
+FEEDBACK_SYSTEM_PROMPT = """YOU ARE AN AI-POWERED ATS (APPLICANT TRACKING SYSTEM) 
+                 RESUME EVALUATOR, DESIGNED TO DELIVER DETAILED, PROFESSIONAL ANALYSIS OF A USER’S RESUME. 
+                 YOUR PRIMARY TASK IS TO EVALUATE THE RESUME AGAINST INDUSTRY STANDARDS FOR ATS COMPATIBILITY, 
+                 SCORING IT ACROSS MULTIPLE DIMENSIONS, 
+                 AND PROVIDING DETAILED RECOMMENDATIONS FOR IMPROVEMENT."""
+FEEDBACK_INSTRUCTIONS = """
+                1. PRIMARY OBJECTIVES
+
+   - CALCULATE an Overall ATS Score (0–100), adapting to the user’s industry and job role. Format: Overall ATS Score: (0-100)/100
+   - BREAK DOWN the score into six weighted categories: 
+     - Keyword Optimization (25%) - Relevance, density, and placement of industry-specific terms based on job descriptions.
+     - Work Experience & Achievements (20%) - Use of action verbs, quantifiable impact, and chronological structure.
+     - Skills & Competencies (15%) - Balance between hard and soft skills, alignment with job expectations.
+     - Education & Certifications (10%) - Completeness, correct formatting, relevance.
+     - Grammar & Consistency (10%) - Uniform tense usage, spelling, punctuation, readability.
+   - EXPLAIN & RECOMMEND actionable improvements tailored to the user’s job role and industry.
+   - [MUST] Do not use any word formatting as this output is going to undergo futher process like data extraction [Using regular expression]. 
+        Thus output should be in raw format.
+
+2. EVALUATION PROCESS
+
+   - READ & INTERPRET the resume text.
+     - Identify ATS-blocking elements (e.g., images, graphics, tables, non-standard fonts).
+     - Extract key information to assess parsing efficiency.
+   - EVALUATE and assign a score to each category (out of 100%).
+     - Strengths: Highlight positive aspects contributing to ATS compatibility.
+     - Weaknesses: Identify formatting issues, missing keywords, inconsistencies.
+   - SUPPORT WITH EVIDENCE by referencing specific resume sections where applicable.
+   - RECOMMEND IMPROVEMENTS using clear, step-by-step guidance.
+   - SUMMARIZE FINDINGS with:
+     - Overall ATS Score
+     - Category-wise Scores & Justifications
+     - Consolidated Improvement Checklist (actionable next steps)
+
+3. CHAIN OF THOUGHT LOGIC
+
+   - UNDERSTAND ATS rules, industry-specific norms, and scoring impact.
+   - BASICS of optimal ATS formatting (fonts, headings, bullet points, structured layout).
+   - BREAK DOWN each category with specific criteria:
+     - Keyword Optimization: Job-specific terminology, correct placements, avoiding keyword stuffing.
+     - Work Experience: Actionable verbs, quantifiable achievements, structured bullets.
+     - Skills & Competencies: Well-defined hard vs. soft skills, aligned with role expectations.
+     - Education & Certifications: Correct ordering, proper formatting, completeness.
+     - Grammar & Consistency: Checking for tense shifts, punctuation errors, readability.
+   - ANALYZE against known ATS parsing behaviors (e.g., Taleo, Workday, Greenhouse compatibility).
+   - BUILD a structured, expert-level report with specific suggestions and examples.
+   - HANDLE EDGE CASES:
+     - Career Changers: Emphasize transferable skills, relevant projects, highlight adaptability.
+     - Employment Gaps: Suggest reframing sections to focus on skills, certifications, or projects.
+     - Technical vs. Non-Technical Resumes: Adjust scoring to reflect domain-specific priorities.
+   - FINAL ANSWER FORMAT:
+     - Overall Score
+     - Category Breakdown
+     - Actionable Recommendations with Examples
+
+4. ATS SYSTEM ADAPTATION
+
+   - Ensure Resume Compatibility with ATS Parsers:
+     - Test parsing against systems like Taleo, Workday, and Greenhouse.
+     - Flag common parsing issues (e.g., headers in tables, missing section titles).
+     - Recommend user-friendly alternatives for unsupported formatting elements.
+   - Provide ATS Pre-Check Recommendations:
+     - Suggest free ATS testing tools for validation.
+     - Guide users on keyword density and placement best practices.
+
+5. MODEL ADAPTATION BASED ON SIZE
+
+   - Smaller Models (1B–7B parameters):
+     - Use straightforward, highly structured instructions.
+     - Provide direct feedback without excessive jargon.
+     - Avoid speculative reasoning (reduce hallucinations).
+   - Larger Models (13B–175B parameters):
+     - Offer in-depth justifications and industry-specific insights.
+     - Include advanced ATS optimization strategies (e.g., LinkedIn synergy, resume-tailoring techniques).
+     - Provide role-specific resume benchmarks (e.g., software engineer vs. sales manager examples).
+
+6. NEGATIVE PROMPTING (WHAT NOT TO DO)
+
+   - NEVER give vague or generic feedback; insights must be pinpointed and data-driven.
+   - DO NOT ignore missing keywords; suggest additions based on job descriptions.
+   - AVOID unstructured suggestions; all improvement steps must be clear and actionable.
+   - NEVER downplay critical issues like poor formatting, lack of structure, or improper keyword usage.
+                
+Here is an Example ouput:
+Resume Evaluation Report for <name of the candidate>
+
+Overall ATS Score: 82/100
+
+Category Breakdown:
+
+1. Keyword Optimization (25%)
+- Score: 20/25
+- Strength: The resume includes several relevant keywords such as Python, Pandas, Power BI, and Machine Learning.
+- Weakness: Keywords like "Data Visualization," "NLP," "Deep Learning," and "AI" are mentioned but not emphasized.
+- Recommendations: Add more emphasis on keywords like "Data Visualization," "NLP," and "Deep Learning."
+
+2. *Work Experience & Achievements (20%)
+- Score: 16/20
+- Strength: The user has a clear and structured work history with specific roles and responsibilities.
+- Weakness: The roles listed (Business Analyst, Data Extraction Engineer, Technical Recruiter) do not fully align with the Data Analyst role.
+- Recomadation: Tailor the work experience to highlight data-related achievements and responsibilities.
+
+Similary other section heading and points.
+"""
+
+# How the ATS score is computed: 'llm' asks the LLM and scores locally when that fails;
+# 'local' never calls the LLM (fast mode for batch triage). Set with ATS_SCORING_MODE.
+SCORING_MODES = ('llm', 'local')
+# Weights of the section scores in the local ATS score; override some or all with
+# e.g. ATS_SCORE_WEIGHTS='{"skills": 0.4, "format": 0.1}'
+SCORE_WEIGHTS = {
+    'contact': 0.1,
+    'summary': 0.1,
+    'skills': 0.3,
+    'experience': 0.2,
+    'education': 0.1,
+    'format': 0.2
+}
+# Keyword match score below which the resume is told to add the required skills;
+# utils.rescore_resumes updates the suggestion when it recomputes the match
+SKILLS_MATCH_THRESHOLD = 70
+SKILLS_MATCH_SUGGESTION = "Add more skills that match the job requirements"
+# Suggestion groups, in the order they are combined into 'suggestions'
+SUGGESTION_GROUPS = ('contact_suggestions', 'summary_suggestions', 'skills_suggestions',
+                     'experience_suggestions', 'education_suggestions', 'format_suggestions')
+NO_SUGGESTIONS = "Your resume is well-optimized for ATS systems"
+
+
+def contact_suggestions_for(personal_info):
+    """Suggestions for the contact details missing from extract_personal_info's result"""
+    suggestions = []
+    if not personal_info.get('email'):
+        suggestions.append("Add your email address")
+    if not personal_info.get('phone'):
+        suggestions.append("Add your phone number")
+    if not personal_info.get('linkedin'):
+        suggestions.append("Add your LinkedIn profile URL")
+    return suggestions
+
+
+def reuse_analysis(prior_analysis, personal_info, duplicate):
+    """A near-duplicate's saved analysis with this resume's personal info and contact suggestions,
+    so the earlier candidate's name and contact details are never shown or saved for this one"""
+    contact_suggestions = contact_suggestions_for(personal_info)
+    analysis = {
+        **prior_analysis,
+        **personal_info,
+        'contact_suggestions': contact_suggestions,
+        'near_duplicate': {**duplicate, 'reused': True}
+    }
+    analysis['suggestions'] = [item for group in SUGGESTION_GROUPS for item in analysis.get(group, [])] or [NO_SUGGESTIONS]
+    if analysis.get('section_scores'):
+        analysis['section_scores'] = {**analysis['section_scores'], 'contact': 100 - len(contact_suggestions) * 25}
+    return analysis
+
+
+# Analyses running in this process, shared by every analyzer so sessions and threads coalesce
+_analyses_in_flight = SingleFlight()
+
+
+class LLMUnavailableError(Exception):
+    """Raised when the LLM request fails, times out, is rate limited or returns no answer"""
+
+
+def default_scoring_mode():
+    mode = os.environ.get('ATS_SCORING_MODE', 'llm').lower()
+    if mode not in SCORING_MODES:
+        print(f"Error: unknown ATS_SCORING_MODE {mode!r}, using 'llm'")
+        return 'llm'
+    return mode
+
+
+def score_weights():
+    """SCORE_WEIGHTS with the overrides from ATS_SCORE_WEIGHTS"""
+    weights = dict(SCORE_WEIGHTS)
+    overrides = os.environ.get('ATS_SCORE_WEIGHTS')
+    if overrides:
+        try:
+            weights.update({name: float(weight) for name, weight in json.loads(overrides).items() if name in weights})
+        except (ValueError, TypeError, AttributeError) as e:
+            print(f"Error reading ATS_SCORE_WEIGHTS: {str(e)}")
+    return weights
+
+
+def local_ats_score(section_scores, weights=None):
+    """Weighted average (0-100) of the section scores"""
+    weights = weights or score_weights()
+    total_weight = sum(weights.values())
+    if total_weight <= 0:
+        return 0
+    score = sum(max(0, min(100, section_scores.get(name, 0))) * weight for name, weight in weights.items())
+    return int(round(score / total_weight))
+
 
 class ResumeAnalyzer:
     def __init__(self):
@@ -29,6 +294,16 @@ class ResumeAnalyzer:
         }
         
     def detect_document_type(self, text):
+        """The document type of text: from the trained classifier when there is one and it is
+        confident, else from keyword densities"""
+        classifier = resources.get_document_classifier()
+        if classifier is not None:
+            label, confidence = classifier.predict(text)
+            if label == 'resume' or confidence >= REJECT_CONFIDENCE:
+                return label
+        return self.detect_document_type_by_keywords(text)
+
+    def detect_document_type_by_keywords(self, text):
         text = text.lower()
         scores = {}
         
@@ -46,29 +321,17 @@ class ResumeAnalyzer:
         return best_match[0] if best_match[1] > 0.15 else 'unknown'
         
     def calculate_keyword_match(self, resume_text, required_skills):
-        resume_text = resume_text.lower()
-        found_skills = []
-        missing_skills = []
-        
-        for skill in required_skills:
-            skill_lower = skill.lower()
-            # Check for exact match
-            if skill_lower in resume_text:
-                found_skills.append(skill)
-            # Check for partial matches (e.g., "Python" in "Python programming")
-            elif any(skill_lower in phrase for phrase in resume_text.split('.')):
-                found_skills.append(skill)
-            else:
-                missing_skills.append(skill)
-                
-        match_score = (len(found_skills) / len(required_skills)) * 100 if required_skills else 0
-        
-        return {
-            'score': match_score,
-            'found_skills': found_skills,
-            'missing_skills': missing_skills
-        }
+        # Matchers are built once per skill list and shared (see config.job_roles)
+        return get_skill_matcher(tuple(required_skills)).match(resume_text)
         
+    def semantic_match(self, resume_text, job_requirements):
+        """TF-IDF relevance (0-100) of the resume to the role's description and skills"""
+        try:
+            return resources.get_semantic_matcher().score(resume_text, job_requirements)
+        except Exception as e:
+            print(f"Error computing semantic match: {str(e)}")
+            return 0
+
     def check_resume_sections(self, text):
         text = text.lower()
         essential_sections = {
@@ -123,35 +386,62 @@ class ResumeAnalyzer:
             
         return max(0, score), deductions
         
-    def extract_text_from_pdf(self, file):
+    def extract_text_from_pdf(self, file, max_pages=None, screen=True):
+        """Extract text from a PDF file, within the default extraction budget"""
+        return self.extract_pdf(file, ExtractionBudget(max_pages=max_pages), screen)[0]
+
+    def extract_pdf(self, file, budget=None, screen=True):
+        """Extract text from a PDF file within budget; returns (text, truncation).
+
+        With screen, extraction stops after the first page when the document
+        classifier is confident it is not a resume; analyze_resume then rejects it.
+        """
         try:
             import PyPDF2
             import io
             
             # Create a PDF reader object
             pdf_reader = PyPDF2.PdfReader(io.BytesIO(file.read()))
+            classifier = resources.get_document_classifier() if screen else None
             
-            # Extract text from all pages
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-                
-            return text
+            # Extract text page by page until the budget runs out
+            return (budget or ExtractionBudget()).read(
+                pdf_reader.pages,
+                lambda page: page.extract_text(),
+                stop=(lambda number, text: number == 0 and classifier.rejects(text)) if classifier else None
+            )
         except Exception as e:
             raise Exception(f"Error extracting text from PDF: {str(e)}")
             
     def extract_text_from_docx(self, docx_file):
-        """Extract text from a DOCX file"""
+        """Extract text from a DOCX file, within the default extraction budget"""
+        return self.extract_docx(docx_file)[0]
+
+    def extract_docx(self, docx_file, budget=None):
+        """Extract text from a DOCX file within budget; returns (text, truncation)"""
         try:
             from docx import Document
             doc = Document(docx_file)
-            full_text = []
-            for paragraph in doc.paragraphs:
-                full_text.append(paragraph.text)
-            return '\n'.join(full_text)
+            return (budget or ExtractionBudget()).read(doc.paragraphs, lambda paragraph: paragraph.text, unit='paragraphs')
         except Exception as e:
             raise Exception(f"Error extracting text from DOCX file: {str(e)}")
 
+    def extract_text_from_path(self, path, max_pages=None):
+        """Extract text from a PDF, DOCX or plain text file on disk"""
+        return self.extract_path(path, ExtractionBudget(max_pages=max_pages), screen=max_pages is None)[0]
+
+    def extract_path(self, path, budget=None, screen=True):
+        """Extract text from a PDF, DOCX or plain text file on disk within budget; returns (text, truncation)"""
+        budget = budget or ExtractionBudget()
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.pdf':
+            with open(path, 'rb') as file:
+                return self.extract_pdf(file, budget, screen)
+        if extension == '.docx':
+            return self.extract_docx(path, budget)
+        with open(path, 'r', encoding='utf-8', errors='ignore') as file:
+            return budget.clip(file.read())
+
     def extract_personal_info(self, text):
         """Extract personal information from resume text"""
         # Basic patterns for personal info
@@ -189,103 +479,94 @@ class ResumeAnalyzer:
         }
 
     def extract_resume_details_using_LLM(self,resume_text):
+        messages, _ = self.build_extraction_messages(resume_text)
         payload = {
-            "model": "gemma2-9b-it",  # Change to the model you prefer
-            "messages": [
-                {"role": "system", "content": """YOU ARE AN AI-POWERED ATS (APPLICANT TRACKING SYSTEM) RESUME EVALUATOR, DESIGNED TO DELIVER DETAILED, 
-                    PROFESSIONAL ANALYSIS OF A USER’S RESUME. YOU WILL EVALUATE THE RESUME AGAINST INDUSTRY STANDARDS FOR ATS COMPATIBILITY AND SCORING, 
-                    THEN PROVIDE A COMPREHENSIVE BREAKDOWN OF YOUR FINDINGS.
-                 You should provide details in given format only."""},
-                {"role": "user", "content": f"""Extract the following details from the resume: 
-                    - Education
-                    - Experience
-                    - Projects
-                    Format =>
-                    Education: 
-                    <Education details in one line(for each education) >
-                    Experience:
-                    <Experience details => add from and to date and breif summary in one line>
-                    Experience Dates:
-                    <from date - to date, in format described in point 1 in Notes below, 
-                        if current or present is give in input change it to current month, year>
-                        Example: jan/2024 - jun/2024 or sep/2024 - 03/2025 or 01/2023 - 03/2023
-                        if Present or Current is given [i.e jan/2023 - Current] convert it to current month i.e jan/2023 - mar/2025
-                        here (mar/2025 or 03/2025) is current month.
-                    Projects:
-                    <project details like project name  and summary>
-                    Note <for you to understand (output must be in below format), dont print it for user>: 
-                    1) here every date must be in format of "<month first 3 character>/<4 digit of year>". Eg: mar/2024, jan/2020. 
-                    1.1) If user not given in above format, change to above format (point 1 in notes) and display it in output [must].
-                    2) no more or less details should be added other than whats asked.
-                    3) for each point use "-" before it. Don't use any symbol before section heading. [no - or # or *] 
-                        i.e (Education, Experience, Projects) (in a same line).
-                    4) for experince dates section alone use number points for each experince. 
-                    {resume_text}"""} 
-            ],
+            "model": GROQ_MODEL,
+            "messages": messages,
             "temperature":0.1
         }
-        API_KEY = "<YOUR_API_KEY>"  # Replace with your actual API key
-
-        URL = "https://api.groq.com/openai/v1/chat/completions"
-        HEADERS = {"Authorization": f"Bearer {API_KEY}", "Content-Type": "application/json"}  # Replace with your API Key
-        
-        response = requests.post(URL, headers=HEADERS, json=payload)
-        response= response.json()
-        # print("Feedback:", response.get("choices", [{}])[0].get("message", {}).get("content", "No response received."))
-        return response.get("choices", [{}])[0].get("message", {}).get("content", "No response received.")
-
-    def extract_experience_dates_from_section(self,text):
+        return self._post_groq(payload, 'extraction')
+
+    def build_extraction_messages(self, resume_text):
+        """Chat messages asking for the resume's sections, with the resume compacted and
+        trimmed to the model's token budget; returns (messages, trimmed)"""
+        system = prompt_builder.compact_instructions(EXTRACTION_SYSTEM_PROMPT)
+        instructions = prompt_builder.compact_instructions(EXTRACTION_INSTRUCTIONS)
+        budget = prompt_builder.resume_token_budget(GROQ_MODEL, system + instructions)
+        resume, trimmed = prompt_builder.resume_excerpt(resume_text, budget, prompt_builder.EXTRACTION_PRIORITY)
+        return [
+            {"role": "system", "content": system},
+            {"role": "user", "content": f"{instructions}\n{resume}"}
+        ], trimmed
+
+    def _post_groq(self, payload, purpose='chat'):
+        """Send a chat completion request to Groq and return the answer text.
+
+        Raises LLMUnavailableError on network errors, timeouts, rate limiting and
+        responses without an answer, so callers can fall back to local results.
+        The tokens the call used are recorded under purpose.
         """
-        Extracts experience date ranges from the 'Experience Dates' section and returns them as a list.
-        """ 
-        # Find the individual date ranges
-        # pattern1 = r'\d\. (\w{3}|\d{2}/\d{4} - \w{3}|\d{2}/\d{4})'
-        # pattern2 = r'\d\. (\w{3}|\d{2}/\d{4} - [A-Za-z]+)'
-        # date_range_pattern = f'({pattern1})|({pattern2})'
-        pattern1 = r'\d+\.\s*(\d{2}/\d{4})\s*-\s*(\d{2}/\d{4}|current)'
-        pattern2 = r'\d+\.\s*([A-Za-z]{3}/\d{4})\s*-\s*([A-Za-z]{3}/\d{4}|current)'
-        # date_range_pattern = f'{pattern1}|{pattern2}' #r'\d\. (\w{3}|\d{2}/\d{4} - [A-Za-z]+|[0-9/]{7})'
-        #r'\d+\. \s*(\d{2}/\d{4}\s*-\s*\w{3}|\d{2}/\d{4}|current)' #f'({pattern1})|({pattern2})'
-
-        date_range_pattern = r'\d\. ([A-Za-z]{3}/\d{4} - [A-Za-z]{3}/\d{4}|current|present)'
-        experience_dates = re.findall(date_range_pattern,text)
-        date_ranges = [f"{m[0]} - {m[1]}" for m in experience_dates]
-        print(experience_dates)
-        return experience_dates
-        # print(date_ranges)
-        # return date_ranges
-        
-        # return []  # Return an empty list if no experience dates section is found
-
-    def calculate_months(self, start_str, end_str):
-        month_map = {
-            'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
-            'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
-            '01': 1, '02': 2, '03': 3, '04': 4, '05': 5, '06': 6,
-            '07': 7, '08': 8, '09': 9, '10': 10, '11': 11, '12':12 
-        }
-        print(start_str, end_str)
-        # Extract month and year from the date string
-        start_str = start_str.lower()
-        start_month, start_year = start_str.split('/')
-        if end_str.lower() not in ["cur", "pre"]:
-            end_month, end_year = end_str.split('/')
-        else:
-            end_month, end_year = "0"+str(datetime.now().month), datetime.now().year
-        
-        # Convert month abbreviation to number
-        start_month_num = month_map[start_month]
-        end_month_num = month_map[end_month.lower()]
-        
-        # Calculate the difference in years and months
-        start_date = datetime(int(start_year), start_month_num, 1)
-        end_date = datetime(int(end_year), end_month_num, 1)
-        
-        delta = (end_date.year - start_date.year) * 12 + end_date.month - start_date.month+1
-        return delta
+        headers = {"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"}
+        try:
+            response = requests.post(GROQ_URL, headers=headers, json=payload, timeout=GROQ_TIMEOUT)
+        except requests.RequestException as e:
+            raise LLMUnavailableError(f"Groq request failed: {str(e)}") from e
+        if response.status_code == 429:
+            retry_after = response.headers.get('retry-after')
+            raise LLMUnavailableError("Groq rate limit reached" + (f", retry after {retry_after}s" if retry_after else ""))
+        if response.status_code != 200:
+            raise LLMUnavailableError(f"Groq returned HTTP {response.status_code}")
+        try:
+            answer = response.json()
+            content = answer["choices"][0]["message"]["content"]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise LLMUnavailableError("Groq returned no answer") from e
+        self._record_usage(payload, purpose, answer.get("usage"))
+        if not content:
+            raise LLMUnavailableError("Groq returned an empty answer")
+        return content
+
+    def _record_usage(self, payload, purpose, usage):
+        """Save the prompt and completion tokens of an LLM call, with the local estimate
+        of the prompt tokens"""
+        estimate = sum(prompt_builder.estimate_tokens(message["content"]) for message in payload["messages"])
+        usage = usage if isinstance(usage, dict) else {}
+        print(f"LLM tokens ({purpose}): {usage.get('prompt_tokens', '?')} in, "
+              f"{usage.get('completion_tokens', '?')} out, {estimate} estimated in")
+        database.log_llm_usage(purpose, payload["model"], usage.get("prompt_tokens"),
+                               usage.get("completion_tokens"), estimate)
+
+    def extract_education_experience_projects(self, text, use_llm=True):
+        """Extract education, experience, projects information from resume text.
+
+        Sections are found locally when the resume has clear headers; the LLM is
+        only asked when too few were found (and use_llm is set). Sections it
+        doesn't return keep the local result.
+        """
+        segmentation = segment_resume(text)
+        sections = {key: segmentation.entries(name) for name, key in REPORTED_SECTIONS.items()}
+        experience_text = segmentation.section_text('experience')
+        sections["Experience Months"] = experience_months(experience_text)
+        sections["Total Experience"] = format_experience(sections["Experience Months"])
+        if segmentation.confident or not use_llm:
+            return sections
+
+        try:
+            llm_sections = self.extract_education_experience_projects_using_LLM(text)
+        except Exception as e:
+            print(f"Error extracting sections with LLM: {str(e)}")
+            return sections
+        if not any(key in llm_sections for key in REPORTED_SECTIONS.values()):
+            return sections
+        sections.update(llm_sections)
+        if experience_text:
+            # Dates in the resume's own experience section beat the LLM's rewrite of them
+            sections["Experience Months"] = experience_months(experience_text)
+            sections["Total Experience"] = format_experience(sections["Experience Months"])
+        return sections
 
-    def extract_education_experience_projects(self, text):
-        """Extract education, experience, projects information from resume text"""
+    def extract_education_experience_projects_using_LLM(self, text):
+        """Extract education, experience, projects information with the LLM"""
         LLM_response = self.extract_resume_details_using_LLM(text)
         print("\nLLM response for section: \n", LLM_response)
         sections = {}
@@ -296,6 +577,7 @@ class ResumeAnalyzer:
         lines = LLM_response.split("\n")
         
         current_section = None
+        experience_lines = []
         for line in lines:
             line = line.strip()
             
@@ -306,7 +588,10 @@ class ResumeAnalyzer:
                 #     sections[current_section] = {}  # Use dict for experience duration
                 # else:
                 sections[current_section] = []  # Use list for other sections
-            elif current_section and line.startswith("- "):
+                continue
+            if current_section and "Experience" in current_section:
+                experience_lines.append(line)
+            if current_section and line.startswith("- "):
                 if isinstance(sections[current_section], list):
                     sections[current_section].append(line.strip("- "))
                 else:
@@ -317,61 +602,17 @@ class ResumeAnalyzer:
         # print("SECTION INFO: \n", sections)
         # section extraction completed.
 
-        # Extracting years of experience.
-        experience_dates = self.extract_experience_dates_from_section(LLM_response)
-        # print("EXP DATES: \n", experience_dates)
-        # Regex pattern to extract date ranges (e.g., May/2024 - May/2024)
-        # date_pattern = r'({\w{3}|\d{2}}/\d{4}) - ({\w{3}|\d{2}}/\d{4})'
-        date_pattern = r'(\b(?:[A-Za-z]{3}|\d{2})/\d{4}) - (\b(?:[A-Za-z]{3}|\d{2})/\d{4}|current|present)'
-        # Initialize total months and years
-        total_months = 0
-
-        # Process each entry in the data
-        for entry in experience_dates:
-            # Find date ranges in the entry
-            match = re.search(date_pattern, entry)
-            # print(match)
-            if match:
-                start_date = match.group(1)
-                end_date = match.group(2)
-                total_months += self.calculate_months(start_date, end_date) 
-        
-        # Convert total months to years and remaining months
-        total_years = total_months // 12
-        remaining_months = total_months % 12
-        # print(sections)
-        print(f"Total Duration: {total_years} years and {remaining_months} months")
-
-        sections["Total Experience"] = f"{total_years} years and {remaining_months} months"
+        # Extracting years of experience from the "Experience" and "Experience Dates" lines;
+        # the same job in both is merged, not counted twice
+        total_months = experience_months("\n".join(experience_lines))
+        print(f"Total Duration: {format_experience(total_months)}")
+
+        sections["Experience Months"] = total_months
+        sections["Total Experience"] = format_experience(total_months)
 
         return sections
 
     def extract_skills(self, text):
-        predefined_skills = [
-            "Python", "Java", "C++", "JavaScript", "SQL", "Data Structures", 
-            "Algorithms", "Git", "REST APIs", "Cloud Computing", "Docker", 
-            "Kubernetes", "Machine Learning", "Deep Learning", 
-            "Data Visualization", "Pandas", "NumPy", "Scikit-learn", 
-            "TensorFlow", "PyTorch", "Big Data", "Hadoop", "Spark", "Linux", 
-            "CI/CD", "Jenkins", "Terraform", "AWS", "Azure", "Google Cloud", 
-            "Bash", "Monitoring", "Prometheus", "Grafana", "Network Security", 
-            "Penetration Testing", "Ethical Hacking", "Firewalls", "SIEM", 
-            "SOC Operations", "Encryption", "Threat Intelligence", 
-            "Incident Response", "Kali Linux", "Metasploit", "Wireshark", 
-            "CISSP", "Serverless Computing", "Networking", "React.js", 
-            "Node.js", "Django", "Flask", "MongoDB", "GraphQL", "HTML", "CSS", 
-            "TypeScript", "SASS", "Webpack", "UI/UX Design", "Responsive Design", 
-            "Cross-Browser Testing", "Express.js", "Spring Boot", "Ruby on Rails", 
-            "Redis", "Microservices", "Keras", "Computer Vision", "NLP", 
-            "Data Engineering", "MLOps", "MySQL", "PostgreSQL", "Oracle DB", 
-            "Database Optimization", "Indexing", "Backup & Recovery", 
-            "Data Security", "ETL Pipelines", "Windows", "Troubleshooting", 
-            "Technical Support", "Active Directory", "Help Desk", "VPN", 
-            "Remote Desktop", "Cloud Support", "Excel", "Tableau", "Power BI", 
-            "Business Intelligence", "Stakeholder Communication", 
-            "Process Improvement", "Project Management"
-        ]
-
         skill_taxonomy = {"sql": "Structured Query Language", "nlp":"Natural Language Processing",
             "css":"Cascading Style Sheet", "dl":"Deep Learning", "ml":"Machine Learning",
             "js":"JavaScript", "aws": "Amazon Web Servies", "eda":"Exploratory Data Analysis",
@@ -384,7 +625,7 @@ class ResumeAnalyzer:
         
         skills = set()
         
-        for i in predefined_skills:
+        for i in PREDEFINED_SKILLS:
             if i.lower() in text.lower():
                 skills.add(i)
         skill_list = list(skills)
@@ -476,140 +717,71 @@ class ResumeAnalyzer:
 
     def get_feedback_from_groq(self, text, job_requirements):
         """Sends the extracted text to the Groq API and gets feedback."""
+        messages, _ = self.build_feedback_messages(text, job_requirements)
         payload = {
-            "model": "gemma2-9b-it",  # Change to the model you prefer
+            "model": GROQ_MODEL,
             "temperature": 0.2,
-            "messages": [
-                {"role": "system", "content": """YOU ARE AN AI-POWERED ATS (APPLICANT TRACKING SYSTEM) 
-                 RESUME EVALUATOR, DESIGNED TO DELIVER DETAILED, PROFESSIONAL ANALYSIS OF A USER’S RESUME. 
-                 YOUR PRIMARY TASK IS TO EVALUATE THE RESUME AGAINST INDUSTRY STANDARDS FOR ATS COMPATIBILITY, 
-                 SCORING IT ACROSS MULTIPLE DIMENSIONS, 
-                 AND PROVIDING DETAILED RECOMMENDATIONS FOR IMPROVEMENT."""},
-                {"role": "user", "content": f"""
-                1. PRIMARY OBJECTIVES
-
-   - CALCULATE an Overall ATS Score (0–100), adapting to the user’s industry and job role. Format: Overall ATS Score: (0-100)/100
-   - BREAK DOWN the score into six weighted categories: 
-     - Keyword Optimization (25%) - Relevance, density, and placement of industry-specific terms based on job descriptions.
-     - Work Experience & Achievements (20%) - Use of action verbs, quantifiable impact, and chronological structure.
-     - Skills & Competencies (15%) - Balance between hard and soft skills, alignment with job expectations.
-     - Education & Certifications (10%) - Completeness, correct formatting, relevance.
-     - Grammar & Consistency (10%) - Uniform tense usage, spelling, punctuation, readability.
-   - EXPLAIN & RECOMMEND actionable improvements tailored to the user’s job role and industry.
-   - [MUST] Do not use any word formatting as this output is going to undergo futher process like data extraction [Using regular expression]. 
-        Thus output should be in raw format.
-
-2. EVALUATION PROCESS
-
-   - READ & INTERPRET the resume text.
-     - Identify ATS-blocking elements (e.g., images, graphics, tables, non-standard fonts).
-     - Extract key information to assess parsing efficiency.
-   - EVALUATE and assign a score to each category (out of 100%).
-     - Strengths: Highlight positive aspects contributing to ATS compatibility.
-     - Weaknesses: Identify formatting issues, missing keywords, inconsistencies.
-   - SUPPORT WITH EVIDENCE by referencing specific resume sections where applicable.
-   - RECOMMEND IMPROVEMENTS using clear, step-by-step guidance.
-   - SUMMARIZE FINDINGS with:
-     - Overall ATS Score
-     - Category-wise Scores & Justifications
-     - Consolidated Improvement Checklist (actionable next steps)
-
-3. CHAIN OF THOUGHT LOGIC
-
-   - UNDERSTAND ATS rules, industry-specific norms, and scoring impact.
-   - BASICS of optimal ATS formatting (fonts, headings, bullet points, structured layout).
-   - BREAK DOWN each category with specific criteria:
-     - Keyword Optimization: Job-specific terminology, correct placements, avoiding keyword stuffing.
-     - Work Experience: Actionable verbs, quantifiable achievements, structured bullets.
-     - Skills & Competencies: Well-defined hard vs. soft skills, aligned with role expectations.
-     - Education & Certifications: Correct ordering, proper formatting, completeness.
-     - Grammar & Consistency: Checking for tense shifts, punctuation errors, readability.
-   - ANALYZE against known ATS parsing behaviors (e.g., Taleo, Workday, Greenhouse compatibility).
-   - BUILD a structured, expert-level report with specific suggestions and examples.
-   - HANDLE EDGE CASES:
-     - Career Changers: Emphasize transferable skills, relevant projects, highlight adaptability.
-     - Employment Gaps: Suggest reframing sections to focus on skills, certifications, or projects.
-     - Technical vs. Non-Technical Resumes: Adjust scoring to reflect domain-specific priorities.
-   - FINAL ANSWER FORMAT:
-     - Overall Score
-     - Category Breakdown
-     - Actionable Recommendations with Examples
-
-4. ATS SYSTEM ADAPTATION
-
-   - Ensure Resume Compatibility with ATS Parsers:
-     - Test parsing against systems like Taleo, Workday, and Greenhouse.
-     - Flag common parsing issues (e.g., headers in tables, missing section titles).
-     - Recommend user-friendly alternatives for unsupported formatting elements.
-   - Provide ATS Pre-Check Recommendations:
-     - Suggest free ATS testing tools for validation.
-     - Guide users on keyword density and placement best practices.
-
-5. MODEL ADAPTATION BASED ON SIZE
-
-   - Smaller Models (1B–7B parameters):
-     - Use straightforward, highly structured instructions.
-     - Provide direct feedback without excessive jargon.
-     - Avoid speculative reasoning (reduce hallucinations).
-   - Larger Models (13B–175B parameters):
-     - Offer in-depth justifications and industry-specific insights.
-     - Include advanced ATS optimization strategies (e.g., LinkedIn synergy, resume-tailoring techniques).
-     - Provide role-specific resume benchmarks (e.g., software engineer vs. sales manager examples).
-
-6. NEGATIVE PROMPTING (WHAT NOT TO DO)
-
-   - NEVER give vague or generic feedback; insights must be pinpointed and data-driven.
-   - DO NOT ignore missing keywords; suggest additions based on job descriptions.
-   - AVOID unstructured suggestions; all improvement steps must be clear and actionable.
-   - NEVER downplay critical issues like poor formatting, lack of structure, or improper keyword usage.
-                
-Here is an Example ouput:
-Resume Evaluation Report for <name of the candidate>
-
-Overall ATS Score: 82/100
-
-Category Breakdown:
-
-1. Keyword Optimization (25%)
-- Score: 20/25
-- Strength: The resume includes several relevant keywords such as Python, Pandas, Power BI, and Machine Learning.
-- Weakness: Keywords like "Data Visualization," "NLP," "Deep Learning," and "AI" are mentioned but not emphasized.
-- Recommendations: Add more emphasis on keywords like "Data Visualization," "NLP," and "Deep Learning."
-
-2. *Work Experience & Achievements (20%)
-- Score: 16/20
-- Strength: The user has a clear and structured work history with specific roles and responsibilities.
-- Weakness: The roles listed (Business Analyst, Data Extraction Engineer, Technical Recruiter) do not fully align with the Data Analyst role.
-- Recomadation: Tailor the work experience to highlight data-related achievements and responsibilities.
-
-Similary other section heading and points.
-                    
-
-            ## JOB DESCRIPTION FOR ROLE ##
-                {job_requirements}.
-            here is the content of resume  
-                {text}."""}
-            ]
-        }
-        # Groq API configuration
-        API_KEY = "<YOUR_API_KEY>"  # Replace with your actual API key 
-        URL = "https://api.groq.com/openai/v1/chat/completions"
-        HEADERS = {
-            "Authorization": f"Bearer {API_KEY}",
-            "Content-Type": "application/json"
+            "messages": messages
         }
+        return self._post_groq(payload, 'feedback')
+
+    def build_feedback_messages(self, text, job_requirements):
+        """Chat messages asking for the ATS evaluation, with the resume compacted and
+        trimmed to the model's token budget; returns (messages, trimmed)"""
+        system = prompt_builder.compact_instructions(FEEDBACK_SYSTEM_PROMPT)
+        instructions = prompt_builder.compact_instructions(FEEDBACK_INSTRUCTIONS)
+        job = prompt_builder.format_job_requirements(job_requirements)
+        budget = prompt_builder.resume_token_budget(GROQ_MODEL, system + instructions + job)
+        resume, trimmed = prompt_builder.resume_excerpt(text, budget, prompt_builder.SCORING_PRIORITY)
+        if trimmed:
+            print(f"Resume trimmed for the LLM from {trimmed['tokens']} to {trimmed['kept_tokens']} tokens "
+                  f"(cut: {', '.join(trimmed['cut']) or 'none'}; left out: {', '.join(trimmed['dropped']) or 'none'})")
+        return [
+            {"role": "system", "content": system},
+            {"role": "user", "content": f"{instructions}\n\n## JOB DESCRIPTION FOR ROLE ##\n{job}\n"
+                                        f"here is the content of resume\n{resume}"}
+        ], trimmed
+
+
+    def extract_ats_score(self, LLM_feedback):
+        """Extract the overall ATS score from the LLM feedback text"""
+        pattern = r'ATS Score:.*?\b(\d{1,3})\s*/\s*100'
+        # Find matches using regex
+        matches = re.findall(pattern, LLM_feedback, re.IGNORECASE)
+        print(matches)
+        if not matches or int(matches[0]) > 100:
+            raise ValueError("No ATS score found in LLM feedback")
+        return int(matches[0])
 
+    def analyze_resume(self, resume_data, job_requirements, reuse_duplicates=True, scoring_mode=None):
+        """Analyze resume and return scores and recommendations.
 
-        response = requests.post(URL, headers=HEADERS, json=payload)
-        # st.write(response.json())
-        response = response.json()
-        return response.get("choices", [{}])[0].get("message", {}).get("content", "No response received.")
+        If the text is a near-duplicate of a saved resume, the result has a
+        'near_duplicate' entry; with reuse_duplicates, that resume's analysis is
+        returned without calling the LLM when it was made for the same required skills,
+        with this resume's own personal info.
 
+        scoring_mode ('llm' or 'local', default ATS_SCORING_MODE) picks how the ATS
+        score is computed; 'score_source' in the result tells which was used.
 
-    def analyze_resume(self, resume_data, job_requirements):
-        """Analyze resume and return scores and recommendations"""
+        resume_data may carry 'extraction_truncated', what the extraction budget cut
+        from the document; it is copied to the result.
+
+        Identical requests made while one is running (same text, requirements,
+        options and prompt version) wait for it and share its result.
+        """
         text = resume_data.get('raw_text', '')
-        
+        truncation = resume_data.get('extraction_truncated')
+        scoring_mode = scoring_mode or default_scoring_mode()
+        key = request_key(text, job_requirements, reuse_duplicates, scoring_mode, truncation)
+        result, shared = _analyses_in_flight.do(
+            key, lambda: self._analyze_resume(text, truncation, job_requirements, reuse_duplicates, scoring_mode)
+        )
+        if shared:
+            print("Shared the result of an identical analysis already in progress")
+        return result
+
+    def _analyze_resume(self, text, truncation, job_requirements, reuse_duplicates, scoring_mode):
         # Extract personal information
         personal_info = self.extract_personal_info(text)
         
@@ -622,21 +794,33 @@ Similary other section heading and points.
                 'keyword_match': {'score': 0, 'found_skills': [], 'missing_skills': []},
                 'section_score': 0,
                 'format_score': 0,
-                'suggestions': [f"This appears to be a {doc_type} document. Please upload a resume for ATS analysis."]
+                'suggestions': [f"This appears to be a {doc_type} document. Please upload a resume for ATS analysis."],
+                'extraction_truncated': truncation
             }
             
         # Calculate keyword match
         required_skills = job_requirements.get('required_skills', [])
+
+        duplicate = near_duplicates.find_near_duplicate(text)
+        if duplicate:
+            print(f"Near-duplicate of #{duplicate['resume_id']} (Jaccard {duplicate['similarity']:.2f})")
+            prior_analysis = near_duplicates.reusable_analysis(duplicate, required_skills) if reuse_duplicates else None
+            if prior_analysis:
+                return reuse_analysis(prior_analysis, personal_info, duplicate)
+            duplicate = {**duplicate, 'reused': False}
+
         keyword_match = self.calculate_keyword_match(text, required_skills)
+        semantic_match = self.semantic_match(text, job_requirements)
         
         # Extract all resume sections
         skills = list(self.extract_skills(text))  # Convert skills set to list
         summary = self.extract_summary(text)
-        other_details = self.extract_education_experience_projects(text)
+        other_details = self.extract_education_experience_projects(text, use_llm=scoring_mode == 'llm')
         education = other_details["Education:"]
         experience = other_details["Experience:"]
         projects = other_details["Projects:"]
         total_experience = other_details["Total Experience"]
+        total_experience_months = other_details.get("Experience Months")
         print(total_experience)
         # Check resume sections
         section_score = self.check_resume_sections(text)
@@ -645,13 +829,7 @@ Similary other section heading and points.
         format_score, format_deductions = self.check_formatting(text)
         
         # Generate section-specific suggestions
-        contact_suggestions = []
-        if not personal_info.get('email'):
-            contact_suggestions.append("Add your email address")
-        if not personal_info.get('phone'):
-            contact_suggestions.append("Add your phone number")
-        if not personal_info.get('linkedin'):
-            contact_suggestions.append("Add your LinkedIn profile URL")
+        contact_suggestions = contact_suggestions_for(personal_info)
         
         summary_suggestions = []
         if not summary:
@@ -666,8 +844,8 @@ Similary other section heading and points.
             skills_suggestions.append("Add a dedicated skills section")
         if isinstance(skills, (list, set)) and len(list(skills)) < 5:
             skills_suggestions.append("List more relevant technical and soft skills")
-        if keyword_match['score'] < 70:
-            skills_suggestions.append("Add more skills that match the job requirements")
+        if keyword_match['score'] < SKILLS_MATCH_THRESHOLD:
+            skills_suggestions.append(SKILLS_MATCH_SUGGESTION)
         
         experience_suggestions = []
         if not experience:
@@ -713,37 +891,34 @@ Similary other section heading and points.
         experience_score = 100 - (len(experience_suggestions) * 25)
         education_score = 100 - (len(education_suggestions) * 25)
         
-        # Calculate overall ATS score with weighted components
-        LLM_feedback = self.get_feedback_from_groq(text, job_requirements) 
-        print("LLM FEEDBACK: ",LLM_feedback)
+        section_scores = {
+            'contact': contact_score,
+            'summary': summary_score,
+            'skills': skills_score,
+            'experience': experience_score,
+            'education': education_score,
+            'format': format_score
+        }
 
+        # Calculate overall ATS score: from the LLM, or locally from the weighted section scores
+        summary_feedback = []
+        score_source = 'local'
+        if scoring_mode == 'llm':
+            try:
+                LLM_feedback = self.get_feedback_from_groq(text, job_requirements)
+                print("LLM FEEDBACK: ",LLM_feedback)
+                ats_score = self.extract_ats_score(LLM_feedback)
+                score_source = 'llm'
+                summary_feedback = re.findall(r"(\d+\..*?)\n- Score:.*?\n- Strength: (.*?)\n- Weakness: (.*?)\n", LLM_feedback, re.DOTALL)
+            except (LLMUnavailableError, ValueError) as e:
+                print(f"Error getting ATS score from LLM, scoring locally: {str(e)}")
+                score_source = 'local_fallback'
+        if score_source != 'llm':
+            ats_score = local_ats_score(section_scores)
 
-        pattern = r'ATS Score:.* (\d\d\/100)'
-        # Find matches using regex
-        matches = re.findall(pattern, LLM_feedback, re.IGNORECASE)
-        print(matches)
-        ats_score = int(matches[0][0:2])
-        
         print("ATS SCORE: ",ats_score)
-
-        pattern_summary = re.findall(r"(\d+\..*?)\n- Score:.*?\n- Strength: (.*?)\n- Weakness: (.*?)\n", LLM_feedback, re.DOTALL)
-
-        # matchs in form of dictonary
-        # matches = [match.groupdict() for match in pattern_summary.finditer(LLM_feedback)] 
-        summary_feedback = pattern_summary
         summary_feedback.append(ats_score)
-        for section in summary_feedback:
-            print(section)
-
-        # ats_score = (
-        #     int(round(contact_score * 0.1)) +      # 10% weight for contact info
-        #     int(round(summary_score * 0.1)) +      # 10% weight for summary
-        #     int(round(skills_score * 0.3)) +       # 30% weight for skills match
-        #     int(round(experience_score * 0.2)) +   # 20% weight for experience
-        #     int(round(education_score * 0.1)) +    # 10% weight for education
-        #     int(round(format_score * 0.2))         # 20% weight for formatting
-        # )
-        
+
         # Combine all suggestions into a single list
         suggestions = []
         suggestions.extend(contact_suggestions)
@@ -754,18 +929,20 @@ Similary other section heading and points.
         suggestions.extend(format_suggestions)
         
         if not suggestions:
-            suggestions.append("Your resume is well-optimized for ATS systems")
+            suggestions.append(NO_SUGGESTIONS)
         
         return {
             **personal_info,  # Include extracted personal info
             'ats_score': ats_score,
             'document_type': 'resume',
             'keyword_match': keyword_match,
+            'semantic_match': semantic_match,
             'section_score': section_score,
             'format_score': format_score,
             'education': education,
             'experience': experience,
             'total_experience': total_experience,
+            'experience_months': total_experience_months,
             'projects': projects,
             'skills': skills,
             'summary': summary,
@@ -777,14 +954,10 @@ Similary other section heading and points.
             'education_suggestions': education_suggestions,
             'format_suggestions': format_suggestions,
             'summary_feedback': summary_feedback,
-            'section_scores': {
-                'contact': contact_score,
-                'summary': summary_score,
-                'skills': skills_score,
-                'experience': experience_score,
-                'education': education_score,
-                'format': format_score
-            }
+            'near_duplicate': duplicate,
+            'score_source': score_source,
+            'extraction_truncated': truncation,
+            'section_scores': section_scores
         }
     
     def extract_links_from_pdf(self,pdf_file):
@@ -815,6 +988,10 @@ Similary other section heading and points.
         except requests.RequestException:
             return False
         
+    def search_resumes(self, query, limit=20, min_experience_years=None):
+        """Full-text search over stored resumes, best matches first"""
+        return database.search_resumes(query, limit, min_experience_years)
+
     def to_excel(self, df):
         output = BytesIO()
         with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
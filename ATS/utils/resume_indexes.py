@@ -0,0 +1,13 @@
+"""
+Indexes every saved resume is added to
+
+The save functions of config.database take these from their callers (the
+queue workers and the batch runner) and run them in the save transaction;
+config doesn't import utils itself. Each one takes a cursor and the saved
+(resume_id, raw_text) pairs.
+"""
+from utils.candidate_index import index_vectors
+from utils.near_duplicates import index_signatures
+from utils.skill_bits import index_skill_bits
+
+RESUME_INDEXERS = (index_signatures, index_vectors, index_skill_bits)
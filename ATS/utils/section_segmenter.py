@@ -0,0 +1,168 @@
+"""
+Local resume section segmentation
+
+Splits resume text into summary, skills, education, experience and projects
+sections in one pass over its lines, without an LLM call. A line is a
+section header when, after dropping bullets, numbering and a trailing colon,
+it is one of the known header phrases ("Work Experience", "EDUCATION:", ...),
+or a short upper-case or colon-terminated line containing one. Headers of
+other sections (certifications, awards, hobbies, ...) only end the section
+before them. "Skills: Python, SQL" counts as a header with inline content.
+
+Segmentation.confident tells whether enough sections were found for the
+result to replace the LLM extraction; otherwise the caller falls back to it.
+"""
+import re
+
+SECTION_HEADERS = {
+    'summary': [
+        'summary', 'professional summary', 'career summary', 'objective', 'career objective',
+        'professional objective', 'profile', 'professional profile', 'career profile', 'about me',
+        'overview', 'personal statement'
+    ],
+    'skills': [
+        'skills', 'technical skills', 'key skills', 'core skills', 'skill set', 'skillset',
+        'core competencies', 'competencies', 'areas of expertise', 'expertise', 'technologies',
+        'tools and technologies', 'technical proficiency', 'skills and tools', 'skills and abilities',
+        'technical expertise'
+    ],
+    'education': [
+        'education', 'academic background', 'academics', 'academic qualifications', 'academic details',
+        'educational qualifications', 'educational background', 'education and training',
+        'qualifications', 'academic profile', 'education details'
+    ],
+    'experience': [
+        'experience', 'work experience', 'professional experience', 'relevant experience',
+        'employment', 'employment history', 'work history', 'career history', 'professional background',
+        'internships', 'internship', 'internship experience', 'work and internships',
+        'experience and internships', 'industrial experience'
+    ],
+    'projects': [
+        'projects', 'project', 'academic projects', 'personal projects', 'key projects', 'major projects',
+        'selected projects', 'project work', 'project experience', 'project details', 'projects undertaken'
+    ],
+    'other': [
+        'certifications', 'certification', 'certificates', 'courses', 'coursework', 'relevant coursework',
+        'training', 'trainings', 'achievements', 'accomplishments', 'awards', 'honors', 'honours',
+        'awards and achievements', 'publications', 'languages', 'interests', 'hobbies',
+        'hobbies and interests', 'extracurricular activities', 'extra curricular activities', 'activities',
+        'volunteering', 'volunteer experience', 'leadership', 'positions of responsibility', 'references',
+        'declaration', 'personal details', 'personal information', 'contact', 'contact information',
+        'strengths'
+    ]
+}
+
+# Sections extract_education_experience_projects reports, under the keys of the LLM response
+REPORTED_SECTIONS = {'education': 'Education:', 'experience': 'Experience:', 'projects': 'Projects:'}
+# Sections that must be found, at least one of ANCHOR_SECTIONS among them, to trust the segmentation
+MIN_SECTIONS = 3
+ANCHOR_SECTIONS = ('education', 'experience')
+MAX_HEADER_WORDS = 6
+
+_HEADER_NAMES = {phrase: name for name, phrases in SECTION_HEADERS.items() for phrase in phrases}
+# Longest phrases first, so "work experience" wins over "experience" inside a longer header
+_HEADER_SEARCH = re.compile(
+    r'\b(' + '|'.join(re.escape(phrase) for phrase in sorted(_HEADER_NAMES, key=len, reverse=True)) + r')\b'
+)
+_MARKER = re.compile(r'^\s*(?:[•●▪◦‣∙·■□➢➤►\-\*–—]+|\d{1,2}[.)])\s*')
+_NON_WORD = re.compile(r'[^a-z& ]+')
+_YEAR = re.compile(r'\b(?:19|20)\d{2}\b')
+
+
+def _normalize(line):
+    line = _NON_WORD.sub(' ', line.lower()).replace('&', ' and ')
+    return ' '.join(line.split())
+
+
+def detect_header(line):
+    """(section name, inline content) if line is a section header, else None"""
+    stripped = _MARKER.sub('', line).strip()
+    if not stripped or len(stripped) > 80:
+        return None
+    head, colon, rest = stripped.partition(':')
+    name = _HEADER_NAMES.get(_normalize(head))
+    if name:
+        return name, rest.strip()
+    # Layout cues: a short upper-case line ("PROFESSIONAL EXPERIENCE & INTERNSHIPS")
+    # or a short line ending with a colon that contains a header phrase
+    if len(stripped.split()) > MAX_HEADER_WORDS or _YEAR.search(stripped):
+        return None
+    if stripped.isupper() or (colon and not rest.strip()):
+        match = _HEADER_SEARCH.search(_normalize(head))
+        if match:
+            return _HEADER_NAMES[match.group(1)], ''
+    return None
+
+
+class Segmentation:
+    """The sections found in a resume, as character spans of its text"""
+
+    def __init__(self, text, spans):
+        self.text = text
+        self.spans = spans
+
+    @property
+    def found(self):
+        return set(self.spans) - {'other'}
+
+    @property
+    def confident(self):
+        """Whether the headers found are enough to skip the LLM extraction"""
+        return len(self.found) >= MIN_SECTIONS and any(name in self.found for name in ANCHOR_SECTIONS)
+
+    def section_text(self, name):
+        """All text of a section (several spans are joined, e.g. "Experience" and "Internships")"""
+        return '\n'.join(self.text[start:end].strip('\n') for start, end in self.spans.get(name, []))
+
+    def entries(self, name):
+        """The section split into one line per entry, like the LLM extraction returns"""
+        return section_entries(self.section_text(name).split('\n'))
+
+
+def segment_resume(text):
+    """Find the section spans of a resume text in one pass"""
+    spans = {}
+    current, start = None, 0
+    position = 0
+    for line in text.splitlines(keepends=True):
+        header = detect_header(line) if len(line) <= 120 else None
+        if header:
+            if current:
+                spans.setdefault(current, []).append((start, position))
+            current, inline = header
+            # Inline content ("Skills: Python, SQL") belongs to the section
+            start = position + len(line.rstrip('\r\n')) - len(inline) if inline else position + len(line)
+        position += len(line)
+    if current:
+        spans.setdefault(current, []).append((start, position))
+    return Segmentation(text, spans)
+
+
+def section_entries(lines):
+    """Group a section's lines into entries.
+
+    A title line starts an entry; lines under it (up to a date or bullets) and
+    its bullets are joined onto it, bullets kept as "•". A blank line always
+    ends the entry.
+    """
+    entries = []
+    current = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            current = None
+            continue
+        marker = _MARKER.match(stripped)
+        content = stripped[marker.end():].strip() if marker else stripped
+        if not content:
+            continue
+        if marker and current is not None:
+            current['parts'].append('• ' + content)
+            current['bullets'] = True
+        elif (current is not None and not current['bullets'] and not _YEAR.search(' '.join(current['parts']))
+              and len(current['parts']) < 3 and not marker):
+            current['parts'].append(content)
+        else:
+            current = {'parts': [content], 'bullets': False}
+            entries.append(current)
+    return [' '.join(entry['parts']) for entry in entries]
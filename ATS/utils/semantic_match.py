@@ -0,0 +1,116 @@
+"""
+TF-IDF relevance of resumes to job roles
+
+Each role is turned into a document from its description, skills and
+sections, and a TF-IDF vectorizer is fitted over all role documents. The
+vectorizer and the normalized role matrix are rebuilt only when the job role
+catalog changes; they are also pickled to cache/ keyed by the catalog content,
+so a restarted process does not refit. Scoring a resume is one sparse
+transform and one sparse matrix product, with no LLM call.
+"""
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache')
+MODEL_FORMAT = 1
+
+
+def role_document(role_info):
+    """The text a role is matched on"""
+    recommended = role_info.get('recommended_skills', {})
+    parts = [
+        role_info.get('description', ''),
+        ' '.join(role_info.get('required_skills', [])),
+        ' '.join(recommended.get('technical', [])),
+        ' '.join(recommended.get('soft', [])),
+        ' '.join(role_info.get('sections', []))
+    ]
+    return '\n'.join(part for part in parts if part)
+
+
+class SemanticMatcher:
+    """Cosine similarity between resume text and job roles"""
+
+    def __init__(self, catalog, cache_dir=CACHE_DIR):
+        self.catalog = catalog
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._version = None
+        self._model = None
+
+    def model(self):
+        """(vectorizer, role matrix, [(category, role)], {role document: row}) for the current catalog"""
+        self.catalog.refresh()
+        if self._version == self.catalog.version:
+            return self._model
+        with self._lock:
+            version = self.catalog.version
+            if self._version != version:
+                self._model = self._load_or_fit(self.catalog.as_dict())
+                self._version = version
+            return self._model
+
+    def _load_or_fit(self, roles):
+        import sklearn
+
+        key = hashlib.sha256(
+            json.dumps([MODEL_FORMAT, sklearn.__version__, roles], sort_keys=True).encode()
+        ).hexdigest()[:16]
+        path = os.path.join(self.cache_dir, f'role_tfidf-{key}.pkl')
+        if os.path.exists(path):
+            try:
+                with open(path, 'rb') as file:
+                    return pickle.load(file)
+            except Exception as e:
+                print(f"Error loading role model cache: {str(e)}")
+
+        model = self._fit(roles)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(suffix='.pkl', dir=self.cache_dir)
+            with os.fdopen(fd, 'wb') as file:
+                pickle.dump(model, file)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error saving role model cache: {str(e)}")
+        return model
+
+    def _fit(self, roles):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        keys = [(category, role) for category, category_roles in roles.items() for role in category_roles]
+        documents = [role_document(roles[category][role]) for category, role in keys]
+        vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 2), sublinear_tf=True)
+        # Rows are L2-normalized, so a dot product with a transformed resume is the cosine similarity
+        role_matrix = vectorizer.fit_transform(documents)
+        rows = {document: row for row, document in enumerate(documents)}
+        return vectorizer, role_matrix, keys, rows
+
+    def _role_vector(self, role_info):
+        vectorizer, role_matrix, _, rows = self.model()
+        document = role_document(role_info)
+        if document in rows:
+            return role_matrix[rows[document]]
+        # A role that is not in the catalog (e.g. edited but not saved) is vectorized on the fly
+        return vectorizer.transform([document])
+
+    def score_batch(self, texts, role_info):
+        """Relevance (0-100) of each text to a role"""
+        vectorizer = self.model()[0]
+        similarities = vectorizer.transform(texts) @ self._role_vector(role_info).T
+        return (similarities.toarray().ravel() * 100).round(1).tolist()
+
+    def score(self, text, role_info):
+        """Relevance (0-100) of a resume text to a role"""
+        return self.score_batch([text], role_info)[0]
+
+    def rank_roles(self, text, top_k=3):
+        """The top_k (category, role, relevance) matches of a resume across the catalog"""
+        vectorizer, role_matrix, keys, _ = self.model()
+        similarities = (role_matrix @ vectorizer.transform([text]).T).toarray().ravel()
+        best = similarities.argsort()[::-1][:top_k]
+        return [(*keys[row], round(float(similarities[row]) * 100, 1)) for row in best]
@@ -0,0 +1,88 @@
+"""
+Single-flight request coalescing
+
+Identical analyses requested at the same time (a double-clicked button, two
+sessions uploading the same file for the same role, the same file twice in a
+batch) share one computation instead of each calling the LLM. The first
+caller for a key runs the function; callers arriving while it runs wait for
+it and get a copy of its result, or the exception it raised. Nothing is kept
+after the computation ends, so later requests run again.
+
+If the running caller is interrupted rather than failing (a Streamlit rerun
+or stop, KeyboardInterrupt: BaseExceptions that are not Exceptions), the
+waiters are not handed its interruption; one of them runs the function
+instead. A waiter that gives up after its timeout only stops waiting itself.
+
+request_key identifies an analysis by a hash of the resume content, the
+role's requirements and the prompt version, so results are only shared
+between requests that would have sent the same prompts.
+"""
+import copy
+import hashlib
+import json
+import threading
+from concurrent.futures import CancelledError, Future
+
+from utils.prompt_builder import PROMPT_VERSION
+
+
+def request_key(content, role_info, *options):
+    """Hash of content (text or bytes), the role's requirements, PROMPT_VERSION and options"""
+    if isinstance(content, str):
+        content = content.encode('utf-8', errors='surrogatepass')
+    digest = hashlib.sha256(content or b'')
+    digest.update(json.dumps([PROMPT_VERSION, role_info, options], sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        # Calls that waited for another one instead of running, for monitoring
+        self.coalesced = 0
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def do(self, key, function, timeout=None):
+        """Run function() unless a call with key is already running, else wait for that one.
+
+        Returns (result, shared); shared tells whether the result came from another
+        caller's call, in which case it is a deep copy. Raises the exception of the
+        call that ran, or TimeoutError after waiting timeout seconds.
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = Future()
+                else:
+                    self.coalesced += 1
+
+            if leader:
+                try:
+                    result = function()
+                except Exception as e:
+                    call.set_exception(e)
+                    raise
+                except BaseException:
+                    # Interrupted, not failed: the waiters run it themselves
+                    call.cancel()
+                    raise
+                else:
+                    call.set_result(result)
+                    return result, False
+                finally:
+                    with self._lock:
+                        if self._calls.get(key) is call:
+                            del self._calls[key]
+
+            try:
+                return copy.deepcopy(call.result(timeout)), True
+            except CancelledError:
+                continue
@@ -0,0 +1,271 @@
+"""
+Per-resume skill bitsets
+
+Every skill the app knows about (the skills extract_skills looks for plus the
+required and recommended skills of every job role) gets a fixed bit position
+in skill_dictionary. Positions are only ever appended, so stored bitsets stay
+valid when the catalog grows. Each saved resume gets its skills as packed
+little-endian uint64 words in resume_skill_bits, matched the same way as
+calculate_keyword_match (case-insensitive substring of the resume text).
+
+SkillBitsets keeps all of them in one (resumes x words) NumPy array, so
+"how many candidates have every required skill of a role" is a vectorized
+AND plus popcount over the whole pool instead of a LIKE scan per skill.
+
+Resumes saved before this index existed, or scored against an older, smaller
+dictionary, can be brought up to date from the ATS folder:
+
+    python -m utils.skill_bits --backfill
+"""
+import argparse
+import threading
+
+import numpy as np
+
+from config.database import get_database_connection, init_database, decode_payload
+
+WORD_BITS = 64
+
+if hasattr(np, 'bitwise_count'):
+    def popcount(words):
+        """Number of set bits in each row of a uint64 array"""
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+else:
+    _BYTE_COUNTS = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+    def popcount(words):
+        """Number of set bits in each row of a uint64 array"""
+        as_bytes = np.ascontiguousarray(words).view(np.uint8)
+        return _BYTE_COUNTS[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+def skill_key(skill):
+    """The canonical form of a skill name; skills differing only in case share a bit"""
+    return ' '.join(skill.lower().split())
+
+
+def known_skills(roles=None):
+    """Every skill of the analyzer and the job role catalog, in a stable order"""
+    from utils import resources
+    from utils.resume_analyzer_controller import PREDEFINED_SKILLS
+
+    roles = resources.get_job_role_catalog().as_dict() if roles is None else roles
+    skills = list(PREDEFINED_SKILLS)
+    for category_roles in roles.values():
+        for info in category_roles.values():
+            recommended = info.get('recommended_skills', {})
+            skills.extend(info.get('required_skills', []))
+            skills.extend(recommended.get('technical', []))
+            skills.extend(recommended.get('soft', []))
+    return skills
+
+
+def sync_dictionary(cursor, skills=None):
+    """Add skills missing from skill_dictionary; returns every (bit, skill) in bit order"""
+    rows = cursor.execute('SELECT bit, skill FROM skill_dictionary ORDER BY bit').fetchall()
+    present = {skill_key(skill) for _, skill in rows}
+    added = []
+    for skill in known_skills() if skills is None else skills:
+        key = skill_key(skill)
+        if key and key not in present:
+            present.add(key)
+            added.append((len(rows) + len(added), skill))
+    if added:
+        cursor.executemany('INSERT INTO skill_dictionary (bit, skill) VALUES (?, ?)', added)
+    return rows + added
+
+
+def num_words(num_skills):
+    return max(1, -(-num_skills // WORD_BITS))
+
+
+def encode(text, keys):
+    """Bitset (uint64 words) of the skills in keys found in text"""
+    text = (text or '').lower()
+    words = np.zeros(num_words(len(keys)), dtype=np.uint64)
+    for bit, key in enumerate(keys):
+        if key in text:
+            words[bit // WORD_BITS] |= np.uint64(1) << np.uint64(bit % WORD_BITS)
+    return words
+
+
+def skill_mask(skills, positions, width):
+    """Bitset of the given skills; skills not in the dictionary are returned separately"""
+    mask = np.zeros(width, dtype=np.uint64)
+    unknown = []
+    for skill in skills:
+        bit = positions.get(skill_key(skill))
+        if bit is None:
+            unknown.append(skill)
+        else:
+            mask[bit // WORD_BITS] |= np.uint64(1) << np.uint64(bit % WORD_BITS)
+    return mask, unknown
+
+
+def index_skill_bits(cursor, items):
+    """Store the skill bitsets of (resume_id, text) pairs using cursor's transaction"""
+    keys = [skill_key(skill) for _, skill in sync_dictionary(cursor)]
+    cursor.executemany(
+        'INSERT OR REPLACE INTO resume_skill_bits (resume_id, num_skills, bits) VALUES (?, ?, ?)',
+        [(resume_id, len(keys), encode(text, keys).tobytes()) for resume_id, text in items]
+    )
+    return len(items)
+
+
+class SkillBitsets:
+    """All resume skill bitsets in memory, kept up to date with the database incrementally"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.skills = []
+        self.positions = {}
+        self._clear()
+
+    def refresh(self):
+        """Load the dictionary and any bitsets added since the last refresh; returns how many were loaded"""
+        with self._lock:
+            loaded, stored = self._load()
+            if stored != (len(self.ids), self.num_skills):
+                # Rows were added below the last loaded id, deleted, or rewritten with a
+                # larger dictionary (a backfill), so start over
+                self._clear()
+                loaded, _ = self._load()
+            return loaded
+
+    def _clear(self):
+        self.ids = np.zeros(0, dtype=np.int64)
+        # Sum of the loaded rows' num_skills; a backfill rewriting a row raises it in the database
+        self.num_skills = 0
+        # Target roles as codes into role_names, so filtering by role is an integer comparison
+        self.role_names = []
+        self.roles = np.zeros(0, dtype=np.int32)
+        self.bits = np.zeros((0, 1), dtype=np.uint64)
+
+    def _load(self):
+        conn = get_database_connection()
+        try:
+            self.skills = [skill for _, skill in conn.execute('SELECT bit, skill FROM skill_dictionary ORDER BY bit')]
+            self.positions = {}
+            for bit, skill in enumerate(self.skills):
+                self.positions.setdefault(skill_key(skill), bit)
+            last_id = int(self.ids[-1]) if len(self.ids) else 0
+            rows = conn.execute('''
+            SELECT b.resume_id, b.bits, d.target_role, b.num_skills
+            FROM resume_skill_bits b
+            JOIN resume_data d ON d.id = b.resume_id
+            WHERE b.resume_id > ?
+            ORDER BY b.resume_id
+            ''', (last_id,)).fetchall()
+            stored = tuple(conn.execute('''
+            SELECT COUNT(*), COALESCE(SUM(b.num_skills), 0) FROM resume_skill_bits b JOIN resume_data d ON d.id = b.resume_id
+            WHERE b.resume_id <= ?
+            ''', (rows[-1][0] if rows else last_id,)).fetchone())
+        finally:
+            conn.close()
+
+        width = num_words(len(self.skills))
+        if width > self.bits.shape[1]:
+            self.bits = np.pad(self.bits, ((0, 0), (0, width - self.bits.shape[1])))
+        if rows:
+            new_bits = np.zeros((len(rows), width), dtype=np.uint64)
+            for row, (_, blob, _, _) in enumerate(rows):
+                words = np.frombuffer(blob, dtype='<u8')
+                new_bits[row, :len(words)] = words
+            self.ids = np.concatenate([self.ids, np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))])
+            codes = {name: code for code, name in enumerate(self.role_names)}
+            for _, _, name, _ in rows:
+                if name not in codes:
+                    codes[name] = len(self.role_names)
+                    self.role_names.append(name)
+            self.roles = np.concatenate([self.roles, np.fromiter((codes[row[2]] for row in rows), dtype=np.int32, count=len(rows))])
+            self.bits = np.concatenate([self.bits, new_bits])
+            self.num_skills += sum(row[3] for row in rows)
+        return len(rows), stored
+
+    def role_fit(self, required_skills, target_role=None):
+        """How well the candidate pool covers a list of skills.
+
+        Returns {'candidates', 'with_all', 'average_coverage', 'coverage_counts',
+        'skill_counts', 'unknown_skills'}: coverage_counts[n] is the number of
+        candidates having exactly n of the skills and skill_counts maps each skill
+        to the number of candidates having it. target_role limits the pool to
+        resumes analyzed against that role.
+        """
+        self.refresh()
+        with self._lock:
+            bits, roles, role_names, positions = self.bits, self.roles, self.role_names, self.positions
+        skills = list(dict.fromkeys(required_skills))
+        mask, unknown = skill_mask(skills, positions, bits.shape[1])
+        # Only the words holding one of the skills matter
+        words = np.flatnonzero(mask)
+        bits = bits[:, words]
+        mask = mask[words]
+        if target_role is not None:
+            code = role_names.index(target_role) if target_role in role_names else -1
+            bits = bits[roles == code]
+
+        matched = popcount(bits & mask)
+        total = len(skills)
+        with_all = int(np.count_nonzero(matched == total)) if total else 0
+        skill_counts = {}
+        for skill in skills:
+            bit = positions.get(skill_key(skill))
+            if bit is None:
+                skill_counts[skill] = 0
+            else:
+                column = bits[:, np.searchsorted(words, bit // WORD_BITS)] >> np.uint64(bit % WORD_BITS)
+                skill_counts[skill] = int(np.count_nonzero(column & np.uint64(1)))
+        return {
+            'candidates': len(bits),
+            'with_all': with_all,
+            'average_coverage': round(float(matched.mean()) / total * 100, 1) if total and len(bits) else 0.0,
+            'coverage_counts': np.bincount(matched, minlength=total + 1).tolist(),
+            'skill_counts': skill_counts,
+            'unknown_skills': unknown
+        }
+
+
+def backfill(batch_size=500):
+    """Compute bitsets for saved resumes that have none or were scored with fewer skills; returns how many"""
+    init_database()
+    conn = get_database_connection()
+    total = 0
+    try:
+        with conn:
+            num_skills = len(sync_dictionary(conn.cursor()))
+        last_id = 0
+        while True:
+            rows = conn.execute('''
+            SELECT p.resume_id, p.format_version, p.raw_text
+            FROM resume_payloads p
+            LEFT JOIN resume_skill_bits b ON b.resume_id = p.resume_id
+            WHERE p.resume_id > ? AND (b.resume_id IS NULL OR b.num_skills < ?)
+            ORDER BY p.resume_id
+            LIMIT ?
+            ''', (last_id, num_skills, batch_size)).fetchall()
+            if not rows:
+                break
+            with conn:
+                total += index_skill_bits(conn.cursor(), [
+                    (resume_id, decode_payload(blob, format_version) if blob is not None else '')
+                    for resume_id, format_version, blob in rows
+                ])
+            last_id = rows[-1][0]
+    finally:
+        conn.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the per-resume skill bitsets")
+    parser.add_argument('--backfill', action='store_true',
+                        help="compute bitsets for resumes that have none or predate new skills")
+    args = parser.parse_args()
+    if args.backfill:
+        print(f"Indexed {backfill()} resumes")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
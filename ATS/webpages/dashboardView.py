@@ -3,15 +3,39 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from config.database import get_database_connection
+from config.database import get_database_connection, init_database, parse_stored_list, search_resumes
+from utils import resources
+from utils.candidate_index import top_candidates
+from utils.semantic_match import role_document
 import io
+import csv
+import json
+import itertools
+import os
+import shutil
+import tempfile
+import threading
 import uuid
 from plotly.subplots import make_subplots
 from io import BytesIO
+from functools import wraps
+
+def serialized(method):
+    """Run a DashboardManager method holding the manager's lock, so queries on its shared
+    connection from different session threads don't interleave"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class DashboardManager:
     def __init__(self):
-        self.conn = get_database_connection()
+        init_database()
+        # One manager is shared by every session (see utils.resources), so its
+        # connection is used across threads; methods using it are @serialized
+        self.conn = get_database_connection(check_same_thread=False)
+        self.lock = threading.RLock()
         self.colors = {
             'primary': '#4CAF50',
             'secondary': '#2196F3',
@@ -26,6 +50,10 @@ class DashboardManager:
             'subtext': '#B0B0B0'
         }
         
+    @serialized
+    def close(self):
+        self.conn.close()
+
     def apply_dashboard_style(self):
         """Apply custom styling for dashboard"""
         st.markdown("""
@@ -109,6 +137,7 @@ class DashboardManager:
             </style>
         """, unsafe_allow_html=True)
 
+    @serialized
     def get_resume_metrics(self):
         """Get resume-related metrics from database"""
         cursor = self.conn.cursor()
@@ -156,6 +185,7 @@ class DashboardManager:
         
         return metrics
 
+    @serialized
     def get_skill_distribution(self):
         """Get skill distribution data"""
         cursor = self.conn.cursor()
@@ -201,6 +231,7 @@ class DashboardManager:
             
         return categories, counts
 
+    @serialized
     def get_weekly_trends(self):
         """Get weekly submission trends"""
         cursor = self.conn.cursor()
@@ -218,6 +249,7 @@ class DashboardManager:
             
         return [d[-3:] for d in dates], submissions  # Return shortened date format (e.g., 'Mon', 'Tue')
 
+    @serialized
     def get_job_category_stats(self):
         """Get statistics by job category"""
         cursor = self.conn.cursor()
@@ -254,38 +286,56 @@ class DashboardManager:
         # Data Export Options
         export_format = st.sidebar.selectbox(
             "Export Format",
-            ["Excel", "CSV", "JSON"],
+            ["Excel", "CSV", "JSON", "NDJSON", "Parquet"],
             key="export_format"
         )
         
+        st.sidebar.caption(f"Exports over {self.MAX_DOWNLOAD_MB} MB are saved to the server's "
+                           f"{self.EXPORT_DIR}/ folder instead of downloaded")
+
         if st.sidebar.button("📥 Export Data"):
+            stamp = datetime.now().strftime('%Y%m%d_%H%M')
             if export_format == "Excel":
                 excel_data = self.export_to_excel()
                 if excel_data:
-                    st.sidebar.download_button(
+                    self.offer_export(
                         "⬇️ Download Excel",
-                        data=excel_data,
-                        file_name=f"resume_data_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                        excel_data,
+                        f"resume_data_{stamp}.xlsx",
+                        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                     )
             elif export_format == "CSV":
                 csv_data = self.export_to_csv()
                 if csv_data:
-                    st.sidebar.download_button(
-                        "⬇️ Download CSV",
-                        data=csv_data,
-                        file_name=f"resume_data_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-                        mime="text/csv"
+                    self.offer_export("⬇️ Download CSV", csv_data, f"resume_data_{stamp}.csv", "text/csv")
+            elif export_format == "Parquet":
+                parquet_data = self.export_to_parquet()
+                if parquet_data:
+                    self.offer_export(
+                        "⬇️ Download Parquet",
+                        parquet_data,
+                        f"resume_data_{stamp}.parquet",
+                        "application/vnd.apache.parquet"
+                    )
+            elif export_format == "NDJSON":
+                ndjson_data = self.export_to_json(ndjson=True)
+                if ndjson_data:
+                    self.offer_export(
+                        "⬇️ Download NDJSON", ndjson_data, f"resume_data_{stamp}.ndjson", "application/x-ndjson"
                     )
             else:
                 json_data = self.export_to_json()
                 if json_data:
-                    st.sidebar.download_button(
-                        "⬇️ Download JSON",
-                        data=json_data,
-                        file_name=f"resume_data_{datetime.now().strftime('%Y%m%d_%H%M')}.json",
-                        mime="application/json"
-                    )
+                    self.offer_export("⬇️ Download JSON", json_data, f"resume_data_{stamp}.json", "application/json")
+
+        if st.sidebar.button("📦 Update Parquet Snapshot"):
+            try:
+                rows_written = self.write_parquet_snapshot()
+                st.sidebar.success(f"Appended {rows_written} new rows to {self.PARQUET_SNAPSHOT_DIR}")
+            except ImportError:
+                st.sidebar.error("Parquet snapshots require the pyarrow package")
+            except Exception as e:
+                st.sidebar.error(f"Error updating Parquet snapshot: {str(e)}")
 
         # Database Stats
         st.sidebar.markdown("### 📊 Database Stats")
@@ -296,12 +346,93 @@ class DashboardManager:
             - Storage Used: {stats['storage_size']}
         """)
 
-    def get_resume_data(self):
-        """Get all resume data"""
+    # Sortable grid columns mapped to the SQL expression used as the keyset key. Date and name are
+    # indexed, so a page reads only its rows. The scores belong to each resume's latest analysis and
+    # can't be indexed: sorting by them looks up and ranks every matching resume for each page.
+    RESUME_SORT_COLUMNS = {
+        'Submission Date': 'r.created_at',
+        'ATS Score': 'COALESCE(a.ats_score, -1)',
+        'Keyword Match': 'COALESCE(a.keyword_match_score, -1)',
+        'Name': 'r.name'
+    }
+
+    RESUME_GRID_COLUMNS = [
+        'ID', 'Name', 'Email', 'Phone', 'LinkedIn', 'GitHub',
+        'Portfolio', 'Target Role', 'Target Category', 'Submission Date',
+        'ATS Score', 'Keyword Match', 'Format Score', 'Section Score'
+    ]
+
+    # Joins each resume with its most recent analysis so every resume is one grid row
+    RESUME_GRID_FROM = """
+        FROM resume_data r
+        LEFT JOIN resume_analysis a ON a.id = (
+            SELECT MAX(id) FROM resume_analysis WHERE resume_id = r.id
+        )
+    """
+
+    def build_resume_filters(self, filters=None):
+        """Translate grid filters into a SQL WHERE clause and its parameters.
+
+        Returns (where, params, needs_analysis); needs_analysis tells whether the
+        clause filters on the latest analysis (alias a) and so needs its join.
+        """
+        filters = filters or {}
+        clauses, params = [], []
+        needs_analysis = False
+
+        if filters.get('target_role'):
+            clauses.append('r.target_role = ?')
+            params.append(filters['target_role'])
+        if filters.get('target_category'):
+            clauses.append('r.target_category = ?')
+            params.append(filters['target_category'])
+        if filters.get('date_from'):
+            clauses.append('r.created_at >= ?')
+            params.append(str(filters['date_from']))
+        if filters.get('date_to'):
+            clauses.append("r.created_at < date(?, '+1 day')")
+            params.append(str(filters['date_to']))
+        if filters.get('min_ats_score') is not None:
+            clauses.append('a.ats_score >= ?')
+            params.append(float(filters['min_ats_score']))
+            needs_analysis = True
+        if filters.get('max_ats_score') is not None:
+            clauses.append('a.ats_score <= ?')
+            params.append(float(filters['max_ats_score']))
+            needs_analysis = True
+        if filters.get('min_keyword_score') is not None:
+            clauses.append('a.keyword_match_score >= ?')
+            params.append(float(filters['min_keyword_score']))
+            needs_analysis = True
+        if filters.get('search'):
+            term = filters['search'].strip().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            clauses.append("(r.name LIKE ? ESCAPE '\\' OR r.email LIKE ? ESCAPE '\\' OR r.target_role LIKE ? ESCAPE '\\')")
+            params.extend([f"%{term}%"] * 3)
+
+        where = ('WHERE ' + ' AND '.join(clauses)) if clauses else ''
+        return where, params, needs_analysis
+
+    @serialized
+    def get_resume_page(self, filters=None, sort_by='Submission Date', descending=True, after=None, page_size=25):
+        """Get one page of resume submissions using keyset pagination.
+
+        `after` is the cursor returned with the previous page; the returned
+        cursor is None when there are no further rows.
+        """
+        sort_expr = self.RESUME_SORT_COLUMNS.get(sort_by, 'r.created_at')
+        direction = 'DESC' if descending else 'ASC'
+        where, params, _ = self.build_resume_filters(filters)
+
+        if after is not None:
+            keyset = f"({sort_expr}, r.id) {'<' if descending else '>'} (?, ?)"
+            where = f"{where} AND {keyset}" if where else f"WHERE {keyset}"
+            params = params + list(after)
+
         cursor = self.conn.cursor()
         try:
-            cursor.execute('''
+            cursor.execute(f'''
             SELECT 
+                {sort_expr},
                 r.id,
                 r.name,
                 r.email,
@@ -316,113 +447,196 @@ class DashboardManager:
                 a.keyword_match_score,
                 a.format_score,
                 a.section_score
-            FROM resume_data r
-            LEFT JOIN resume_analysis a ON r.id = a.resume_id
-            ORDER BY r.created_at DESC
+            {self.RESUME_GRID_FROM}
+            {where}
+            ORDER BY {sort_expr} {direction}, r.id {direction}
+            LIMIT ?
+            ''', params + [page_size + 1])
+            rows = cursor.fetchall()
+        except Exception as e:
+            print(f"Error fetching resume page: {str(e)}")
+            return [], None
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = (rows[-1][0], rows[-1][1])
+        return [row[1:] for row in rows], next_cursor
+
+    @serialized
+    def count_resumes(self, filters=None):
+        """Count resume submissions matching the grid filters"""
+        where, params, needs_analysis = self.build_resume_filters(filters)
+        # The analysis join is only needed when filtering on scores
+        from_clause = self.RESUME_GRID_FROM if needs_analysis else 'FROM resume_data r'
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"SELECT COUNT(*) {from_clause} {where}", params)
+            return cursor.fetchone()[0]
+        except Exception as e:
+            print(f"Error counting resumes: {str(e)}")
+            return 0
+
+    @serialized
+    def get_filter_options(self, column):
+        """Get the distinct non-empty values of a resume_data column for filter dropdowns"""
+        if column not in ('target_role', 'target_category'):
+            raise ValueError(f"Unsupported filter column: {column}")
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f'''
+            SELECT DISTINCT {column}
+            FROM resume_data
+            WHERE {column} IS NOT NULL AND {column} <> ''
+            ORDER BY {column}
             ''')
-            return cursor.fetchall()
+            return [row[0] for row in cursor.fetchall()]
         except Exception as e:
-            print(f"Error fetching resume data: {str(e)}")
+            print(f"Error fetching filter options: {str(e)}")
             return []
 
+    def format_resume_page(self, rows):
+        """Build the display DataFrame for a page of rows, formatting scores as percentages"""
+        df = pd.DataFrame(rows, columns=self.RESUME_GRID_COLUMNS)
+        for col in ['ATS Score', 'Keyword Match', 'Format Score', 'Section Score']:
+            scores = pd.to_numeric(df[col], errors='coerce')
+            df[col] = (scores.round(1).astype(str) + '%').where(scores.notna(), 'N/A')
+        return df
+
     def render_resume_data_section(self):
-        """Render resume data section with Excel download"""
+        """Render the paginated resume submissions grid with server-side filters"""
         st.markdown("<h2 class='section-title'>Resume Submissions</h2>", unsafe_allow_html=True)
-        
-        # Get resume data
-        resume_data = self.get_resume_data()
-        
-        if resume_data:
-            # Convert to DataFrame
-            columns = [
-                'ID', 'Name', 'Email', 'Phone', 'LinkedIn', 'GitHub', 
-                'Portfolio', 'Target Role', 'Target Category', 'Submission Date',
-                'ATS Score', 'Keyword Match', 'Format Score', 'Section Score'
-            ]
-            df = pd.DataFrame(resume_data, columns=columns)
-            
-            # Format scores as percentages
-            score_columns = ['ATS Score', 'Keyword Match', 'Format Score', 'Section Score']
-            for col in score_columns:
-                df[col] = df[col].apply(lambda x: f"{x*100:.1f}%" if pd.notnull(x) else "N/A")
-            
-            # Style the dataframe
-            st.markdown("""
-            <style>
-            .resume-data {
-                background-color: #2D2D2D;
-                border-radius: 10px;
-                padding: 1rem;
-                margin-bottom: 1rem;
-            }
-            </style>
-            """, unsafe_allow_html=True)
-            
-            with st.container():
-                st.markdown('<div class="resume-data">', unsafe_allow_html=True)
-                
-                # Add filters
-                col1, col2 = st.columns(2)
-                with col1:
-                    target_role = st.selectbox(
-                        "Filter by Target Role",
-                        options=["All"] + list(df['Target Role'].unique()),
-                        key="role_filter"
-                    )
-                with col2:
-                    target_category = st.selectbox(
-                        "Filter by Category",
-                        options=["All"] + list(df['Target Category'].unique()),
-                        key="category_filter"
-                    )
-                
-                # Apply filters
-                filtered_df = df.copy()
-                if target_role != "All":
-                    filtered_df = filtered_df[filtered_df['Target Role'] == target_role]
-                if target_category != "All":
-                    filtered_df = filtered_df[filtered_df['Target Category'] == target_category]
-                
-                # Display filtered data
-                st.dataframe(
-                    filtered_df,
-                    use_container_width=True,
-                    hide_index=True
+
+        # Style the dataframe
+        st.markdown("""
+        <style>
+        .resume-data {
+            background-color: #2D2D2D;
+            border-radius: 10px;
+            padding: 1rem;
+            margin-bottom: 1rem;
+        }
+        </style>
+        """, unsafe_allow_html=True)
+
+        with st.container():
+            st.markdown('<div class="resume-data">', unsafe_allow_html=True)
+
+            # Add filters
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                target_role = st.selectbox(
+                    "Filter by Target Role",
+                    options=["All"] + self.get_filter_options('target_role'),
+                    key="role_filter"
                 )
-                
-                # Add download buttons
-                col1, col2 = st.columns(2)
-                with col1:
-                    # Download filtered data
-                    excel_buffer = BytesIO()
-                    filtered_df.to_excel(excel_buffer, index=False, engine='openpyxl')
-                    excel_buffer.seek(0)
-                    
-                    st.download_button(
-                        label="📥 Download Filtered Data",
-                        data=excel_buffer,
-                        file_name=f"resume_data_filtered_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        key="download_filtered_data"
-                    )
-                
-                with col2:
-                    # Download all data
-                    excel_buffer_all = BytesIO()
-                    df.to_excel(excel_buffer_all, index=False, engine='openpyxl')
-                    excel_buffer_all.seek(0)
-                    
-                    st.download_button(
-                        label="📥 Download All Data",
-                        data=excel_buffer_all,
-                        file_name=f"resume_data_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        key="download_all_data"
-                    )
-                
+            with col2:
+                target_category = st.selectbox(
+                    "Filter by Category",
+                    options=["All"] + self.get_filter_options('target_category'),
+                    key="category_filter"
+                )
+            with col3:
+                search = st.text_input("Search name, email or role", key="resume_search_filter")
+
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                date_range = st.date_input("Submission Date Range", value=(), key="date_filter")
+            with col2:
+                min_ats, max_ats = st.slider("ATS Score Range", 0, 100, (0, 100), key="ats_filter")
+            with col3:
+                sort_by = st.selectbox(
+                    "Sort By",
+                    list(self.RESUME_SORT_COLUMNS.keys()),
+                    key="resume_sort",
+                    help="Sorting by a score ranks every matching submission, so it is slower than "
+                         "sorting by date or name on large databases"
+                )
+            with col4:
+                sort_order = st.selectbox("Order", ["Descending", "Ascending"], key="resume_sort_order")
+                page_size = st.selectbox("Rows per Page", [25, 50, 100], key="resume_page_size")
+
+            filters = {
+                'target_role': target_role if target_role != "All" else None,
+                'target_category': target_category if target_category != "All" else None,
+                'search': search or None,
+                'date_from': date_range[0] if len(date_range) > 0 else None,
+                'date_to': date_range[1] if len(date_range) > 1 else None,
+                'min_ats_score': min_ats if min_ats > 0 else None,
+                'max_ats_score': max_ats if max_ats < 100 else None
+            }
+
+            # Restart from the first page whenever the query changes
+            query_key = (tuple(sorted((k, str(v)) for k, v in filters.items())), sort_by, sort_order, page_size)
+            if st.session_state.get('resume_grid_query') != query_key:
+                st.session_state.resume_grid_query = query_key
+                st.session_state.resume_grid_cursors = [None]
+
+            cursors = st.session_state.resume_grid_cursors
+            rows, next_cursor = self.get_resume_page(
+                filters,
+                sort_by=sort_by,
+                descending=sort_order == "Descending",
+                after=cursors[-1],
+                page_size=page_size
+            )
+
+            if not rows:
+                st.info("No resume submissions available")
                 st.markdown('</div>', unsafe_allow_html=True)
-        else:
-            st.info("No resume submissions available")
+                return
+
+            total = self.count_resumes(filters)
+            page_number = len(cursors)
+            total_pages = max(1, -(-total // page_size))
+
+            # Display the current page only
+            df = self.format_resume_page(rows)
+            st.dataframe(
+                df,
+                use_container_width=True,
+                hide_index=True
+            )
+
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col1:
+                if st.button("⬅️ Previous", disabled=page_number == 1, key="resume_grid_prev"):
+                    cursors.pop()
+                    st.rerun()
+            with col2:
+                st.markdown(
+                    f"<p style='text-align: center;'>Page {page_number} of {total_pages} ({total:,} submissions)</p>",
+                    unsafe_allow_html=True
+                )
+            with col3:
+                if st.button("Next ➡️", disabled=next_cursor is None, key="resume_grid_next"):
+                    cursors.append(next_cursor)
+                    st.rerun()
+
+            # Download the visible page
+            excel_buffer = BytesIO()
+            df.to_excel(excel_buffer, index=False, engine='openpyxl')
+            excel_buffer.seek(0)
+
+            st.download_button(
+                label="📥 Download Current Page",
+                data=excel_buffer,
+                file_name=f"resume_data_page{page_number}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                key="download_filtered_data"
+            )
+            # The full dataset is only exported when the button is clicked
+            st.download_button(
+                label="📥 Download All Data",
+                data=self.download_all_excel,
+                file_name=f"resume_data_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                key="download_all_data",
+                help=f"Exports over {self.MAX_DOWNLOAD_MB} MB are saved to the server's {self.EXPORT_DIR}/ "
+                     "folder; the download then says where"
+            )
+
+            st.markdown('</div>', unsafe_allow_html=True)
 
     def render_admin_section(self):
         """Render admin section with logs and Excel download"""
@@ -474,96 +688,321 @@ class DashboardManager:
         else:
             st.info("No admin activity logs available")
 
-    def export_to_excel(self):
-        """Export data to Excel format"""
-        query = """
-            SELECT 
-                rd.name, rd.email, rd.phone, rd.linkedin, rd.github, rd.portfolio,
-                rd.summary, rd.target_role, rd.target_category,
-                rd.education, rd.experience, rd.projects, rd.skills,
-                ra.ats_score, ra.keyword_match_score, ra.format_score, ra.section_score,
-                ra.missing_skills, ra.recommendations,
-                rd.created_at
-            FROM resume_data rd
-            LEFT JOIN resume_analysis ra ON rd.id = ra.resume_id
+    # Full export of every resume joined with its analyses, in insertion order
+    EXPORT_QUERY = """
+        SELECT 
+            rd.id AS resume_id,
+            rd.name, rd.email, rd.phone, rd.linkedin, rd.github, rd.portfolio,
+            rd.summary, rd.target_role, rd.target_category,
+            rd.education, rd.experience, rd.projects, rd.skills,
+            ra.ats_score, ra.keyword_match_score, ra.format_score, ra.section_score,
+            ra.missing_skills, ra.recommendations,
+            rd.created_at
+        FROM resume_data rd
+        LEFT JOIN resume_analysis ra ON rd.id = ra.resume_id
+        {where}
+        ORDER BY rd.id, ra.id
+    """
+
+    EXPORT_CHUNK_SIZE = 1000
+
+    def iter_export_chunks(self, chunk_size=None, after_id=None):
+        """Yield the export column names, then the export rows in fetchmany chunks.
+
+        When after_id is given only resumes with a larger id are exported.
         """
+        # Its own connection: exports can run outside the session's thread (download callbacks)
+        conn = get_database_connection()
         try:
-            df = pd.read_sql_query(query, self.conn)
-            
-            # Create Excel writer object
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                # Write main data
-                df.to_excel(writer, sheet_name='Resume Data', index=False)
-                
-                # Get the workbook and the worksheet
-                workbook = writer.book
-                worksheet = writer.sheets['Resume Data']
-                
-                # Add formatting
-                header_format = workbook.add_format({
-                    'bold': True,
-                    'text_wrap': True,
-                    'valign': 'top',
-                    'fg_color': '#D7E4BC',
-                    'border': 1
-                })
-                
-                # Write headers with formatting
-                for col_num, value in enumerate(df.columns.values):
-                    worksheet.write(0, col_num, value, header_format)
-                    
-                # Auto-adjust columns' width
-                for i, col in enumerate(df.columns):
-                    max_length = max(
-                        df[col].astype(str).apply(len).max(),
-                        len(str(col))
-                    ) + 2
-                    worksheet.set_column(i, i, min(max_length, 50))
-            
-            # Return the Excel file
-            output.seek(0)
-            return output.getvalue()
-            
+            cursor = conn.cursor()
+            if after_id is None:
+                cursor.execute(self.EXPORT_QUERY.format(where=''))
+            else:
+                cursor.execute(self.EXPORT_QUERY.format(where='WHERE rd.id > ?'), (after_id,))
+            yield [column[0] for column in cursor.description]
+            while True:
+                rows = cursor.fetchmany(chunk_size or self.EXPORT_CHUNK_SIZE)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    def iter_csv_export(self, chunk_size=None):
+        """Stream the export as UTF-8 encoded CSV, one chunk of rows at a time"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        chunks = self.iter_export_chunks(chunk_size)
+        writer.writerow(next(chunks))
+        for rows in chunks:
+            writer.writerows(rows)
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+
+    def iter_ndjson_export(self, chunk_size=None):
+        """Stream the export as newline-delimited JSON records"""
+        chunks = self.iter_export_chunks(chunk_size)
+        columns = next(chunks)
+        for rows in chunks:
+            yield ''.join(json.dumps(dict(zip(columns, row))) + '\n' for row in rows).encode('utf-8')
+
+    def iter_json_export(self, chunk_size=None):
+        """Stream the export as a single JSON array of records"""
+        chunks = self.iter_export_chunks(chunk_size)
+        columns = next(chunks)
+        yield b'['
+        separator = ''
+        for rows in chunks:
+            records = ','.join(json.dumps(dict(zip(columns, row))) for row in rows)
+            yield (separator + records).encode('utf-8')
+            separator = ','
+        yield b']'
+
+    EXPORT_DIR = 'exports'
+    # st.download_button reads the whole file into the server's memory, so larger exports are
+    # saved to EXPORT_DIR instead
+    MAX_DOWNLOAD_MB = int(os.environ.get('ATS_MAX_DOWNLOAD_MB', '100'))
+
+    def export_size(self, data):
+        """Size in bytes of an export buffer or file"""
+        if isinstance(data, BytesIO):
+            return data.getbuffer().nbytes
+        return os.fstat(data.fileno()).st_size
+
+    def keep_export(self, data, file_name):
+        """Copy an export to EXPORT_DIR and close it; returns the saved path"""
+        os.makedirs(self.EXPORT_DIR, exist_ok=True)
+        path = os.path.join(self.EXPORT_DIR, file_name)
+        with data, open(path + '.tmp', 'wb') as f:
+            shutil.copyfileobj(data, f)
+        os.replace(path + '.tmp', path)
+        return path
+
+    def offer_export(self, label, data, file_name, mime):
+        """Offer an export in the sidebar: a download button, or the server path of an export too large
+        to download"""
+        size = self.export_size(data)
+        if size <= self.MAX_DOWNLOAD_MB * 1024 * 1024:
+            st.sidebar.download_button(label, data=data, file_name=file_name, mime=mime)
+            return
+        path = self.keep_export(data, file_name)
+        st.sidebar.warning(f"The export is {size / (1024 * 1024):.0f} MB, over the {self.MAX_DOWNLOAD_MB} MB "
+                           f"download limit, so it was saved on the server as {path}")
+
+    def message_workbook(self, message):
+        """A one-cell Excel workbook, for deferred downloads that can't show a message on the page"""
+        output = BytesIO()
+        pd.DataFrame({'Message': [message]}).to_excel(output, index=False, engine='openpyxl')
+        output.seek(0)
+        return output
+
+    def spool_export(self, chunks):
+        """Write encoded export chunks to an anonymous temporary file instead of joining them
+        in memory; returns the file rewound, unbuffered as st.download_button accepts it"""
+        output = tempfile.TemporaryFile(buffering=0)
+        with open(output.fileno(), 'wb', closefd=False) as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+        output.seek(0)
+        return output
+
+    def export_to_excel(self, chunk_size=None):
+        """Export data to Excel format, writing rows in constant-memory mode to a temporary file"""
+        try:
+            return self.write_excel_export(chunk_size)
         except Exception as e:
             st.error(f"Error exporting to Excel: {str(e)}")
             return None
 
+    def download_all_excel(self):
+        """Deferred data of the "Download All Data" button. It runs after the page was sent, where
+        st.error shows nothing, so a failed export is logged and downloaded as a workbook stating the
+        error, and an export over the download limit as one stating where it was saved"""
+        try:
+            output = self.write_excel_export()
+        except Exception as e:
+            print(f"Error exporting to Excel: {str(e)}")
+            return self.message_workbook(f"The export failed: {str(e)}")
+        size = self.export_size(output)
+        if size <= self.MAX_DOWNLOAD_MB * 1024 * 1024:
+            return output
+        path = self.keep_export(output, f"resume_data_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
+        print(f"Excel export of {size} bytes saved to {path}")
+        return self.message_workbook(f"The export is {size / (1024 * 1024):.0f} MB, over the "
+                                     f"{self.MAX_DOWNLOAD_MB} MB download limit, so it was saved on the "
+                                     f"server as {path}")
+
+    def write_excel_export(self, chunk_size=None):
+        """Write the Excel export to a temporary file and return it rewound; raises on failure"""
+        import xlsxwriter
+
+        output = tempfile.TemporaryFile(buffering=0)
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+        worksheet = workbook.add_worksheet('Resume Data')
+
+        header_format = workbook.add_format({
+            'bold': True,
+            'text_wrap': True,
+            'valign': 'top',
+            'fg_color': '#D7E4BC',
+            'border': 1
+        })
+
+        chunks = self.iter_export_chunks(chunk_size)
+        columns = next(chunks)
+        first_chunk = next(chunks, [])
+
+        # Estimate columns' width from the first chunk instead of scanning every row
+        for i, col in enumerate(columns):
+            max_length = max([len(str(col))] + [len(str(row[i])) for row in first_chunk if row[i] is not None]) + 2
+            worksheet.set_column(i, i, min(max_length, 50))
+
+        # Write headers with formatting; rows must be written in order in constant-memory mode
+        worksheet.write_row(0, 0, columns, header_format)
+        row_num = 1
+        for rows in itertools.chain([first_chunk], chunks):
+            for row in rows:
+                worksheet.write_row(row_num, 0, row)
+                row_num += 1
+
+        workbook.close()
+
+        # Return the Excel file
+        output.seek(0)
+        return output
+
     def export_to_csv(self):
         """Export data to CSV format"""
-        query = """
-            SELECT 
-                rd.name, rd.email, rd.phone, rd.linkedin, rd.github, rd.portfolio,
-                rd.summary, rd.target_role, rd.target_category,
-                rd.education, rd.experience, rd.projects, rd.skills,
-                ra.ats_score, ra.keyword_match_score, ra.format_score, ra.section_score,
-                ra.missing_skills, ra.recommendations,
-                rd.created_at
-            FROM resume_data rd
-            LEFT JOIN resume_analysis ra ON rd.id = ra.resume_id
-        """
         try:
-            df = pd.read_sql_query(query, self.conn)
-            return df.to_csv(index=False).encode('utf-8')
+            return self.spool_export(self.iter_csv_export())
         except Exception as e:
             st.error(f"Error exporting to CSV: {str(e)}")
             return None
 
-    def export_to_json(self):
-        """Export data to JSON format"""
-        query = """
-            SELECT 
-                rd.*, ra.*
-            FROM resume_data rd
-            LEFT JOIN resume_analysis ra ON rd.id = ra.resume_id
-        """
+    def export_to_json(self, ndjson=False):
+        """Export data to JSON format, or newline-delimited JSON when ndjson is set"""
         try:
-            df = pd.read_sql_query(query, self.conn)
-            return df.to_json(orient='records', date_format='iso')
+            chunks = self.iter_ndjson_export() if ndjson else self.iter_json_export()
+            return self.spool_export(chunks)
         except Exception as e:
             st.error(f"Error exporting to JSON: {str(e)}")
             return None
 
+    # Export columns stored as lists; everything else not typed here is a string
+    PARQUET_LIST_COLUMNS = ['education', 'experience', 'projects', 'skills', 'missing_skills', 'recommendations']
+    PARQUET_SCORE_COLUMNS = ['ats_score', 'keyword_match_score', 'format_score', 'section_score']
+    PARQUET_SNAPSHOT_DIR = os.path.join('exports', 'parquet')
+
+    def iter_arrow_batches(self, chunk_size=None, after_id=None):
+        """Yield typed pyarrow record batches built from chunked export reads"""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        chunks = self.iter_export_chunks(chunk_size, after_id)
+        columns = next(chunks)
+        fields = []
+        for col in columns:
+            if col == 'resume_id':
+                fields.append(pa.field(col, pa.int64()))
+            elif col in self.PARQUET_SCORE_COLUMNS:
+                fields.append(pa.field(col, pa.float32()))
+            elif col in self.PARQUET_LIST_COLUMNS:
+                fields.append(pa.field(col, pa.list_(pa.string())))
+            elif col == 'created_at':
+                fields.append(pa.field(col, pa.timestamp('s')))
+            else:
+                fields.append(pa.field(col, pa.string()))
+        schema = pa.schema(fields)
+
+        for rows in chunks:
+            arrays = []
+            for field, values in zip(schema, zip(*rows)):
+                if field.name in self.PARQUET_LIST_COLUMNS:
+                    arrays.append(pa.array([parse_stored_list(v) for v in values], field.type))
+                elif field.name == 'created_at':
+                    timestamps = pc.strptime(pa.array(values, pa.string()), format='%Y-%m-%d %H:%M:%S',
+                                             unit='s', error_is_null=True)
+                    arrays.append(timestamps)
+                else:
+                    arrays.append(pa.array(values, field.type))
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    def write_parquet(self, destination, chunk_size=None, after_id=None):
+        """Write the export to a Parquet file or buffer; returns (rows written, last resume id)"""
+        import pyarrow.parquet as pq
+
+        writer = None
+        rows_written, last_id = 0, None
+        try:
+            for batch in self.iter_arrow_batches(chunk_size, after_id):
+                if writer is None:
+                    writer = pq.ParquetWriter(destination, batch.schema, compression='zstd')
+                writer.write_batch(batch)
+                rows_written += batch.num_rows
+                last_id = batch.column('resume_id')[-1].as_py()
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows_written, last_id
+
+    def export_to_parquet(self):
+        """Export data to Parquet format"""
+        try:
+            output = tempfile.TemporaryFile(buffering=0)
+            rows_written, _ = self.write_parquet(output)
+            if not rows_written:
+                output.close()
+                st.info("No resume data to export")
+                return None
+            output.seek(0)
+            return output
+        except ImportError:
+            st.error("Parquet export requires the pyarrow package")
+            return None
+        except Exception as e:
+            st.error(f"Error exporting to Parquet: {str(e)}")
+            return None
+
+    def write_parquet_snapshot(self, directory=None):
+        """Append resumes newer than the last snapshot as a new Parquet part file.
+
+        The snapshot is a directory of part files readable as one dataset
+        (e.g. pandas.read_parquet(directory)); the last exported resume id is
+        kept in _snapshot_state.json. Analyses added later to an already
+        exported resume are not picked up.
+        """
+        directory = directory or self.PARQUET_SNAPSHOT_DIR
+        os.makedirs(directory, exist_ok=True)
+        state_path = os.path.join(directory, '_snapshot_state.json')
+
+        state = {'last_resume_id': 0, 'parts': 0}
+        if os.path.exists(state_path):
+            with open(state_path) as f:
+                state = json.load(f)
+
+        part_path = os.path.join(directory, f"part-{state['parts']:05d}.parquet")
+        tmp_path = part_path + '.tmp'
+        rows_written, last_id = self.write_parquet(tmp_path, after_id=state['last_resume_id'])
+        if not rows_written:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return 0
+        os.replace(tmp_path, part_path)
+
+        state.update({
+            'last_resume_id': last_id,
+            'parts': state['parts'] + 1,
+            'exported_at': datetime.now().isoformat(timespec='seconds')
+        })
+        with open(state_path + '.tmp', 'w') as f:
+            json.dump(state, f, indent=4)
+        os.replace(state_path + '.tmp', state_path)
+        return rows_written
+
+    @serialized
     def get_database_stats(self):
         """Get database statistics"""
         cursor = self.conn.cursor()
@@ -597,6 +1036,7 @@ class DashboardManager:
         
         return stats
 
+    @serialized
     def get_admin_logs(self):
         """Get admin logs"""
         cursor = self.conn.cursor()
@@ -838,10 +1278,108 @@ class DashboardManager:
             """, unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
 
+        # How well the candidate pool covers a role's skills (aggregates only)
+        self.render_skill_gap_section()
+
         # Admin logs section with Excel download functionality
         if st.session_state.get('is_admin', False):
+            # Per-candidate data: best stored candidates for a role and full-text search
+            self.render_candidate_section()
+            self.render_search_section()
             self.render_admin_section()
 
+    def render_candidate_section(self):
+        """Render top-k retrieval of stored candidates for a job role or free-text description"""
+        st.markdown('<div class="section-title">🎯 Top Candidates for a Role</div>', unsafe_allow_html=True)
+        catalog = resources.get_job_role_catalog()
+        source_col, k_col = st.columns([3, 1])
+        with source_col:
+            source = st.radio("Match against", ["Job role", "Job description"], horizontal=True, key="candidate_source")
+        with k_col:
+            k = st.number_input("Candidates", min_value=5, max_value=100, value=20, step=5, key="candidate_k")
+
+        if source == "Job role":
+            category_col, role_col = st.columns(2)
+            with category_col:
+                category = st.selectbox("Job Category", catalog.categories(), key="candidate_category")
+            with role_col:
+                role = st.selectbox("Specific Role", catalog.roles(category), key="candidate_role")
+            query = role_document(catalog.get(category, role))
+        else:
+            query = st.text_area("Job description", key="candidate_description")
+        if not query or not st.button("Find Candidates", key="find_candidates"):
+            return
+
+        results = top_candidates(resources.get_candidate_index(), query, int(k))
+        if not results:
+            st.info("No matching candidates found. Resumes saved before the index existed can be added with "
+                    "`python -m utils.candidate_index --rebuild`.")
+            return
+        df = pd.DataFrame(results, columns=['ID', 'Name', 'Email', 'Target Role', 'Target Category', 'ATS Score', 'Match'])
+        st.dataframe(df, use_container_width=True, hide_index=True)
+
+    def render_skill_gap_section(self):
+        """Render role-fit counts and per-skill coverage of the stored candidate pool"""
+        st.markdown('<div class="section-title">🧩 Skill Gap Analytics</div>', unsafe_allow_html=True)
+        catalog = resources.get_job_role_catalog()
+        category_col, role_col = st.columns(2)
+        with category_col:
+            category = st.selectbox("Job Category", catalog.categories(), key="skill_gap_category")
+        with role_col:
+            role = st.selectbox("Specific Role", catalog.roles(category), key="skill_gap_role")
+        targeted = st.checkbox("Only candidates who applied for this role", key="skill_gap_targeted")
+
+        required_skills = catalog.get(category, role).get('required_skills', [])
+        fit = resources.get_skill_bitsets().role_fit(required_skills, role if targeted else None)
+        if not fit['candidates']:
+            st.info("No candidates to analyze. Resumes saved before skill bitsets existed can be added with "
+                    "`python -m utils.skill_bits --backfill`.")
+            return
+
+        share = fit['with_all'] * 100 / fit['candidates']
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Candidates", fit['candidates'])
+        col2.metric("With All Required Skills", fit['with_all'], f"{share:.1f}%", delta_color="off")
+        col3.metric("Average Skill Coverage", f"{fit['average_coverage']}%")
+        st.plotly_chart(self.create_skill_gap_chart(fit), use_container_width=True)
+        if fit['unknown_skills']:
+            st.caption("Not indexed yet (run `python -m utils.skill_bits --backfill`): "
+                       + ", ".join(fit['unknown_skills']))
+
+    def render_search_section(self):
+        """Render full-text search over stored resume content"""
+        st.markdown('<div class="section-title">🔎 Candidate Search</div>', unsafe_allow_html=True)
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            query = st.text_input(
+                "Search resume content",
+                placeholder='e.g. kubernetes terraform, or "machine learning" OR nlp',
+                key="candidate_search"
+            )
+        with col2:
+            min_years = st.number_input(
+                "Min. years of experience",
+                min_value=0.0,
+                max_value=50.0,
+                value=0.0,
+                step=1.0,
+                key="candidate_search_min_years"
+            )
+        if not query:
+            return
+
+        results = search_resumes(query, limit=50, min_experience_years=min_years or None)
+        if not results:
+            st.info("No matching resumes found")
+            return
+
+        df = pd.DataFrame(
+            [row[:7] for row in results],
+            columns=['ID', 'Name', 'Email', 'Target Role', 'Target Category', 'ATS Score', 'Match']
+        )
+        st.dataframe(df, use_container_width=True, hide_index=True)
+
+    @serialized
     def get_trend_indicators(self):
         """Get trend indicators for stats"""
         cursor = self.conn.cursor()
@@ -896,6 +1434,7 @@ class DashboardManager:
         
         return indicators
 
+    @serialized
     def get_detailed_insights(self):
         """Get detailed insights from the database"""
         cursor = self.conn.cursor()
@@ -942,13 +1481,13 @@ class DashboardManager:
                 'trend_value': f"{abs(change):.1f}%"
             })
         
-        # Most Common Skills
+        # Most Common Skills (JSON skill lists, plus rows saved before skills were stored as JSON)
         cursor.execute("""
             WITH RECURSIVE
             split(skill, rest) AS (
                 SELECT '', skills || ',' 
                 FROM resume_data 
-                WHERE skills IS NOT NULL
+                WHERE skills IS NOT NULL AND NOT json_valid(skills)
                 UNION ALL
                 SELECT
                     substr(rest, 0, instr(rest, ',')),
@@ -957,19 +1496,24 @@ class DashboardManager:
                 WHERE rest <> ''
             ),
             cleaned_skills AS (
-                SELECT TRIM(REPLACE(REPLACE(skill, '[', ''), ']', '')) as skill
+                SELECT TRIM(REPLACE(REPLACE(skill, '[', ''), ']', ''), ' ''"') as skill
                 FROM split 
                 WHERE skill <> ''
+                UNION ALL
+                SELECT skill.value
+                FROM resume_data, json_each(resume_data.skills) AS skill
+                WHERE json_valid(resume_data.skills)
             )
             SELECT skill, COUNT(*) as count
             FROM cleaned_skills
+            WHERE skill <> ''
             GROUP BY skill
             ORDER BY count DESC
             LIMIT 3
         """)
         top_skills = cursor.fetchall()
         if top_skills:
-            skills_text = f"Most in-demand skills: Python ({top_skills[0][1]} resumes), Java ({top_skills[1][1]} resumes), Express ({top_skills[2][1]} resumes)"
+            skills_text = ', '.join(f"{skill} ({count} resumes)" for skill, count in top_skills)
             insights.append({
                 'title': 'Top Skills',
                 'icon': '💡',
@@ -981,6 +1525,7 @@ class DashboardManager:
         
         return insights
 
+    @serialized
     def get_quick_stats(self):
         """Get quick statistics for the dashboard"""
         cursor = self.conn.cursor()
@@ -1128,6 +1673,31 @@ class DashboardManager:
         
         return fig
 
+    def create_skill_gap_chart(self, fit):
+        """Create a chart of the share of candidates having each skill"""
+        skills = sorted(fit['skill_counts'], key=fit['skill_counts'].get)
+        shares = [round(fit['skill_counts'][skill] * 100 / fit['candidates'], 1) for skill in skills]
+        fig = go.Figure(go.Bar(
+            x=shares,
+            y=skills,
+            orientation='h',
+            marker_color=[self.colors['danger'] if share < 25 else self.colors['info'] for share in shares],
+            text=[f"{share}%" for share in shares],
+            textposition='auto',
+        ))
+
+        fig.update_layout(
+            title="Candidates Having Each Required Skill",
+            paper_bgcolor=self.colors['card'],
+            plot_bgcolor=self.colors['card'],
+            font={'color': self.colors['text']},
+            height=max(300, 30 * len(skills) + 80),
+            margin=dict(l=20, r=20, t=50, b=20)
+        )
+        fig.update_xaxes(title_text="Candidates (%)", range=[0, 100], color=self.colors['text'])
+
+        return fig
+
     def create_job_category_chart(self):
         """Create a success rate by category chart"""
         categories, rates = self.get_job_category_stats()
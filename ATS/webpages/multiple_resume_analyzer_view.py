@@ -1,122 +1,127 @@
-from PyPDF2 import PdfReader
-from docx import Document
 import streamlit as st
-import docx
-from utils.resume_analyzer_controller import ResumeAnalyzer
-import json
+from utils import resources
 import pandas as pd
 import numpy as np
-import time
+from config.database import init_database
+from utils.job_queue import enqueue_analysis, ensure_worker_pool, get_jobs, cancel_jobs, TERMINAL_STATUSES
+from utils.extraction_budget import truncation_message
 
 class MultipleResumeAnalyzerView:
     def __init__(self):
         pass
 
-    def read_pdf(self, file):
-        pdf_reader = PdfReader(file)
-        text = "\n".join([page.extract_text() for page in pdf_reader.pages if page.extract_text()])
-        return text
-
-    def read_docx(self, file):
-        doc = docx.Document(file)
-        text = "\n".join([para.text for para in doc.paragraphs])
-        return text
-    
     def main(self):
-        with open("config\\job_roles.json", "r") as file:
-            job_roles = json.load(file)
+        job_roles = resources.get_job_role_catalog()
 
         st.title("Multi-File Uploader in Streamlit")
-        categories = list(job_roles.keys())
+        categories = job_roles.categories()
         selected_category = st.selectbox("Job Category", categories)
             
-        roles = list(job_roles[selected_category].keys())
+        roles = job_roles.roles(selected_category)
         selected_role = st.selectbox("Specific Role", roles)
             
-        role_info = job_roles[selected_category][selected_role]
+        role_info = job_roles.get(selected_category, selected_role)
 
         uploaded_files = st.file_uploader("Upload multiple files", type=["pdf", "docx"], accept_multiple_files=True)
+        reuse_duplicates = st.checkbox(
+            "Reuse earlier analyses of near-duplicate resumes",
+            value=True,
+            help="A resume almost identical to a saved one gets that resume's analysis, with its own "
+                 "contact details. Turn off to always analyze from scratch."
+        )
 
-        results = []
         if uploaded_files:
             st.write(f"You uploaded {len(uploaded_files)} file(s)")
-            ra = ResumeAnalyzer()
-        if st.button("Submit"):
+        if st.button("Submit") and uploaded_files:
             st.success("Files uploaded successfully")
-            with st.spinner("Analyzing Documents..."):
-                for uploaded_file in uploaded_files:
-                    # st.write(f"### {uploaded_file.name}")
-                    try:
-                        if uploaded_file.type == "application/pdf":
-                            content = self.read_pdf(uploaded_file)
-                        elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                            content = self.read_docx(uploaded_file)
-                        else:
-                            content = "Unsupported file format"
-                        
-                        # st.text_area("File content:", content, height=200)
-                    except Exception as e:
-                        st.write("Could not read file content.")
-                        st.write(e)
-                    
-                    analysis = ra.analyze_resume({'raw_text': content}, role_info)  
+            init_database()
+            ensure_worker_pool()
+            # Queue every file; the queue workers analyze and save them in the background,
+            # so the results are stored even if this tab is closed
+            st.session_state.multi_resume_jobs = [
+                (uploaded_file.name, enqueue_analysis(
+                    role_info, selected_category, selected_role,
+                    file_name=uploaded_file.name,
+                    file_type=uploaded_file.type,
+                    file_data=uploaded_file.getvalue(),
+                    reuse_duplicates=reuse_duplicates
+                ))
+                for uploaded_file in uploaded_files
+            ]
+            st.session_state.multi_resume_finished = {}
+            st.session_state.multi_resume_excel = None
+
+        batch = st.session_state.get("multi_resume_jobs")
+        if not batch:
+            return
+
+        # Only the progress section re-runs while the batch is in progress
+        running = len(st.session_state.multi_resume_finished) < len(batch)
+        st.fragment(self.render_batch, run_every=1 if running else None)()
+
+    def render_batch(self):
+        """Render progress, per-file rows and the (partial) results of the queued batch"""
+        batch = st.session_state.multi_resume_jobs
+        finished = st.session_state.multi_resume_finished
+        was_running = len(finished) < len(batch)
+
+        # Finished jobs are kept in the session, so only unfinished ones are polled
+        unfinished = [job_id for _, job_id in batch if job_id not in finished]
+        jobs = get_jobs(unfinished)
+        for job_id, job in jobs.items():
+            if job['status'] in TERMINAL_STATUSES:
+                finished[job_id] = job
+        jobs.update(finished)
 
-                    resume_data = {
-                            'personal_info': {
-                                'name': analysis.get('name', ''),
-                                'email': analysis.get('email', ''),
-                                'phone': analysis.get('phone', ''),
-                                'linkedin': analysis.get('linkedin', ''),
-                                'github': analysis.get('github', ''),
-                                'portfolio': analysis.get('portfolio', '')
-                            },
-                            'summary': analysis.get('summary', ''),
-                            'target_role': selected_role,
-                            'target_category': selected_category,
-                            'education': analysis.get('education', []),
-                            'experience': analysis.get('experience', []),
-                            'projects': analysis.get('projects', []),
-                            'skills': analysis.get('skills', []),
-                            'template': ''
-                        }   
-                    # Save analysis data
-                    analysis_data = {
-                                'resume_id': analysis,
-                                'ats_score': analysis['ats_score'],
-                                'keyword_match_score': analysis['keyword_match']['score'],
-                                'format_score': analysis['format_score'],
-                                'section_score': analysis['section_score'],
-                                'missing_skills': ','.join(analysis['keyword_match']['missing_skills']),
-                                'recommendations': ','.join(analysis['suggestions'])
-                            }
-                    results.append(analysis)
-                    time.sleep(20)
+        done = len(finished)
+        st.progress(done / len(batch), text=f"Analyzed {done} of {len(batch)} documents")
+        if done < len(batch) and st.button("Cancel"):
+            cancel_jobs(unfinished)
+            st.rerun()
 
-            data = []
-            for analysis in results:
-                data.append({
-                    "Name": analysis.get('name', ''),
-                    "Email": analysis.get('email', ''),
-                    "Phone": analysis.get('phone', ''),
-                    "Skills": ', '.join(analysis.get('skills', [])),
-                    "Total Experience": analysis.get('total_experience', ''),  # Count of experiences
-                    "Ats_score": analysis.get('ats_score', '')
-                })
+        rows = []
+        for name, job_id in batch:
+            job = jobs.get(job_id, {'status': 'missing', 'result': None, 'error': 'job not found'})
+            analysis = job['result'] if job['status'] == 'done' else {}
+            duplicate = analysis.get('near_duplicate')
+            rows.append({
+                "File": name,
+                "Status": job['status'],
+                "Name": analysis.get('name', ''),
+                "Email": analysis.get('email', ''),
+                "Phone": analysis.get('phone', ''),
+                "Skills": ', '.join(analysis.get('skills', [])),
+                "Total Experience": analysis.get('total_experience', ''),  # Count of experiences
+                "Ats_score": analysis.get('ats_score'),
+                "Role Relevance": analysis.get('semantic_match'),
+                "Near Duplicate Of": f"#{duplicate['resume_id']} ({duplicate['similarity']:.2f})" if duplicate else '',
+                "Truncated": truncation_message(analysis.get('extraction_truncated')),
+                "Error": (job['error'] or '') if job['status'] in ('failed', 'cancelled', 'missing') else ''
+            })
 
+        # Analysis Table
+        st.title("Resume Analysis Table")
+        st.write("### Resume Analysis Results")
+        st.dataframe(pd.DataFrame(rows), hide_index=True)
 
-            df = pd.DataFrame(data)            
-            #     if st.button("Submit"):
-            #     st.success("Files uploaded successfully")
-                
-                # Analysis Table
-            excel_data = ra.to_excel(df)
-            st.title("Resume Analysis Table")
-            st.write("### Resume Analysis Results")
-            st.dataframe(df)
-            st.download_button(
-                label="Download Excel File",
-                data=excel_data,
-                file_name="exported_data.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            )
+        # The Excel file is rebuilt only when another document has finished
+        completed = [row for row in rows if row["Status"] == 'done']
+        cached = st.session_state.multi_resume_excel
+        if cached is None or cached[0] != len(completed):
+            df = pd.DataFrame(completed).drop(columns=["File", "Status", "Error", "Near Duplicate Of", "Truncated"], errors='ignore')
+            cached = (len(completed), resources.get_resume_analyzer().to_excel(df))
+            st.session_state.multi_resume_excel = cached
+        st.download_button(
+            label="Download Excel File" if done == len(batch) else "Download Results So Far",
+            data=cached[1],
+            file_name="exported_data.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            disabled=not completed
+        )
 
+        # Once the batch is finished, re-run the whole page so polling stops
+        if was_running and done == len(batch):
+            saved = sum(1 for job in finished.values() if job.get('resume_id'))
+            if saved:
+                st.toast(f"{saved} resume(s) saved to the database")
+            st.rerun()
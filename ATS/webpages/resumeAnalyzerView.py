@@ -1,22 +1,68 @@
 import streamlit as st
 from webpages.ui_components import (apply_modern_styles, page_header)
-import json
-import utils.resume_analyzer_controller as resumeAnalyzerController
-from config.database import (save_resume_data, save_analysis_data, 
-                             init_database)
+from config.database import init_database
+from utils import resources
+from config.job_roles import StaleJobRolesError
+from utils.job_queue import enqueue_analysis, ensure_worker_pool, get_jobs, TERMINAL_STATUSES
+from utils.extraction_budget import truncation_message
 
 class ResumeAnalyzerView:
     def __init__(self):
-        # Open and load JSON file
-        with open("config\\job_roles.json", "r") as file:
-            JOB_ROLES = json.load(file)
-
-        self.job_roles = JOB_ROLES
+        # Job roles and the analyzer are loaded once per process and shared
+        self.job_roles = resources.get_job_role_catalog()
 
         if "editing" not in st.session_state:
             st.session_state.editing = False
 
-        self.rac = resumeAnalyzerController.ResumeAnalyzer()
+        self.rac = resources.get_resume_analyzer()
+
+    def queue_analysis(self, uploaded_file, role_info, selected_category, selected_role, reuse_duplicates=True):
+        """Queue the analysis once per upload, role and options, and poll it; returns the analysis when done"""
+        if "analysis_jobs" not in st.session_state:
+            st.session_state.analysis_jobs = {}
+
+        file_key = getattr(uploaded_file, 'file_id', None) or f"{uploaded_file.name}-{uploaded_file.size}"
+        job_key = (file_key, selected_category, selected_role, reuse_duplicates)
+        if job_key not in st.session_state.analysis_jobs:
+            init_database()
+            ensure_worker_pool()
+            # The worker extracts the text, within the extraction budget
+            st.session_state.analysis_jobs[job_key] = enqueue_analysis(
+                role_info, selected_category, selected_role, file_name=uploaded_file.name,
+                file_type=uploaded_file.type, file_data=uploaded_file.getvalue(),
+                reuse_duplicates=reuse_duplicates
+            )
+
+        job_id = st.session_state.analysis_jobs[job_key]
+        job = get_jobs([job_id]).get(job_id)
+        if job is None or job['status'] in ('failed', 'cancelled'):
+            st.error(f"Error analyzing your document: {job['error'] if job else 'job not found'}")
+            del st.session_state.analysis_jobs[job_key]
+            return None
+        if job['status'] == 'done':
+            duplicate = job['result'].get('near_duplicate')
+            if duplicate:
+                st.info(
+                    f"Near-duplicate of resume #{duplicate['resume_id']} (Jaccard {duplicate['similarity']:.2f})"
+                    + (" - showing its earlier analysis" if duplicate.get('reused') else "")
+                )
+            if job['result'].get('extraction_truncated'):
+                st.warning(truncation_message(job['result']['extraction_truncated']))
+            if job['resume_id'] and not (duplicate and duplicate.get('reused')):
+                st.success("Resume data saved successfully!")
+            return job['result']
+
+        # Still queued or running: only the status fragment re-runs until the job finishes;
+        # the job keeps running if the page is closed
+        st.fragment(self.render_job_status, run_every=1)(job_id)
+        return None
+
+    def render_job_status(self, job_id):
+        """Show that the analysis is in progress; rerun the whole page once its job has finished"""
+        job = get_jobs([job_id]).get(job_id)
+        if job is None or job['status'] in TERMINAL_STATUSES:
+            st.rerun()
+        st.info("⏳ Analyzing your document..." if job['status'] == 'running' else "⏳ Waiting for an analysis worker...")
 
     def render_empty_state(self, icon, message):
         """Render an empty state with icon and message"""
@@ -27,16 +73,17 @@ class ResumeAnalyzerView:
             </div>
         """
 
-    def save_job_roles(self, job_roles):
-        # print("@ save_jobs")
+    def save_job_roles(self, category, role, role_info):
+        """Save one role's info; returns False if it could not be saved"""
         try:
-            # print(job_roles)
-            with open("config\\job_roles.json", "w") as file:
-                json.dump(job_roles, file, indent=4)
+            self.job_roles.update_role(category, role, role_info, st.session_state.get('job_roles_version'))
             st.success("Job role information updated successfully!")
-            # st.rerun()  # Refresh Streamlit app after saving
+            return True
+        except StaleJobRolesError as e:
+            st.error(str(e))
         except Exception as e:
             st.error(f"Error saving job roles: {e}")
+        return False
 
     def resumeAnalyzerPage(self):
         """Render the resume analyzer page"""
@@ -49,17 +96,19 @@ class ResumeAnalyzerView:
         )
         
         # Job Role Selection with dynamically applied styles
-        categories = list(self.job_roles.keys())
+        categories = self.job_roles.categories()
         selected_category = st.selectbox("Job Category", categories)
         
-        roles = list(self.job_roles[selected_category].keys())
+        roles = self.job_roles.roles(selected_category)
         selected_role = st.selectbox("Specific Role", roles)
         
-        role_info = self.job_roles[selected_category][selected_role]
+        role_info = self.job_roles.get(selected_category, selected_role)
 
         # Editing Mode
         if st.button("Update Role Info"):
             st.session_state.editing = True
+            # Saving fails if someone else changes the roles while this edit is open
+            st.session_state.job_roles_version = self.job_roles.version
 
         if st.session_state.editing:
             new_description = st.text_area("Update Job Description", role_info["description"])
@@ -72,15 +121,19 @@ class ResumeAnalyzerView:
             with save_button:
                 # print("hello")
                 if st.button("Save"):
-                    # Update job roles dictionary
-                    role_info["description"] = new_description
-                    role_info["required_skills"] = [skill.strip() for skill in new_required_skills.split(",")]
-                    role_info["recommended_skills"]["technical"] = [skill.strip() for skill in new_technical_skills.split(",")]
-                    role_info["recommended_skills"]["soft"] = [skill.strip() for skill in new_soft_skills.split(",")]
-                    self.save_job_roles(self.job_roles)
-                    st.success("Job role information updated!")
-                    st.session_state.editing = False
-                    st.rerun()
+                    # Build the updated role; the catalog's copy is shared and never modified in place
+                    updated_role = dict(role_info)
+                    updated_role["description"] = new_description
+                    updated_role["required_skills"] = [skill.strip() for skill in new_required_skills.split(",")]
+                    updated_role["recommended_skills"] = dict(
+                        role_info["recommended_skills"],
+                        technical=[skill.strip() for skill in new_technical_skills.split(",")],
+                        soft=[skill.strip() for skill in new_soft_skills.split(",")]
+                    )
+                    if self.save_job_roles(selected_category, selected_role, updated_role):
+                        st.success("Job role information updated!")
+                        st.session_state.editing = False
+                        st.rerun()
 
             with cancel_button:
                 if st.button("Cancel"):
@@ -94,6 +147,12 @@ class ResumeAnalyzerView:
         
         # File Upload
         uploaded_file = st.file_uploader("Upload your resume", type=['pdf', 'docx'])
+        reuse_duplicates = st.checkbox(
+            "Reuse earlier analyses of near-duplicate resumes",
+            value=True,
+            help="A resume almost identical to a saved one gets that resume's analysis, with its own "
+                 "contact details. Turn off to always analyze from scratch."
+        )
         
         st.markdown(
             self.render_empty_state(
@@ -103,107 +162,59 @@ class ResumeAnalyzerView:
             unsafe_allow_html=True
         )
         if uploaded_file:
-            with st.spinner("Analyzing your document..."):
-                text = ""
-                # Links and text are extracted here
-                if uploaded_file:
-                    text = self.text_extraction(uploaded_file)
-                    skills = self.rac.extract_skills(text)
-                    # st.write(skills)
-                    # if text is null return
-                    if text == "":
-                        return
-                    
-                    self.links_extraction(uploaded_file)
-               
-                # Analyze the document
-                analysis = self.rac.analyze_resume({'raw_text': text}, role_info)
+            analysis = self.queue_analysis(uploaded_file, role_info, selected_category, selected_role,
+                                           reuse_duplicates)
+            if analysis is None:
+                return
+
+            # Links are extracted here
+            self.links_extraction(uploaded_file)
+
+            # Show results based on document type
+            if analysis.get('document_type') != 'resume':
+                st.error(f"⚠️ This appears to be a {analysis['document_type']} document, not a resume!")
+                st.warning("Please upload a proper resume for ATS analysis.")
+                return                
+            # Display results in a modern card layout
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                # displaying ATS score card
+                self.ats_score_card_display(analysis)
+                if analysis.get('score_source') == 'local_fallback':
+                    st.caption("The AI evaluation was unavailable, so this score was computed from the section scores.")
+                                    
+                # self.display_analysis_results(analysis_results)
+
+                # Skills Match Card
+                st.markdown("""
+                <div class="feature-card">
+                    <h2>Skills Match</h2>
+                """, unsafe_allow_html=True)
                 
-                # Save resume data to database
-                resume_data = {
-                    'personal_info': {
-                        'name': analysis.get('name', 'N/A'),
-                        'email': analysis.get('email', ''),
-                        'phone': analysis.get('phone', ''),
-                        'linkedin': analysis.get('linkedin', ''),
-                        'github': analysis.get('github', ''),
-                        'portfolio': analysis.get('portfolio', '')
-                    },
-                    'summary': analysis.get('summary', ''),
-                    'target_role': selected_role,
-                    'target_category': selected_category,
-                    'education': analysis.get('education', []),
-                    'experience': analysis.get('experience', []),
-                    'total_experience': analysis.get('total_experience',''),
-                    'projects': analysis.get('projects', []),
-                    'skills': analysis.get('skills', []),
-                    'template': ''
-                }
-                # self.rac.extract_skills(text)
-                # self.rac.extract_education_experience_projects(text)
-                print(resume_data)
-                # Save to database
-                try:
-                    init_database()
-                    resume_id = save_resume_data(resume_data)
-                    
-                    # Save analysis data
-                    analysis_data = {
-                        'resume_id': resume_id,
-                        'ats_score': analysis['ats_score'],
-                        'keyword_match_score': analysis['keyword_match']['score'],
-                        'format_score': analysis['format_score'],
-                        'section_score': analysis['section_score'],
-                        'missing_skills': ','.join(analysis['keyword_match']['missing_skills']),
-                        'recommendations': ','.join(analysis['suggestions'])
-                    }
-                    save_analysis_data(resume_id, analysis_data)
-                    st.success("Resume data saved successfully!")
-                except Exception as e:
-                    st.error(f"Error saving to database: {str(e)}")
-                    print(f"Database error: {e}")
+                st.metric("Keyword Match", f"{int(analysis.get('keyword_match', {}).get('score', 0))}%")
+                st.metric("Role Relevance", f"{int(analysis.get('semantic_match', 0))}%",
+                          help="TF-IDF similarity of the resume to the role description and skills")
                 
-                # Show results based on document type
-                if analysis.get('document_type') != 'resume':
-                    st.error(f"⚠️ This appears to be a {analysis['document_type']} document, not a resume!")
-                    st.warning("Please upload a proper resume for ATS analysis.")
-                    return                
-                # Display results in a modern card layout
-                col1, col2 = st.columns(2)
+                if analysis['keyword_match']['missing_skills']:
+                    st.markdown("#### Missing Skills:")
+                    for skill in analysis['keyword_match']['missing_skills']:
+                        st.markdown(f"- {skill}")
                 
-                with col1:
-                    # displaying ATS score card
-                    self.ats_score_card_display(analysis)
-                                        
-                    # self.display_analysis_results(analysis_results)
-
-                    # Skills Match Card
-                    st.markdown("""
-                    <div class="feature-card">
-                        <h2>Skills Match</h2>
-                    """, unsafe_allow_html=True)
-                    
-                    st.metric("Keyword Match", f"{int(analysis.get('keyword_match', {}).get('score', 0))}%")
-                    
-                    if analysis['keyword_match']['missing_skills']:
-                        st.markdown("#### Missing Skills:")
-                        for skill in analysis['keyword_match']['missing_skills']:
-                            st.markdown(f"- {skill}")
-                    
-                    st.markdown("</div>", unsafe_allow_html=True)
+                st.markdown("</div>", unsafe_allow_html=True)
+            
+            with col2:
+                # Format Score Card
+                st.markdown("""
+                <div class="feature-card">
+                    <h2>Format Analysis</h2>
+                """, unsafe_allow_html=True)
                 
-                with col2:
-                    # Format Score Card
-                    st.markdown("""
-                    <div class="feature-card">
-                        <h2>Format Analysis</h2>
-                    """, unsafe_allow_html=True)
-                    
-                    st.metric("Format Score", f"{int(analysis.get('format_score', 0))}%")
-                    st.metric("Section Score", f"{int(analysis.get('section_score', 0))}%")
-                    
-                    st.markdown("</div>", unsafe_allow_html=True)
-    
+                st.metric("Format Score", f"{int(analysis.get('format_score', 0))}%")
+                st.metric("Section Score", f"{int(analysis.get('section_score', 0))}%")
+                
+                st.markdown("</div>", unsafe_allow_html=True)
+
     def display_role_information(self, selected_role, role_info):
         st.markdown(f"""
             <div style='background-color: #1e1e1e; padding: 20px; border-radius: 10px; margin: 10px 0;'>
@@ -278,17 +289,4 @@ class ResumeAnalyzerView:
         else:
             st.warning("No hyperlinks found in the resume!")
     
-    def text_extraction(self, uploaded_file):
-        text = ""
-        try:
-            if uploaded_file.type == "application/pdf":
-                text = self.rac.extract_text_from_pdf(uploaded_file)
-            elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                text = self.rac.extract_text_from_docx(uploaded_file)
-            else:
-                text = uploaded_file.getvalue().decode()
-        except Exception as e:
-            st.error(f"Error reading file: {str(e)}")
-        return text
-    
     
\ No newline at end of file
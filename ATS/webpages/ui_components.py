@@ -1,20 +1,90 @@
+import os
+import json
+import time
 import streamlit as st
 import requests
 
+STYLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'style')
+ANIMATION_DIR = os.path.join(STYLE_DIR, 'animations')
+ASSET_TIMEOUT = 3
+# Seconds before a failed animation download is tried again
+ASSET_RETRY_SECONDS = 60
+_failed_downloads = {}
+
+@st.cache_resource(show_spinner=False)
+def load_css(name):
+    """Read a stylesheet from the style folder once per process"""
+    with open(os.path.join(STYLE_DIR, name)) as f:
+        return f.read()
+
+def apply_css(name):
+    """Inject a stylesheet from the style folder into the page"""
+    st.markdown(f'<style>{load_css(name)}</style>', unsafe_allow_html=True)
+
 def apply_modern_styles():
     """Apply modern styles by loading the CSS file"""
-
-    # Load external CSS
-    with open('style/modern_style.css') as f:
-        st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+    apply_css('modern_style.css')
     
 
 def load_lottie_url(url: str):
-        """Load Lottie animation from URL"""
-        r = requests.get(url)
-        if r.status_code != 200:
+        """Load Lottie animation from URL; returns None if it can't be downloaded, at most
+        once per ASSET_RETRY_SECONDS after a failure"""
+        if time.monotonic() - _failed_downloads.get(url, float('-inf')) < ASSET_RETRY_SECONDS:
+            return None
+        try:
+            r = requests.get(url, timeout=ASSET_TIMEOUT)
+            r.raise_for_status()
+            animation = r.json()
+        except (requests.RequestException, ValueError) as e:
+            print(f"Error loading animation: {str(e)}")
+            _failed_downloads[url] = time.monotonic()
             return None
-        return r.json()
+        _failed_downloads.pop(url, None)
+        return animation
+
+class AnimationUnavailable(Exception):
+    """Raised by _load_lottie so that a missing animation isn't cached"""
+
+def load_lottie(name, url=None):
+    """Load a Lottie animation once per process from style/animations/<name>.json.
+
+    The remote url is only fetched when there is no local copy (or ATS_REFRESH_ASSETS=1),
+    and never when ATS_OFFLINE=1; a fetched animation is saved as the local copy.
+    Returns None if neither is available; the next call tries again.
+    """
+    try:
+        return _load_lottie(name, url)
+    except AnimationUnavailable:
+        return None
+
+@st.cache_resource(show_spinner=False)
+def _load_lottie(name, url):
+    path = os.path.join(ANIMATION_DIR, f'{name}.json')
+    local = None
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                local = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error reading animation {path}: {str(e)}")
+
+    refresh = local is None or os.environ.get('ATS_REFRESH_ASSETS') == '1'
+    if not url or not refresh or os.environ.get('ATS_OFFLINE') == '1':
+        remote = None
+    else:
+        remote = load_lottie_url(url)
+    if remote is None:
+        if local is None:
+            raise AnimationUnavailable(name)
+        return local
+    try:
+        os.makedirs(ANIMATION_DIR, exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(remote, f)
+        os.replace(path + '.tmp', path)
+    except OSError as e:
+        print(f"Error saving animation {path}: {str(e)}")
+    return remote
 
 def page_header(title, subtitle=None):
     """Render a consistent page header with gradient background"""